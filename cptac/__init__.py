@@ -9,30 +9,60 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-import pandas as pd
-import webbrowser
+import importlib
 import os.path as path
 import sys
 import warnings
 
 # Function imports
-from .file_download import download
-from .file_download import download_text as _download_text
 from .exceptions import CptacError, CptacWarning, InvalidParameterError, NoInternetError, OldPackageVersionWarning
+from .options import get_option, set_option
 
-# Dataset imports
-from .brca import Brca
-from .ccrcc import Ccrcc
-from .colon import Colon
-from .endometrial import Endometrial
-from .gbm import Gbm
-from .hnscc import Hnscc
-from .lscc import Lscc
-from .luad import Luad
-from .ovarian import Ovarian
+# The datasets, and the functions that need pandas or requests, are only imported the first time they're used, so importing cptac is fast. Keys are the names, values are the modules they're in.
+_lazy_imports = {
+    # Datasets
+    "Brca": ".brca",
+    "Ccrcc": ".ccrcc",
+    "Colon": ".colon",
+    "Endometrial": ".endometrial",
+    "Gbm": ".gbm",
+    "Hnscc": ".hnscc",
+    "Lscc": ".lscc",
+    "Luad": ".luad",
+    "Ovarian": ".ovarian",
+
+    # Functions
+    "download": ".file_download",
+    "share_dataset": ".shared_dataset",
+    "attach_dataset": ".shared_dataset",
+    "detach_dataset": ".shared_dataset",
+    "pancan_query": ".pancan",
+    "clear_pancan_datasets": ".pancan",
+}
+
+# Submodules that can be used as attributes of the package without importing them first
+_lazy_submodules = ["utils"]
+
+def __getattr__(name):
+    """Import the datasets, functions and submodules in _lazy_imports and _lazy_submodules the first time they're used."""
+    if name in _lazy_imports:
+        value = getattr(importlib.import_module(_lazy_imports[name], __name__), name)
+        _check_package_version() # We used to do this on import. Now we do it once the package is first used for data.
+    elif name in _lazy_submodules:
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value # So we only do this once for each name
+    return value
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(_lazy_imports.keys()) | set(_lazy_submodules))
 
 def list_datasets():
     """List all available datasets."""
+    import pandas as pd # Imported here so importing cptac doesn't have to wait for pandas
+
     col_names = ["Description", "Data reuse status", "Publication link"]
     col_index = pd.Index(data=col_names, name="Dataset name")
     datasets = {
@@ -53,6 +83,7 @@ def list_datasets():
 
 def embargo():
     """Open CPTAC embargo details in web browser."""
+    import webbrowser
     message = "Opening embargo details in web browser..."
     print(message, end = '\r')
     webbrowser.open("https://proteomics.cancer.gov/data-portal/about/data-use-agreement")
@@ -90,14 +121,24 @@ sys.excepthook = _exception_handler # Set our custom exception hook
 warnings.showwarning = _warning_displayer # And our custom warning displayer
 warnings.simplefilter("always", category=CptacWarning) # Edit the warnings filter to show multiple occurences of cptac-generated warnings
 
-# Check whether the package is up-to-date
-version_url = "https://byu.box.com/shared/static/kbwivmqnrdnn5im2gu6khoybk5a3rfl0.txt"
-try:
-    remote_version = _download_text(version_url)
-except NoInternetError:
-    pass
-else:
-    local_version = version()
-    if remote_version != local_version:
-        warnings.warn(f"Your version of cptac ({local_version}) is out-of-date. Latest is {remote_version}. Please run 'pip install --upgrade cptac' to update it.", OldPackageVersionWarning, stacklevel=2)
+# Check whether the package is up-to-date. This needs the internet, so it's only done the first time a dataset or a function that uses the data is accessed.
+_package_version_checked = False
+
+def _check_package_version():
+    """Warn if there's a newer version of the package. Only checks once."""
+    global _package_version_checked
+    if _package_version_checked:
+        return
+    _package_version_checked = True
 
+    from .file_download import download_text
+
+    version_url = "https://byu.box.com/shared/static/kbwivmqnrdnn5im2gu6khoybk5a3rfl0.txt"
+    try:
+        remote_version = download_text(version_url)
+    except NoInternetError:
+        pass
+    else:
+        local_version = version()
+        if remote_version != local_version:
+            warnings.warn(f"Your version of cptac ({local_version}) is out-of-date. Latest is {remote_version}. Please run 'pip install --upgrade cptac' to update it.", OldPackageVersionWarning, stacklevel=3)
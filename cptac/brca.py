@@ -19,12 +19,18 @@ from .exceptions import FailedReindexWarning, ReindexMapError
 
 class Brca(Dataset):
 
-    def __init__(self, version="latest", no_internet=False):
+    def __init__(self, version="latest", no_internet=False, use_cache=True, n_jobs=1, precision=None, memmap=None, genes=None, tables=None):
         """Load all of the brca dataframes as values in the self._data dict variable, with names as keys, and format them properly.
 
         Parameters:
         version (str, optional): The version number to load, or the string "latest" to just load the latest building. Default is "latest".
         no_internet (bool, optional): Whether to skip the index update step because it requires an internet connection. This will be skipped automatically if there is no internet at all, but you may want to manually skip it if you have a spotty internet connection. Default is False.
+        use_cache (bool, optional): Whether to load the formatted dataframes from the cache, if this version of the data has already been parsed, and to cache them if it hasn't. Default True.
+        n_jobs (int, optional): The number of processes to parse the data files with, if they aren't loaded from the cache. Pass -1 to use all available cores. Default 1 parses them all in this process.
+        precision (str, optional): The float dtype to store the omics dataframes in, either "float64" or "float32". float32 halves the memory used by the omics values. Default None uses the package-wide default set with cptac.set_option("precision", ...), which starts as "float64".
+        memmap (bool, optional): Whether to leave the values of the numeric omics dataframes in read-only memory-mapped files in the cache, so all the processes on a machine that load this dataset share one copy of them. Requires use_cache=True. Default None uses the package-wide default set with cptac.set_option("memmap", ...), which starts as False.
+        genes (str or list of str, optional): If given, only keep the data for these genes in the omics dataframes and the somatic_mutation dataframe. The miRNA, circular_RNA, metabolomics and lipidomics dataframes aren't named by gene, so they're kept whole. Lines for other genes are skipped before parsing where the data files allow it. Default None keeps all genes.
+        tables (str or list of str, optional): If given, only keep these dataframes, plus the clinical dataframe. Default None keeps all dataframes.
         """
 
         # Set some needed variables, and pass them to the parent Dataset class __init__ function
@@ -50,169 +56,102 @@ class Brca(Dataset):
                 "prosp-brca-v3.1-sample-annotation.csv.gz"],
         }
 
-        super().__init__(cancer_type="brca", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
+        super().__init__(cancer_type="brca", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet, use_cache=use_cache, n_jobs=n_jobs, precision=precision, memmap=memmap, genes=genes, tables=tables)
 
-        # Load the data into dataframes in the self._data dict
-        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
-        for file_path in self._data_files_paths: # Loops through files variable
+    def _load_data_file(self, file_path):
+        """Load the data file at the given path into one or more dataframes in the self._data dict.
 
-            # Print a loading message. We add a dot every time, so the user knows it's not frozen.
-            loading_msg = loading_msg + "."
-            print(loading_msg, end='\r')
-
-            path_elements = file_path.split(os.sep) # Get a list of the levels of the path
-            file_name = path_elements[-1] # The last element will be the name of the file
-
-            if file_name == "prosp-brca-v3.1-acetylome-ratio-norm-NArm.gct.gz":
-                df = pd.read_csv(file_path, sep='\t', skiprows=2, dtype=object) # First two rows of file aren't part of the dataframe. Also, due to extra metadata rows we're going to remove, all cols have mixed types, so we pass dtype=object for now.
-                df = df[df["GeneSymbol"] != "na"] # There are several metadata rows at the beginning of the dataframe, which duplicate the clinical and derived_molecular dataframes. They all don't have a value for GeneSymbol, so we'll use that to filter them out.
+        Parameters:
+        file_path (str): The path to the data file to load.
+        """
+        path_elements = file_path.split(os.sep) # Get a list of the levels of the path
+        file_name = path_elements[-1] # The last element will be the name of the file
 
+        if file_name in ["prosp-brca-v3.1-acetylome-ratio-norm-NArm.gct.gz", "prosp-brca-v3.1-phosphoproteome-ratio-norm-NArm.gct.gz"]:
+            def prepare_annotations(annotations):
                 # Prepare some columns we'll need later for the multiindex
-                df["variableSites"] = df["variableSites"].str.replace(r"[a-z\s]", "") # Get rid of all lowercase delimeters and whitespace in the sites
-                df = df.rename(columns={
+                annotations["variableSites"] = annotations["variableSites"].str.replace(r"[a-z\s]", "", regex=True) # Get rid of all lowercase delimeters and whitespace in the sites
+                annotations = annotations.rename(columns={
                     "GeneSymbol": "Name",
                     "variableSites": "Site",
                     "sequence": "Peptide", # We take this instead of sequenceVML, to match the other datasets' format
                     "accession_numbers": "Database_ID" # We take all accession numbers they have, instead of the singular accession_number column
                     })
 
-                # Some rows have at least one localized acetylation site, but also have other acetylations that aren't localized. We'll drop those rows, if their localized sites are duplicated in another row, to avoid creating duplicates, because we only preserve information about the localized sites in a given row. However, if the localized sites aren't duplicated in another row, we'll keep the row.
-                split_ids = df["id"].str.split('_', expand=True)
-                unlocalized_to_drop = df.index[~split_ids[3].eq(split_ids[4]) & df.duplicated(["Name", "Site", "Peptide", "Database_ID"], keep=False)] # Column 3 of the split "id" column is number of phosphorylations detected, and column 4 is number of phosphorylations localized, so if the two values aren't equal, the row has at least one unlocalized site
-                df = df.drop(index=unlocalized_to_drop)
-
-                # Give it a multiindex
-                df = df.set_index(["Name", "Site", "Peptide", "Database_ID"])                
-
-                df = df.drop(columns=["id", "id.description", "geneSymbol", "numColumnsVMsiteObserved", "bestScore", "bestDeltaForwardReverseScore", 
-                "Best_scoreVML", "sequenceVML", "accessionNumber_VMsites_numVMsitesPresent_numVMsitesLocalizedBest_earliestVMsiteAA_latestVMsiteAA",
-                "protein_mw", "species", "speciesMulti", "orfCategory", "accession_number", "protein_group_num", "entry_name"]) # We don't need these. The dropped columns include a "geneSymbol" column that is a duplicate of the original GeneSymbol.
-                df = df.apply(pd.to_numeric) # Now that we've dropped all the extra metadata columns, convert everything to floats.
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                df.index.name = "Patient_ID"
+                # Some rows have at least one localized site, but also have other modifications that aren't localized. We'll drop those rows, if their localized sites are duplicated in another row, to avoid creating duplicates, because we only preserve information about the localized sites in a given row. However, if the localized sites aren't duplicated in another row, we'll keep the row.
+                split_ids = annotations["id"].str.split('_', expand=True)
+                unlocalized_to_drop = annotations.index[~split_ids[3].eq(split_ids[4]) & annotations.duplicated(["Name", "Site", "Peptide", "Database_ID"], keep=False)] # Column 3 of the split "id" column is number of modifications detected, and column 4 is number of modifications localized, so if the two values aren't equal, the row has at least one unlocalized site
+                return annotations.drop(index=unlocalized_to_drop)
+
+            # There are several metadata rows at the beginning of the file, which duplicate the clinical and derived_molecular dataframes. They all don't have a value for GeneSymbol, so we'll use that to filter them out. All the other annotation columns are dropped, including a "geneSymbol" column that is a duplicate of the original GeneSymbol.
+            df = read_gct(file_path, index_cols=["Name", "Site", "Peptide", "Database_ID"], filter_col="GeneSymbol", prepare_annotations=prepare_annotations, genes=self._genes, gene_col="GeneSymbol")
+
+            if file_name == "prosp-brca-v3.1-acetylome-ratio-norm-NArm.gct.gz":
                 self._data["acetylproteomics"] = df
+            else:
+                self._data["phosphoproteomics"] = df
 
-            elif file_name == "prosp-brca-v3.1-gene-level-cnv-gistic2-all_data_by_genes.gct.gz":
-                df = pd.read_csv(file_path, sep='\t', skiprows=2, index_col=0, dtype=object) # First two rows of file aren't part of the dataframe. Also, due to extra metadata rows we're going to remove, all cols have mixed types, so we pass dtype=object for now.
-                df = df[df["geneSymbol"] != "na"] # There are several metadata rows at the beginning of the dataframe, which duplicate the clinical and derived_molecular dataframes. They all don't have a value for geneSymbol, so we'll use that to filter them out.
-                df = df.drop(columns="Cytoband")
-                df["geneSymbol"] = df["geneSymbol"].str.rsplit('|', n=1, expand=True)[0] # Some of the geneSymbols have the gene IDs appended to them, to get rid of duplicates. We're going to create a multiindex with all the gene names and gene IDs, so we can drop the appended IDs.
-                df = df.rename(columns={"geneSymbol": "Name", "Gene.ID": "Database_ID"})
-                df = df.set_index(["Name", "Database_ID"])
-                df = df.apply(pd.to_numeric) # Now that we've dropped all the extra metadata columns, convert everything to floats.
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                df.index.name = "Patient_ID"
-                self._data["CNV"] = df
-
-            elif file_name == "prosp-brca-v3.1-phosphoproteome-ratio-norm-NArm.gct.gz":
-                df = pd.read_csv(file_path, sep='\t', skiprows=2, dtype=object) # First two rows of file aren't part of the dataframe. Also, due to extra metadata rows we're going to remove, all cols have mixed types, so we pass dtype=object for now.
-                df = df[df["GeneSymbol"] != "na"] # There are several metadata rows at the beginning of the dataframe, which duplicate the clinical and derived_molecular dataframes. They all don't have a value for GeneSymbol, so we'll use that to filter them out.
+        elif file_name == "prosp-brca-v3.1-gene-level-cnv-gistic2-all_data_by_genes.gct.gz":
+            def prepare_annotations(annotations):
+                annotations["geneSymbol"] = annotations["geneSymbol"].str.rsplit('|', n=1, expand=True)[0] # Some of the geneSymbols have the gene IDs appended to them, to get rid of duplicates. We're going to create a multiindex with all the gene names and gene IDs, so we can drop the appended IDs.
+                return annotations.rename(columns={"geneSymbol": "Name", "Gene.ID": "Database_ID"})
 
-                # Prepare some columns we'll need later for the multiindex
-                df["variableSites"] = df["variableSites"].str.replace(r"[a-z\s]", "") # Get rid of all lowercase delimeters and whitespace in the sites
-                df = df.rename(columns={
-                    "GeneSymbol": "Name",
-                    "variableSites": "Site",
-                    "sequence": "Peptide", # We take this instead of sequenceVML, to match the other datasets' format
-                    "accession_numbers": "Database_ID" # We take all accession numbers they have, instead of the singular accession_number column
-                    })
+            df = read_gct(file_path, index_cols=["Name", "Database_ID"], filter_col="geneSymbol", prepare_annotations=prepare_annotations, genes=self._genes, gene_col="geneSymbol") # The metadata rows don't have a value for geneSymbol, so we use that to filter them out
+            self._data["CNV"] = df
 
-                # Some rows have at least one localized phosphorylation site, but also have other phosphorylations that aren't localized. We'll drop those rows, if their localized sites are duplicated in another row, to avoid creating duplicates, because we only preserve information about the localized sites in a given row. However, if the localized sites aren't duplicated in another row, we'll keep the row.
-                split_ids = df["id"].str.split('_', expand=True)
-                unlocalized_to_drop = df.index[~split_ids[3].eq(split_ids[4]) & df.duplicated(["Name", "Site", "Peptide", "Database_ID"], keep=False)] # Column 3 of the split "id" column is number of phosphorylations detected, and column 4 is number of phosphorylations localized, so if the two values aren't equal, the row has at least one unlocalized site
-                df = df.drop(index=unlocalized_to_drop)
-
-                # Give it a multiindex
-                df = df.set_index(["Name", "Site", "Peptide", "Database_ID"])                
-
-                df = df.drop(columns=["id", "id.description", "geneSymbol", "numColumnsVMsiteObserved", "bestScore", "bestDeltaForwardReverseScore",
-                "Best_scoreVML", "Best_numActualVMSites_sty", "Best_numLocalizedVMsites_sty", "sequenceVML",
-                "accessionNumber_VMsites_numVMsitesPresent_numVMsitesLocalizedBest_earliestVMsiteAA_latestVMsiteAA", "protein_mw", "species",
-                "speciesMulti", "orfCategory", "accession_number", "protein_group_num", "entry_name"]) # We don't need these. The dropped columns include a "geneSymbol" column that is a duplicate of the original GeneSymbol.
-                df = df.apply(pd.to_numeric) # Now that we've dropped all the extra metadata columns, convert everything to floats.
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                df.index.name = "Patient_ID"
-                self._data["phosphoproteomics"] = df
+        elif file_name == "prosp-brca-v3.1-proteome-ratio-norm-NArm.gct.gz":
+            df = read_gct(file_path, index_cols=["Name", "Database_ID"], filter_col="GeneSymbol",
+                prepare_annotations=lambda annotations: annotations.rename(columns={"GeneSymbol": "Name", "accession_numbers": "Database_ID"}), genes=self._genes, gene_col="GeneSymbol") # The dropped annotation columns include a "geneSymbol" column that is a duplicate of GeneSymbol.
+            self._data["proteomics"] = df
+
+        elif file_name == "prosp-brca-v3.1-rnaseq-fpkm-log2-row-norm-2comp.gct.gz":
+            df = read_gct(file_path, index_cols="geneSymbol", filter_col="geneSymbol", genes=self._genes, gene_col="geneSymbol")
+            self._data["transcriptomics"] = df
+
+        elif file_name == "prosp-brca-v3.1-sample-annotation.csv.gz":
+            df = pd.read_csv(file_path, index_col=0)
+            df = df.drop(columns="Participant") # This column is just a duplicate of the index
+            df = df.rename(columns={"Sample.IDs": "Replicate_Measurement_IDs", "Type": "Sample_Tumor_Normal"})
+            df = df.replace("unknown", np.nan)
+            df = df.astype({"Age.in.Month": np.float64})
+            df.index.name = "Patient_ID"
+            self._data["metadata"] = df
+
+        elif file_name == "Breast_One_Year_Clinical_Data_20160927.xls" and self._version == "3.1.1":
+            df = pd.read_excel(file_path)
+
+            # Replace redundant values for "not reported" with NaN
+            nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Reported / Unknown', 'Not Reported /Unknown',
+                'Not Applicable', 'not applicable', 'Not applicable;', 'na', 'Not Performed', 'Not Performed;',
+                'Unknown tumor status', 'Unknown Tumor Status','Unknown', 'unknown', 'Not specified', 'Not Reported/ Unknown;']
+
+            df = df.replace(nan_equivalents, np.nan)
 
-            elif file_name == "prosp-brca-v3.1-proteome-ratio-norm-NArm.gct.gz":
-                df = pd.read_csv(file_path, sep='\t', skiprows=2, dtype=object) # First two rows of file aren't part of the dataframe. Also, due to extra metadata rows we're going to remove, all cols have mixed types, so we pass dtype=object for now.
-                df = df[df["GeneSymbol"] != "na"] # There are several metadata rows at the beginning of the dataframe, which duplicate the clinical and derived_molecular dataframes. They all don't have a value for GeneSymbol, so we'll use that to filter them out.
-
-                df = df.rename(columns={"GeneSymbol": "Name", "accession_numbers": "Database_ID"})
-                df = df.set_index(["Name", "Database_ID"])
-                df = df.drop(columns=["id", "id.description", "geneSymbol", "numColumnsProteinObserved", "numSpectraProteinObserved",
-                "protein_mw", "percentCoverage", "numPepsUnique", "scoreUnique", "species", "orfCategory", "accession_number", 
-                "subgroupNum", "entry_name"]) # We don't need these. The dropped columns include a "geneSymbol" column that is a duplicate of GeneSymbol.
-                df = df.apply(pd.to_numeric) # Now that we've dropped all the extra metadata columns, convert everything to floats.
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                df.index.name = "Patient_ID"
-                self._data["proteomics"] = df
-
-            elif file_name == "prosp-brca-v3.1-rnaseq-fpkm-log2-row-norm-2comp.gct.gz":
-                df = pd.read_csv(file_path, sep='\t', skiprows=2, index_col=0, dtype=object) # First two rows of file aren't part of the dataframe. Also, due to extra metadata rows we're going to remove, all cols have mixed types, so we pass dtype=object for now.
-                df = df[df["geneSymbol"] != "na"] # There are several metadata rows at the beginning of the dataframe, which duplicate the clinical and derived_molecular dataframes. They all don't have a value for GeneSymbol, so we'll use that to filter them out.
-                df = df.set_index("geneSymbol")
-                df = df.drop(columns="description") # We don't need this.
-                df = df.apply(pd.to_numeric) # Now that we've dropped all the extra metadata columns, convert everything to floats.
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                df.index.name = "Patient_ID"
-                self._data["transcriptomics"] = df
-
-            elif file_name == "prosp-brca-v3.1-sample-annotation.csv.gz":
-                df = pd.read_csv(file_path, index_col=0)
-                df = df.drop(columns="Participant") # This column is just a duplicate of the index
-                df = df.rename(columns={"Sample.IDs": "Replicate_Measurement_IDs", "Type": "Sample_Tumor_Normal"})
-                df = df.replace("unknown", np.nan)
-                df = df.astype({"Age.in.Month": np.float64})
-                df.index.name = "Patient_ID"
-                self._data["metadata"] = df
-
-            elif file_name == "Breast_One_Year_Clinical_Data_20160927.xls" and self._version == "3.1.1":
-                df = pd.read_excel(file_path)
-
-                # Replace redundant values for "not reported" with NaN
-                nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Reported / Unknown', 'Not Reported /Unknown',
-                    'Not Applicable', 'not applicable', 'Not applicable;', 'na', 'Not Performed', 'Not Performed;',
-                    'Unknown tumor status', 'Unknown Tumor Status','Unknown', 'unknown', 'Not specified', 'Not Reported/ Unknown;']
-
-                df = df.replace(nan_equivalents, np.nan)
-
-                # Set and name the index
-                df = df.rename(columns={"Participant ID": "Patient_ID"})
-                df["Patient_ID"] = "X" + df["Patient_ID"]
-                df = df.set_index("Patient_ID")
-                df = df.sort_index()
-
-                self._data["followup"] = df
-
-            elif file_name == "prosp-brca-v3.0-v1.4.somatic.variants.070918.maf.gz" and self._version == "3.1.1":
-                df = pd.read_csv(file_path, sep='\t')
-                df = df.rename(columns={"Sample.ID": "Patient_ID"})
-
-                df = df[['Patient_ID','Hugo_Symbol','Variant_Classification','HGVSp_Short']]
-                df = df.rename(columns={
-                    "Hugo_Symbol":"Gene",
-                    "Variant_Classification":"Mutation",
-                    "HGVSp_Short":"Location"}) # Rename the columns we want to keep to the appropriate names
-
-                df = df.sort_values(by=["Patient_ID", "Gene"])
-                df = df.set_index("Patient_ID")
-
-                self._data["somatic_mutation"] = df
-
-        print(' ' * len(loading_msg), end='\r') # Erase the loading message
-        formatting_msg = "Formatting dataframes..."
-        print(formatting_msg, end='\r')
+            # Set and name the index
+            df = df.rename(columns={"Participant ID": "Patient_ID"})
+            df["Patient_ID"] = "X" + df["Patient_ID"]
+            df = df.set_index("Patient_ID")
+            df = df.sort_index()
+
+            self._data["followup"] = df
+
+        elif file_name == "prosp-brca-v3.0-v1.4.somatic.variants.070918.maf.gz" and self._version == "3.1.1":
+            df = pd.read_csv(file_path, sep='\t', usecols=["Sample.ID", "Hugo_Symbol", "Variant_Classification", "HGVSp_Short"]) # Only parse the columns we keep
+            df = df.rename(columns={"Sample.ID": "Patient_ID"})
+
+            df = df[['Patient_ID','Hugo_Symbol','Variant_Classification','HGVSp_Short']]
+            df = df.rename(columns={
+                "Hugo_Symbol":"Gene",
+                "Variant_Classification":"Mutation",
+                "HGVSp_Short":"Location"}) # Rename the columns we want to keep to the appropriate names
+
+            df = df.sort_values(by=["Patient_ID", "Gene"])
+            df = df.set_index("Patient_ID")
+
+            self._data["somatic_mutation"] = df
+
+    def _format_data(self):
+        """Format the dataframes in the self._data dict, once all the data files have been loaded."""
 
         # Separate the clinical and derived_molecular dataframes
         metadata = self._data["metadata"]
@@ -250,5 +189,3 @@ class Brca(Dataset):
 
         # Call function from dataframe_tools.py to standardize the names of the index and column axes
         self._data = standardize_axes_names(self._data)
-
-        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
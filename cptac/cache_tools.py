@@ -0,0 +1,383 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import collections
+import collections.abc
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from .file_tools import get_dataset_path, get_index, hash_file
+from .version import __version__
+
+CACHE_DIR_NAME = "cache"
+MANIFEST_FILE_NAME = "manifest.json"
+
+class LazyDataDict(collections.abc.MutableMapping):
+    """A dict of dataframes where some of the dataframes can be left on disk until they're first accessed. Dataframes assigned to it normally are just stored, like in a regular dict."""
+
+    def __init__(self):
+        self._tables = {} # Keys are table names. Values are the dataframes, or None if they haven't been loaded yet. This keeps the tables in order.
+        self._loaders = {} # Keys are the names of tables that haven't been loaded yet, values are functions that load them.
+        self._shapes = {} # Keys are the names of tables that haven't been loaded yet, values are their shapes.
+        self._memory_mapped = set() # The names of tables whose values are in read-only memory-mapped files
+
+    def add_lazy(self, name, loader, shape, memory_mapped=False):
+        """Add a table that will only be loaded the first time it's accessed.
+
+        Parameters:
+        name (str): The name of the table.
+        loader (function): A function that takes no arguments and returns the table.
+        shape (tuple of int): The shape of the table, so we can report it without loading the table.
+        memory_mapped (bool, optional): Whether the loader returns a table whose values are a read-only memory-mapped file. Default False.
+        """
+        self._tables[name] = None
+        self._loaders[name] = loader
+        self._shapes[name] = tuple(shape)
+        if memory_mapped:
+            self._memory_mapped.add(name)
+        else:
+            self._memory_mapped.discard(name)
+
+    def is_memory_mapped(self, name):
+        """Return whether the values of the table with the given name are a read-only memory-mapped file, so they must not be edited in place."""
+        return name in self._memory_mapped
+
+    def is_loaded(self, name):
+        """Return whether the table with the given name has already been loaded into memory."""
+        return name in self._tables and name not in self._loaders
+
+    def get_shape(self, name):
+        """Get the shape of a table, without loading it if it hasn't been loaded yet."""
+        if name in self._loaders:
+            return self._shapes[name]
+        return self[name].shape
+
+    def __getitem__(self, name):
+        if name in self._loaders:
+            self._tables[name] = self._loaders[name]()
+            del self._loaders[name]
+            del self._shapes[name]
+        return self._tables[name]
+
+    def __setitem__(self, name, df):
+        self._loaders.pop(name, None)
+        self._shapes.pop(name, None)
+        self._memory_mapped.discard(name)
+        self._tables[name] = df
+
+    def __delitem__(self, name):
+        del self._tables[name]
+        self._loaders.pop(name, None)
+        self._shapes.pop(name, None)
+        self._memory_mapped.discard(name)
+
+    def __contains__(self, name):
+        return name in self._tables # The default would get the table, which would load it
+
+    def __iter__(self):
+        return iter(self._tables)
+
+    def __len__(self):
+        return len(self._tables)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self._tables.keys())})"
+
+class ResultCache:
+    """An in-memory least recently used cache of dataframes, such as the results of joins, limited by the total memory the dataframes use. Safe to use from several threads."""
+
+    def __init__(self, max_bytes):
+        """
+        Parameters:
+        max_bytes (int): The most memory the cached dataframes can use, in bytes. Once a new result would go over it, the least recently used results are dropped. A result bigger than this on its own isn't cached.
+        """
+        self._entries = collections.OrderedDict() # Keys are the cache keys, values are tuples of the dataframe and its size in bytes. The most recently used are at the end.
+        self._max_bytes = int(max_bytes)
+        self._current_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get a cached dataframe, and mark it as the most recently used.
+
+        Parameters:
+        key (hashable): The cache key.
+
+        Returns:
+        pandas.DataFrame: The cached dataframe, or None if there isn't one for the key.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key, df, size):
+        """Cache a dataframe, dropping the least recently used dataframes if needed to stay within the memory budget.
+
+        Parameters:
+        key (hashable): The cache key.
+        df (pandas.DataFrame): The dataframe to cache.
+        size (int): The memory the dataframe uses, in bytes.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._current_bytes -= self._entries.pop(key)[1]
+            if size > self._max_bytes:
+                return
+
+            while self._current_bytes + size > self._max_bytes:
+                old_key, (old_df, old_size) = self._entries.popitem(last=False)
+                self._current_bytes -= old_size
+                self._evictions += 1
+
+            self._entries[key] = (df, size)
+            self._current_bytes += size
+
+    def clear(self):
+        """Drop all the cached dataframes. The counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def info(self):
+        """Get the cache's counters and memory use.
+
+        Returns:
+        dict: "hits" and "misses" count the lookups that did and didn't find a cached result, "evictions" counts the results dropped to stay within the memory budget, "entries" is the number of cached results, "current_bytes" is the memory they use, and "max_bytes" is the memory budget.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self._max_bytes,
+            }
+
+def get_cache_path(dataset, version):
+    """Get the path to the directory where the parsed dataframes for a version of a dataset are cached. This sits next to the version directories, but its name doesn't start with the version directory prefix, so get_latest_installed won't mistake it for a data version.
+
+    Parameters:
+    dataset (str): The name of the dataset. Must be all lowercase.
+    version (str): The data version. Must have already been validated.
+
+    Returns:
+    str: The path to the cache directory for that version of the dataset.
+    """
+    dataset_path = get_dataset_path(dataset)
+    return os.path.join(dataset_path, CACHE_DIR_NAME, f"{dataset}_v{version}")
+
+def get_cache_key(dataset, version, data_files_paths, source_paths, options=None):
+    """Compute the key that identifies one set of cached dataframes. The key changes whenever a data file is replaced, the parsing code changes, or the package or pandas version changes.
+
+    Parameters:
+    dataset (str): The name of the dataset. Must be all lowercase.
+    version (str): The data version. Must have already been validated.
+    data_files_paths (list of str): The paths to the data files the dataframes are parsed from.
+    source_paths (list of str): The paths to the source files of the code that parses and formats the dataframes.
+    options (dict, optional): Any loading options that change the contents of the parsed dataframes. Default None.
+
+    Returns:
+    str: The cache key, as an md5 hex digest.
+    """
+    version_index = get_index(dataset).get(version, {})
+
+    key_parts = [__version__, pd.__version__, dataset, version]
+
+    for file_path in data_files_paths:
+        file_name = file_path.split(os.sep)[-1]
+        server_hash = version_index.get(file_name, {}).get("hash") # The md5 hash recorded for the file in index.txt
+        file_stat = os.stat(file_path) # The size and modification time catch files that were replaced without updating the index
+        key_parts.append(f"{file_name}\t{server_hash}\t{file_stat.st_size}\t{file_stat.st_mtime_ns}")
+
+    for source_path in source_paths:
+        key_parts.append(hash_file(source_path))
+
+    if options is not None:
+        key_parts.append(repr(sorted(options.items())))
+
+    hasher = hashlib.md5()
+    hasher.update("\n".join(key_parts).encode("utf-8"))
+    return hasher.hexdigest()
+
+def read_cache(dataset, version, cache_key, memmap=False):
+    """Read the dataframes and definitions cached under a given key.
+
+    Parameters:
+    dataset (str): The name of the dataset. Must be all lowercase.
+    version (str): The data version. Must have already been validated.
+    cache_key (str): The cache key, as returned by get_cache_key.
+    memmap (bool, optional): Whether to memory-map the values of the tables that were cached as numeric matrices, instead of reading them into memory. The memory-mapped values are read-only. Default False.
+
+    Returns:
+    tuple of LazyDataDict, dict: The dataframes, with table names as keys, and the definitions dict. Each dataframe is only read from disk the first time it's accessed. Returns None if nothing is cached under that key.
+    """
+    key_path = os.path.join(get_cache_path(dataset, version), cache_key)
+    manifest_path = os.path.join(key_path, MANIFEST_FILE_NAME)
+
+    # The manifest is only written once all the tables are written, so if it's missing, the cache is incomplete
+    if not os.path.isfile(manifest_path):
+        return None
+
+    with open(manifest_path, "r") as manifest_file:
+        manifest = json.load(manifest_file)
+
+    data = LazyDataDict()
+    for name, table_info in manifest["tables"].items():
+        if table_info.get("format") == "matrix":
+            loader = functools.partial(_read_matrix_table, key_path, table_info, memmap)
+            data.add_lazy(name, loader, table_info["shape"], memory_mapped=memmap)
+        else:
+            table_path = os.path.join(key_path, table_info["file"])
+            data.add_lazy(name, functools.partial(pd.read_pickle, table_path), table_info["shape"])
+
+    return data, manifest["definitions"]
+
+def write_cache(dataset, version, cache_key, data, definitions, options=None):
+    """Write formatted dataframes and definitions to the cache under a given key, and delete anything cached under other keys with the same loading options, since it's out of date. Caches for other loading options are kept, so switching between them doesn't mean parsing the data again, and datasets already loaded with them can still read their tables.
+
+    Tables that are entirely floats, like the omics tables, are written as a .npy file of their values, with the index and columns pickled in small sidecar files, so their values can be memory-mapped when they're read. Other tables are written as pickle files, because the clinical tables have columns of mixed types and the omics tables have column multiindexes, neither of which columnar formats like Parquet or Feather can round trip without an extra dependency.
+
+    Parameters:
+    dataset (str): The name of the dataset. Must be all lowercase.
+    version (str): The data version. Must have already been validated.
+    cache_key (str): The cache key, as returned by get_cache_key.
+    data (dict): The formatted dataframes to cache, with table names as keys.
+    definitions (dict): The dataset's definitions.
+    options (dict, optional): The loading options that were passed to get_cache_key for this key. Default None.
+
+    Returns:
+    None
+    """
+    cache_path = get_cache_path(dataset, version)
+    key_path = os.path.join(cache_path, cache_key)
+    os.makedirs(cache_path, exist_ok=True)
+
+    # Write everything into a temporary directory, then rename it, so other processes loading the same dataset never see a partially written cache
+    temp_path = tempfile.mkdtemp(prefix=".tmp_", dir=cache_path)
+    try:
+        manifest = {"tables": {}, "definitions": definitions, "options": options}
+        for name, df in data.items():
+            if _is_float_matrix(df):
+                manifest["tables"][name] = _write_matrix_table(temp_path, name, df)
+            else:
+                file_name = f"{name}.pkl"
+                df.to_pickle(os.path.join(temp_path, file_name))
+                manifest["tables"][name] = {"file": file_name, "shape": list(df.shape)}
+
+        with open(os.path.join(temp_path, MANIFEST_FILE_NAME), "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+
+        try:
+            os.rename(temp_path, key_path)
+        except OSError:
+            if not os.path.isdir(key_path): # If another process already wrote this key, we just drop our copy
+                raise
+    finally:
+        if os.path.isdir(temp_path):
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+    # Delete any caches under old keys for the same options
+    for entry in os.listdir(cache_path):
+        entry_path = os.path.join(cache_path, entry)
+        if entry != cache_key and not entry.startswith(".tmp_") and os.path.isdir(entry_path):
+            try:
+                with open(os.path.join(entry_path, MANIFEST_FILE_NAME), "r") as manifest_file:
+                    entry_options = json.load(manifest_file).get("options")
+            except (OSError, ValueError): # No readable manifest means the cache is incomplete, so it's no use to anyone
+                entry_options = options
+
+            if entry_options == options:
+                shutil.rmtree(entry_path, ignore_errors=True)
+
+def clear_cache(dataset, version=None):
+    """Delete the cached dataframes for a dataset.
+
+    Parameters:
+    dataset (str): The name of the dataset. Must be all lowercase.
+    version (str, optional): The data version to clear the cache for. Default None will clear the cache for all versions.
+
+    Returns:
+    None
+    """
+    if version is None:
+        path = os.path.join(get_dataset_path(dataset), CACHE_DIR_NAME)
+    else:
+        path = get_cache_path(dataset, version)
+
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+
+def _is_float_matrix(df):
+    """Return whether all of a dataframe's columns are the same float dtype, so its values can be stored as one matrix."""
+    dtypes = set(df.dtypes)
+    return df.shape[1] > 0 and len(dtypes) == 1 and pd.api.types.is_float_dtype(dtypes.pop())
+
+def _write_matrix_table(dir_path, name, df):
+    """Write a table whose columns are all the same float dtype as a .npy file of its values, plus sidecar files for its index and columns.
+
+    Parameters:
+    dir_path (str): The directory to write the files in.
+    name (str): The name of the table.
+    df (pandas.DataFrame): The table.
+
+    Returns:
+    dict: The manifest entry for the table.
+    """
+    table_info = {
+        "format": "matrix",
+        "file": f"{name}.values.npy",
+        "index_file": f"{name}.index.pkl",
+        "columns_file": f"{name}.columns.pkl",
+        "shape": list(df.shape),
+        "index_name": df.index.name, # A multiindex's name isn't kept when it's pickled on its own, so we keep the axis names here
+        "columns_name": df.columns.name,
+    }
+
+    # pandas stores each column's values contiguously, so the values come out in Fortran order, and np.save keeps that order. That way the memory-mapped matrix can be wrapped in a dataframe without reordering it.
+    np.save(os.path.join(dir_path, table_info["file"]), df.to_numpy(), allow_pickle=False)
+    pd.to_pickle(df.index, os.path.join(dir_path, table_info["index_file"]))
+    pd.to_pickle(df.columns, os.path.join(dir_path, table_info["columns_file"]))
+
+    return table_info
+
+def _read_matrix_table(dir_path, table_info, memmap):
+    """Read a table that was written by _write_matrix_table.
+
+    Parameters:
+    dir_path (str): The directory the files are in.
+    table_info (dict): The manifest entry for the table.
+    memmap (bool): Whether to memory-map the values read-only, instead of reading them into memory.
+
+    Returns:
+    pandas.DataFrame: The table.
+    """
+    values = np.load(os.path.join(dir_path, table_info["file"]), mmap_mode="r" if memmap else None, allow_pickle=False)
+    index = pd.read_pickle(os.path.join(dir_path, table_info["index_file"]))
+    columns = pd.read_pickle(os.path.join(dir_path, table_info["columns_file"]))
+
+    df = pd.DataFrame(values, index=index, columns=columns, copy=False)
+    df.index.name = table_info["index_name"]
+    df.columns.name = table_info["columns_name"]
+    return df
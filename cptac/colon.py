@@ -19,12 +19,18 @@ from .exceptions import FailedReindexWarning, ReindexMapError
 
 class Colon(Dataset):
 
-    def __init__(self, version="latest", no_internet=False):
+    def __init__(self, version="latest", no_internet=False, use_cache=True, n_jobs=1, precision=None, memmap=None, genes=None, tables=None):
         """Load all of the colon dataframes as values in the self._data dict variable, with names as keys, and format them properly.
 
         Parameters:
         version (str, optional): The version number to load, or the string "latest" to just load the latest building. Default is "latest".
         no_internet (bool, optional): Whether to skip the index update step because it requires an internet connection. This will be skipped automatically if there is no internet at all, but you may want to manually skip it if you have a spotty internet connection. Default is False.
+        use_cache (bool, optional): Whether to load the formatted dataframes from the cache, if this version of the data has already been parsed, and to cache them if it hasn't. Default True.
+        n_jobs (int, optional): The number of processes to parse the data files with, if they aren't loaded from the cache. Pass -1 to use all available cores. Default 1 parses them all in this process.
+        precision (str, optional): The float dtype to store the omics dataframes in, either "float64" or "float32". float32 halves the memory used by the omics values. Default None uses the package-wide default set with cptac.set_option("precision", ...), which starts as "float64".
+        memmap (bool, optional): Whether to leave the values of the numeric omics dataframes in read-only memory-mapped files in the cache, so all the processes on a machine that load this dataset share one copy of them. Requires use_cache=True. Default None uses the package-wide default set with cptac.set_option("memmap", ...), which starts as False.
+        genes (str or list of str, optional): If given, only keep the data for these genes in the omics dataframes and the somatic_mutation dataframe. The miRNA, circular_RNA, metabolomics and lipidomics dataframes aren't named by gene, so they're kept whole. Lines for other genes are skipped before parsing where the data files allow it. Default None keeps all genes.
+        tables (str or list of str, optional): If given, only keep these dataframes, plus the clinical dataframe. Default None keeps all dataframes.
         """
 
         # Set some needed variables, and pass them to the parent Dataset class __init__ function
@@ -56,52 +62,49 @@ class Colon(Dataset):
                 "transcriptomics.gz"],
         }
 
-        super().__init__(cancer_type="colon", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
+        super().__init__(cancer_type="colon", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet, use_cache=use_cache, n_jobs=n_jobs, precision=precision, memmap=memmap, genes=genes, tables=tables)
 
-        # Load the data into dataframes in the self._data dict
-        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
-        for file_path in self._data_files_paths: # Loops through files variable
+    def _load_data_file(self, file_path):
+        """Load the data file at the given path into one or more dataframes in the self._data dict.
 
-            # Print a loading message. We add a dot every time, so the user knows it's not frozen.
-            loading_msg = loading_msg + "."
-            print(loading_msg, end='\r')
-
-            path_elements = file_path.split(os.sep) # Get a list of the levels of the path
-            file_name = path_elements[-1] # The last element will be the name of the file
-            file_name_split = file_name.split(".")
-            df_name = file_name_split[0] # Our dataframe name will be the first section of file name (i.e. proteomics.txt.gz becomes proteomics)
+        Parameters:
+        file_path (str): The path to the data file to load.
+        """
+        path_elements = file_path.split(os.sep) # Get a list of the levels of the path
+        file_name = path_elements[-1] # The last element will be the name of the file
+        file_name_split = file_name.split(".")
+        df_name = file_name_split[0] # Our dataframe name will be the first section of file name (i.e. proteomics.txt.gz becomes proteomics)
 
-            if file_name == 'Colon_One_Year_Clinical_Data_20160927.xls' and self._version == "0.0.1":
-                df = pd.read_excel(file_path)
+        if file_name == 'Colon_One_Year_Clinical_Data_20160927.xls' and self._version == "0.0.1":
+            df = pd.read_excel(file_path)
 
-                # Replace redundant values for "not reported" with NaN
-                nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable',
-                    'na', 'unknown', 'Not Performed', 'Unknown tumor status']
+            # Replace redundant values for "not reported" with NaN
+            nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable',
+                'na', 'unknown', 'Not Performed', 'Unknown tumor status']
 
-                df = df.replace(nan_equivalents, np.nan)
+            df = df.replace(nan_equivalents, np.nan)
 
-                # Rename and set index
-                df = df.rename(columns={'PPID': 'Patient_ID'})
-                df = df.set_index("Patient_ID")
-                df = df.sort_index()
+            # Rename and set index
+            df = df.rename(columns={'PPID': 'Patient_ID'})
+            df = df.set_index("Patient_ID")
+            df = df.sort_index()
 
-                self._data["followup"] = df
+            self._data["followup"] = df
 
-            elif file_name == "Human__CPTAC_COAD__VU__SCNA__ExomeSeq__01_28_2016__BCM__Gene__BCM_CopyWriteR_GISTIC2.cct.gz" and self._version == "0.0.1":
-                df = pd.read_csv(file_path, sep="\t",index_col=0)
-                df = df.sort_index()
-                df = df.transpose()
-                self._data["CNV"] = df
+        elif file_name == "Human__CPTAC_COAD__VU__SCNA__ExomeSeq__01_28_2016__BCM__Gene__BCM_CopyWriteR_GISTIC2.cct.gz" and self._version == "0.0.1":
+            df = pd.read_csv(file_path, sep="\t",index_col=0)
+            df = df.sort_index()
+            df = df.transpose()
+            self._data["CNV"] = df
 
-            else:
-                df = pd.read_csv(file_path, sep="\t",index_col=0)
-                df = df.sort_index()
-                df = df.transpose()
-                self._data[df_name] = df # Maps dataframe name to dataframe. self._data was initialized when we called the parent class __init__()
+        else:
+            df = pd.read_csv(file_path, sep="\t",index_col=0)
+            df = df.sort_index()
+            df = df.transpose()
+            self._data[df_name] = df # Maps dataframe name to dataframe. self._data was initialized when we called the parent class __init__()
 
-        print(' ' * len(loading_msg), end='\r') # Erase the loading message
-        formatting_msg = "Formatting dataframes..."
-        print(formatting_msg, end='\r')
+    def _format_data(self):
+        """Format the dataframes in the self._data dict, once all the data files have been loaded."""
 
         # Reformat and rename the somatic_mutation dataframe
         mut = self._data["mutation"]
@@ -185,8 +188,6 @@ class Colon(Dataset):
         # Call function from dataframe_tools.py to standardize the names of the index and column axes
         self._data = standardize_axes_names(self._data)
 
-        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
-
     # Overload the default how_to_cite function, to provide the specific publication information for the Colon dataset
     def how_to_cite(self):
         """Print instructions for citing the data."""
@@ -9,30 +9,421 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import contextlib
+import functools
+import gzip
+import io
+import re
+import threading
+import time
 import pandas as pd
 import numpy as np
 import warnings
 from .exceptions import CptacDevError, ReindexMapError, FailedReindexWarning
 
+# The records of the formatting steps run so far in each thread, while the steps are being profiled. Its records attribute is None if they aren't. See profile_steps. It's per thread, so datasets loaded at the same time in different threads get their own records.
+_step_records = threading.local()
+
+@contextlib.contextmanager
+def profile_steps():
+    """Record how long each formatting step marked with the profiled_step decorator takes, and how much memory its result uses, while this context is active in this thread.
+
+    Returns:
+    list of dict: A list that a record is added to for each step that runs. Each record has the name of the step, its wall time in seconds, and the memory used by its result in bytes.
+    """
+    previous_records = getattr(_step_records, "records", None)
+    _step_records.records = []
+    try:
+        yield _step_records.records
+    finally:
+        _step_records.records = previous_records
+
+def profiled_step(func):
+    """Decorator to include a formatting step in the records made by profile_steps."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        records = getattr(_step_records, "records", None)
+        if records is None:
+            return func(*args, **kwargs)
+
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        records.append({"step": func.__name__, "seconds": time.perf_counter() - start, "memory_bytes": get_memory_usage(result)})
+        return result
+
+    return wrapper
+
+def get_memory_usage(obj):
+    """Get the memory used by a dataframe, including its index and columns and the contents of any string columns, or the total for a dict of dataframes.
+
+    Parameters:
+    obj (pandas.DataFrame, pandas.Index, or dict of pandas.DataFrame): The object to measure.
+
+    Returns:
+    int: The memory used, in bytes.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum() + obj.columns.memory_usage(deep=True))
+    elif isinstance(obj, pd.Index):
+        return int(obj.memory_usage(deep=True))
+    elif isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    else:
+        return sum(get_memory_usage(df) for df in obj.values())
+
+@profiled_step
 def unionize_indices(dataset, exclude=[]):
     """Return a union of all indices in a dataset, without duplicates.
 
     Parameters:
-    dataset (dict of str: pandas.DataFrame): The data dictionary containing the dataset.
-    exclude (str or list of str, optional): A list of dataframes to exclude when unionizing indices.
+    dataset (dict of str: pandas.DataFrame, or list of pandas.Index): The data dictionary containing the dataset, or just a list of the indices to unionize.
+    exclude (str or list of str, optional): A list of dataframes to exclude when unionizing indices. Only used if a data dictionary is passed.
 
     Returns:
-    pandas.Index: Union of all indices in the dataset, without duplicates.
+    pandas.Index: Union of all indices in the dataset, without duplicates. It's sorted, if the values can be sorted.
     """
     if isinstance(exclude, str): # If it's a single dataframe name, make it a list so we can treat everything the same
         exclude = [exclude]
 
-    indices = [df.index for name, df in dataset.items() if name not in exclude]
-    master_index = pd.Index([])
-    for index in indices:
-        master_index = master_index.union(index)
-        master_index = master_index.drop_duplicates()
-    return master_index
+    if isinstance(dataset, list):
+        indices = dataset
+    else:
+        indices = [df.index for name, df in dataset.items() if name not in exclude]
+
+    if len(indices) == 0:
+        return pd.Index([])
+
+    # Concatenating all the indices and dropping duplicates once is linear in the total number of rows, unlike unionizing them one at a time
+    master_index = pd.Index([]).append(indices).unique()
+
+    # Index.union doesn't sort when all the non-empty indices are the same, so we do the same. Values that can't be compared are left unsorted.
+    non_empty = [index for index in indices if len(index) > 0]
+    if not all(index.equals(non_empty[0]) for index in non_empty[1:]):
+        try:
+            master_index = master_index.sort_values()
+        except TypeError:
+            pass
+
+    return master_index.rename(None)
+
+def select_gene_lines(file_path, genes, gene_col=0, num_header_lines=1):
+    """Read only the lines of a tab-separated feature file that could be for the given genes, so a table can be parsed from just those lines. This is checked on the raw text, before any values are parsed. The check is loose: a line is kept if the field in the gene column, or its part before a "|", "_", or the last "-", is one of the genes, since some files append IDs or sites to the gene names. The exact selection is done once the table is formatted.
+
+    Parameters:
+    file_path (str): The path to the file. May be gzipped.
+    genes (list of str): The genes to keep. If None, nothing is filtered.
+    gene_col (int, optional): The position of the column with the gene names. Default 0.
+    num_header_lines (int, optional): The number of lines at the start of the file to always keep. Default 1.
+
+    Returns:
+    str or io.StringIO: If genes is None, the original file path. Otherwise, a buffer with the header lines and the selected lines, which can be passed to pd.read_csv in place of the file path.
+    """
+    if genes is None:
+        return file_path
+
+    genes = set(genes)
+    kept_lines = []
+    opener = gzip.open if file_path.endswith(".gz") else open
+    with opener(file_path, "rt") as feature_file:
+        for line_num, line in enumerate(feature_file):
+            if line_num < num_header_lines:
+                kept_lines.append(line)
+                continue
+
+            fields = line.split("\t", gene_col + 1)
+            if len(fields) <= gene_col:
+                continue
+            field = fields[gene_col].strip()
+            if field in genes or field.split("|", 1)[0] in genes or field.split("_", 1)[0] in genes or field.rsplit("-", 1)[0] in genes:
+                kept_lines.append(line)
+
+    return io.StringIO("".join(kept_lines))
+
+# The omics dataframes whose columns aren't named by gene, so selecting genes doesn't apply to them
+NON_GENE_DFS = ["circular_RNA", "lipidomics", "metabolomics", "miRNA"]
+
+@profiled_step
+def select_genes(data_dict, names, genes):
+    """For the dataframes with the given names, keep only the columns for the given genes. The somatic_mutation dataframe instead keeps only the rows for those genes, and the somatic_mutation_binary dataframe keeps the columns whose names are one of the genes followed by an underscore and a mutation. The dataframes in NON_GENE_DFS are left whole, since their columns aren't named by gene.
+
+    Parameters:
+    data_dict (dict): The dataframe dictionary of the dataset.
+    names (list of str): The names of the dataframes to filter.
+    genes (list of str): The genes to keep.
+
+    Returns:
+    dict: The dataframe dictionary, with the dataframes filtered. Keys are str of dataframe names, values are pandas.DataFrame
+    """
+    for name in names:
+        if name not in data_dict.keys() or name in NON_GENE_DFS:
+            continue
+
+        df = data_dict[name]
+        if name == "somatic_mutation":
+            df = df[df["Gene"].isin(genes)]
+        elif name == "somatic_mutation_binary":
+            df = df.loc[:, df.columns.str.split("_", n=1).str[0].isin(genes)]
+        elif isinstance(df.columns, pd.MultiIndex):
+            df = df.loc[:, df.columns.get_level_values(0).isin(genes)]
+        else:
+            df = df.loc[:, df.columns.isin(genes)]
+        data_dict[name] = df
+
+    return data_dict
+
+def read_gct(file_path, index_cols, filter_col=None, prepare_annotations=None, genes=None, gene_col=None):
+    """Read a GCT file into a dataframe with samples as the index and features as the columns. The row annotation columns are kept separate from the quantitative block, which is parsed straight into floats, so we never build and transpose a table of strings.
+
+    Parameters:
+    file_path (str): The path to the GCT file. May be gzipped.
+    index_cols (str or list of str): The row annotation column(s) to make the column index of the returned dataframe from, with the names they have after prepare_annotations is applied. A list of more than one name gives a column multiindex. All other row annotation columns are dropped.
+    filter_col (str, optional): A row annotation column to filter features by. Rows with "na" in this column are dropped. Default None keeps all rows.
+    prepare_annotations (function, optional): A function that takes the dataframe of row annotations, which has one row per feature, and returns it with any columns edited or renamed, or any rows dropped. Rows dropped here are dropped from the quantitative data too, but the index of the annotations must otherwise be left alone. Default None leaves the annotations as they are.
+    genes (list of str, optional): If given, only the lines for these genes are parsed. See select_gene_lines for how lines are matched. Default None parses all lines.
+    gene_col (str, optional): The row annotation column with the gene names, as it's named in the file. Required if genes is given.
+
+    Returns:
+    pandas.DataFrame: The quantitative data from the file, as floats, with the samples as the index and the features as the columns. Both axes are sorted.
+    """
+    # The first line is the GCT version, and the second line has the dimensions. For GCT 1.3 they're the number of features, samples, row annotation columns, and column annotation rows.
+    opener = gzip.open if file_path.endswith(".gz") else open
+    with opener(file_path, "rt") as gct_file:
+        gct_version = gct_file.readline().strip()
+        dims = [int(dim) for dim in gct_file.readline().split()]
+
+    if gct_version == "#1.3":
+        num_row_meta = dims[2]
+        num_col_meta = dims[3]
+    elif gct_version == "#1.2":
+        num_row_meta = 1 # GCT 1.2 files only have a Name and a Description column before the samples
+        num_col_meta = 0
+    else:
+        raise CptacDevError(f"Unrecognized GCT version '{gct_version}' in file {file_path}.")
+
+    num_annotation_cols = num_row_meta + 1 # The first column is the feature ID
+
+    # Read just the header line the normal way, so duplicate column names get deduplicated the same way they would if we read the whole file with a header
+    col_names = pd.read_csv(file_path, sep="\t", skiprows=2, nrows=0).columns
+
+    # If we only want some genes, drop the other lines before anything is parsed
+    if genes is not None:
+        source = select_gene_lines(file_path, genes, gene_col=list(col_names).index(gene_col), num_header_lines=3 + num_col_meta)
+    else:
+        source = file_path
+
+    # Skip the column annotation rows and read the rest of the file with the annotation columns as strings and everything else straight to floats
+    dtypes = {i: object for i in range(num_annotation_cols)}
+    dtypes.update({i: np.float64 for i in range(num_annotation_cols, len(col_names))})
+    df = pd.read_csv(source, sep="\t", header=None, skiprows=3 + num_col_meta, dtype=dtypes, names=range(len(col_names)))
+
+    annotations = df.iloc[:, :num_annotation_cols]
+    annotations.columns = col_names[:num_annotation_cols]
+    values = df.iloc[:, num_annotation_cols:].to_numpy(dtype=np.float64)
+    del df
+
+    if filter_col is not None:
+        annotations = annotations[annotations[filter_col] != "na"]
+
+    if prepare_annotations is not None:
+        annotations = prepare_annotations(annotations.copy())
+
+    # The annotations still have the default integer index from reading the file, so it gives the positions of the rows we kept
+    if len(annotations.index) < values.shape[0]:
+        values = values[annotations.index.to_numpy()]
+
+    if isinstance(index_cols, str):
+        columns = pd.Index(annotations[index_cols], name=index_cols)
+    elif len(index_cols) == 1:
+        columns = pd.Index(annotations[index_cols[0]], name=index_cols[0])
+    else:
+        columns = pd.MultiIndex.from_frame(annotations[index_cols])
+
+    # Transposing the ndarray is just a view, and the dataframe stores it back in the original feature-major layout, so this doesn't copy the data
+    df = pd.DataFrame(values.T, index=pd.Index(col_names[num_annotation_cols:], name="Patient_ID"), columns=columns, copy=False)
+    df = df.sort_index(axis="columns", kind="mergesort") # A stable sort keeps duplicate features in file order, so they come out in the same order when only some genes are read
+    df = df.sort_index()
+    return df
+
+@profiled_step
+def convert_float_precision(data_dict, names, precision):
+    """Convert the dataframes with the given names to the given float precision. Dataframes that have any columns that aren't floats, or that aren't in the dictionary, are left alone.
+
+    Parameters:
+    data_dict (dict): The dataframe dictionary of the dataset.
+    names (list of str): The names of the dataframes to convert.
+    precision (str): The float dtype to convert to, either "float64" or "float32".
+
+    Returns:
+    dict: The dataframe dictionary, with the dataframes converted. Keys are str of dataframe names, values are pandas.DataFrame
+    """
+    for name in names:
+        if name not in data_dict.keys():
+            continue
+
+        df = data_dict[name]
+        if df.shape[1] > 0 and all(pd.api.types.is_float_dtype(dtype) for dtype in df.dtypes) and any(dtype != precision for dtype in df.dtypes):
+            df = df.astype(precision)
+            data_dict[name] = df
+
+    return data_dict
+
+def copy_on_write_enabled():
+    """Check whether pandas copy-on-write is on. It's always on starting with pandas 3.0, and can be turned on in pandas 2 with pd.set_option("mode.copy_on_write", True).
+
+    Returns:
+    bool: Whether copy-on-write is on.
+    """
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    try:
+        return pd.get_option("mode.copy_on_write") is True
+    except KeyError: # Versions before pandas 1.5 don't have the option
+        return False
+
+def set_columns_at(df, positions, values):
+    """Replace the values of the columns at the given positions of a dataframe, in place. The replaced columns get the object dtype. This works even if the dataframe has duplicate column names.
+
+    Parameters:
+    df (pandas.DataFrame): The dataframe to edit.
+    positions (numpy.ndarray of int): The positions of the columns to replace.
+    values (numpy.ndarray): The new values, with one row for each row of df and one column for each position.
+
+    Returns:
+    None
+    """
+    values = pd.DataFrame(values, index=df.index, dtype=object)
+    if hasattr(df, "isetitem"):
+        df.isetitem(positions, values)
+    else: # Versions before pandas 1.5 don't have isetitem, but assigning a column with iloc replaces its values in place
+        for i, position in enumerate(positions):
+            df.iloc[:, position] = values.iloc[:, i]
+
+def view_dataframe(df):
+    """Get a dataframe that shares its values with the given dataframe without copying them, if that can be done without edits on either one affecting the other.
+
+    With copy-on-write, this is a shallow copy, and pandas copies the values the first time either dataframe is edited. Without it, a dataframe whose columns all have the same numeric numpy dtype is returned with a read-only view of its values, so editing its values in place raises an error instead of changing the original. Any other dataframe is deep copied.
+
+    Parameters:
+    df (pandas.DataFrame): The dataframe to view.
+
+    Returns:
+    pandas.DataFrame: The view, or a deep copy of the dataframe.
+    """
+    if copy_on_write_enabled():
+        view = df.copy(deep=False)
+    elif df.shape[1] > 0 and len(set(df.dtypes)) == 1 and isinstance(df.dtypes.iloc[0], np.dtype) and df.dtypes.iloc[0].kind in "biufc":
+        values = df.to_numpy(copy=False).view()
+        values.flags.writeable = False
+        view = pd.DataFrame(values, index=df.index, columns=df.columns, copy=False)
+    else:
+        return df.copy(deep=True)
+
+    # Give the view its own axes, so renaming them doesn't rename the original's
+    view.index = df.index.copy()
+    view.columns = df.columns.copy()
+    return view
+
+def get_level_positions(index, level):
+    """Get the positions of the values in a level of an index, e.g. the positions of all the columns for each gene in an omics dataframe, so they can be looked up without searching the whole index.
+
+    Parameters:
+    index (pandas.Index or pandas.MultiIndex): The index.
+    level (str or int): The name or number of the level to use. Ignored if the index isn't a MultiIndex.
+
+    Returns:
+    dict: Keys are the values in the level, values are numpy.ndarray of int of the positions where each value occurs, in increasing order. NaN values are left out.
+    """
+    values = index.get_level_values(level) if isinstance(index, pd.MultiIndex) else index
+    codes, uniques = pd.factorize(values) # NaNs get a code of -1
+    order = np.argsort(codes, kind="stable")
+    order = order[np.count_nonzero(codes == -1):] # The NaNs sort first, and we leave them out
+    counts = np.bincount(codes[codes != -1], minlength=len(uniques))
+    return dict(zip(uniques, np.split(order, np.cumsum(counts)[:-1])))
+
+def get_gene_prefix_index(names, separator="_"):
+    """Index column names that start with a gene symbol, like the "TP53_p.R273H" columns of the somatic_mutation_binary dataframe, by their gene, so the columns for a gene, or for all genes starting with a prefix, can be looked up without searching all the names.
+
+    Parameters:
+    names (pandas.Index or array-like of str): The column names.
+    separator (str, optional): The separator after the gene symbol in each name. Names without it are indexed under the whole name. Default "_".
+
+    Returns:
+    dict: "positions" (dict) has the positions of the names for each gene, like get_level_positions. "genes" (numpy.ndarray of str) has the gene symbols, sorted, for prefix searches with get_prefix_positions.
+    """
+    genes = pd.Index(names).str.split(separator, n=1).str[0]
+    positions = get_level_positions(genes, None)
+    return {"positions": positions, "genes": np.array(sorted(positions.keys()), dtype=object)}
+
+def get_prefix_positions(gene_index, genes, match="exact"):
+    """Look up the positions of the names for some genes in an index from get_gene_prefix_index.
+
+    Parameters:
+    gene_index (dict): The index, from get_gene_prefix_index.
+    genes (list of str): The genes to look up.
+    match (str, optional): "exact" to get the names whose gene is one of the genes, or "prefix" to get the names whose gene starts with one of them. Default "exact".
+
+    Returns:
+    numpy.ndarray of int: The positions of the matching names, in increasing order, without duplicates.
+    list of str: The genes that didn't match any names.
+    """
+    positions = gene_index["positions"]
+    sorted_genes = gene_index["genes"]
+
+    found = []
+    not_found = []
+    for gene in genes:
+        if match == "exact":
+            matched = [gene] if gene in positions else []
+        else:
+            # The genes that start with the prefix are all next to each other in the sorted genes, so we can find them with two binary searches
+            start = np.searchsorted(sorted_genes, gene, side="left")
+            end = np.searchsorted(sorted_genes, gene + chr(0x10FFFF), side="left")
+            matched = sorted_genes[start:end]
+        if len(matched) == 0:
+            not_found.append(gene)
+        found.extend(positions[matched_gene] for matched_gene in matched)
+
+    return np.unique(np.concatenate(found + [np.array([], dtype=np.intp)])), not_found
+
+def parse_sites(sites):
+    """Parse site names, like "S123S125" or "K45", into compact arrays of the residue and position of each localized site, so sites can be searched without parsing the names again. Lowercase letters and other characters between the sites are ignored.
+
+    Parameters:
+    sites (pandas.Index or array-like of str): The site names, e.g. the "Site" level of a phosphoproteomics dataframe's columns. NaNs are treated as having no localized sites.
+
+    Returns:
+    dict: The parsed sites. "residues" (numpy.ndarray of bytes) and "positions" (numpy.ndarray of int32) have the residue letter and position of every localized site, ordered by the name they came from. "counts" (numpy.ndarray of int) has the number of localized sites in each name, and "offsets" (numpy.ndarray of int) has where each name's sites start in the other two arrays, plus the total number of sites at the end.
+    """
+    codes, uniques = pd.factorize(np.asarray(sites, dtype=object)) # Most tables repeat site names, so we only parse each name once. NaNs get a code of -1.
+    parsed = [re.findall(r"([A-Z])(\d+)", site) if isinstance(site, str) else [] for site in uniques]
+
+    unique_counts = np.array([len(unique_sites) for unique_sites in parsed] + [0], dtype=np.int64) # The extra 0 at the end is for NaN codes of -1
+    unique_offsets = np.concatenate([[0], np.cumsum(unique_counts[:-1])]).astype(np.int64)
+    unique_residues = np.array([residue for unique_sites in parsed for residue, position in unique_sites], dtype="S1")
+    unique_positions = np.array([int(position) for unique_sites in parsed for residue, position in unique_sites], dtype=np.int32)
+
+    counts = unique_counts[codes]
+    site_positions = get_segment_positions(unique_offsets[codes], counts)
+    return {
+        "residues": unique_residues[site_positions],
+        "positions": unique_positions[site_positions],
+        "counts": counts,
+        "offsets": np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+    }
+
+def get_segment_positions(starts, counts):
+    """Get the positions in all of several segments of an array, in order, without looping over the segments.
+
+    Parameters:
+    starts (numpy.ndarray of int): The position where each segment starts.
+    counts (numpy.ndarray of int): The length of each segment.
+
+    Returns:
+    numpy.ndarray of int: The positions in the first segment, then the positions in the second segment, and so on.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    segment_ends = np.cumsum(counts)
+    return np.arange(segment_ends[-1] if len(counts) > 0 else 0) + np.repeat(np.asarray(starts, dtype=np.int64) - (segment_ends - counts), counts)
 
 def generate_sample_status_col(df, normal_test):
     """Create a sample status column, called Sample_Tumor_Normal, for a dataframe.
@@ -129,7 +520,7 @@ def reindex_all_sample_id_to_patient_id(data_dict, reindex_map, additional_to_ke
         try:
             df = reindex_dataframe(df, reindex_map, "Patient_ID", keep_old)
         except ReindexMapError:
-            warnings.warn(f"Error reindexing {name} dataframe. At least one Sample_ID did not have corresponding Patient_ID mapped in clinical dataframe. {name} dataframe not loaded.", FailedReindexWarning, stacklevel=3) # stacklevel=3 ensures that the warning is registered as originating from the file that called the __init__ function, instead of from here directly, because the former is more useful information.
+            warnings.warn(f"Error reindexing {name} dataframe. At least one Sample_ID did not have corresponding Patient_ID mapped in clinical dataframe. {name} dataframe not loaded.", FailedReindexWarning, stacklevel=6) # stacklevel=6 ensures that the warning is registered as originating from the file that called the __init__ function, instead of from here directly, because the former is more useful information.
             dfs_to_delete.append(name)
             continue
 
@@ -140,6 +531,7 @@ def reindex_all_sample_id_to_patient_id(data_dict, reindex_map, additional_to_ke
 
     return data_dict
 
+@profiled_step
 def reformat_normal_patient_ids(data_dict, existing_identifier=None, existing_identifier_location=None):
     """Reformat the patient IDs for normal samples to be marked by an appended ".N"
 
@@ -155,60 +547,77 @@ def reformat_normal_patient_ids(data_dict, existing_identifier=None, existing_id
     # Check parameters
     if (existing_identifier is None and existing_identifier_location is not None) or (existing_identifier is not None and existing_identifier_location is None):
         raise CptacDevError("Parameters existing_identifier and existing_identifier_location must either both be None, or both not be None.")
+    if existing_identifier_location not in (None, "start", "end"):
+        raise CptacDevError("existing_identifier_location parameter must be either 'start' or 'end'")
 
-    sample_statuses_old_index = data_dict["clinical"]["Sample_Tumor_Normal"] # We'll need this every time, and we need it with the un-reformatted index
+    # Work out the new ID for every sample in the clinical dataframe once. Every other table's new index is then just looked up from these, so no table is copied or joined to.
+    sample_statuses = data_dict["clinical"]["Sample_Tumor_Normal"]
+    new_ids = _reformat_normal_ids(sample_statuses.index, sample_statuses, existing_identifier, existing_identifier_location)
 
     for name in data_dict.keys(): # Loop over the keys so we can edit the values without any issues
 
         df = data_dict[name]
 
-        # Add in the tumor/normal statuses for these samples, if they aren't already in the table
-        added_sample_statuses = False # So we can keep track of whether to drop the column when we're done
-        if "Sample_Tumor_Normal" not in df.columns:
-            df = join_col_to_dataframe(df, sample_statuses_old_index)
-            added_sample_statuses = True
+        if "Sample_Tumor_Normal" in df.columns:
+            # The table has its own sample statuses, so we use those
+            new_index = _reformat_normal_ids(df.index, df["Sample_Tumor_Normal"], existing_identifier, existing_identifier_location)
+        else:
+            # Samples that aren't in the clinical dataframe have no status, so they keep their IDs
+            new_index = map_index_values(df.index, pd.Series(new_ids, index=sample_statuses.index)).rename("Patient_ID")
 
-        df.index.name = "Patient_ID" # So we can easily access it when we've made it into a column
-        df = df.reset_index() # This makes the Patient_ID index a column, so we can edit it.
+        # Only the index changes, so we make a shallow copy instead of copying the values
+        df = df.copy(deep=False)
+        df.index = new_index
+        if "Sample_Tumor_Normal" not in df.columns and not isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.rename("Name") # The columns used to be renamed this way when the sample statuses were joined in
 
-        if (existing_identifier is not None) and (existing_identifier_location is not None): # There's an existing normal sample identifier to remove
-            existing_length = len(existing_identifier)
+        # Put the dataframe with reformatted patient IDs back into the data dictionary
+        data_dict[name] = df
 
-            if existing_identifier_location == "start":
-                df["Patient_ID"] = df["Patient_ID"].where(
-                    cond=(~((df["Sample_Tumor_Normal"] == "Normal") & (df["Patient_ID"].str[0:existing_length] == existing_identifier))),
-                    other=df["Patient_ID"].str[existing_length:]
-                )
+    return data_dict
 
-            elif existing_identifier_location == "end":
-                df["Patient_ID"] = df["Patient_ID"].where(
-                    cond=(~((df["Sample_Tumor_Normal"] == "Normal") & (df["Patient_ID"].str[-existing_length:] == existing_identifier))),
-                    other=df["Patient_ID"].str[:-existing_length] # Note that we use the negative of the existing length, since we're working with the end of the string
-                )
+def map_index_values(index, id_map):
+    """Replace the values in an index using a mapping from old to new values, which is worked out once for a whole dataset. Values that aren't in the mapping are kept as they are.
 
-            else:
-                raise CptacDevError("existing_identifier_location parameter must be either 'start' or 'end'")
+    Parameters:
+    index (pandas.Index): The index to replace the values of.
+    id_map (pandas.Series): The new values, indexed by the old values. The old values must be unique.
 
-        # Append ".N" to the patient IDs of normal samples
-        df["Patient_ID"] = df["Patient_ID"].where(
-            cond=(~(df["Sample_Tumor_Normal"] == "Normal")),
-            other=df["Patient_ID"] + ".N"
-        )
+    Returns:
+    pandas.Index: The new index, with the same name as the old one.
+    """
+    positions = id_map.index.get_indexer(index)
+    new_values = np.where(positions >= 0, id_map.to_numpy(dtype=object).take(positions), index.to_numpy(dtype=object))
+    return pd.Index(new_values, dtype=index.dtype, name=index.name)
 
-        # Set the index to the reformatted Patient IDs
-        df = df.set_index("Patient_ID")
+def _reformat_normal_ids(ids, sample_statuses, existing_identifier, existing_identifier_location):
+    """Remove an existing normal sample identifier from the IDs of normal samples, and append ".N" to them.
 
-        # If we added the Sample_Tumor_Normal column, drop it
-        if added_sample_statuses:
-            if isinstance(df.columns, pd.MultiIndex):
-                df = df.drop(columns="Sample_Tumor_Normal", level=0) # level=0 prevents a PerformanceWarning
-            else:
-                df = df.drop(columns="Sample_Tumor_Normal")
+    Parameters:
+    ids (pandas.Index): The patient IDs.
+    sample_statuses (pandas.Series): The sample status for each ID, in the same order.
+    existing_identifier (str): The normal sample identifier to remove, or None.
+    existing_identifier_location (str): "start" or "end", or None.
 
-        # Put the dataframe with reformatted patient IDs back into the data dictionary
-        data_dict[name] = df
+    Returns:
+    pandas.Index: The reformatted IDs, named Patient_ID.
+    """
+    ids = pd.Series(ids, dtype=ids.dtype)
+    is_normal = (sample_statuses == "Normal").to_numpy()
+
+    if existing_identifier is not None:
+        existing_length = len(existing_identifier)
+        if existing_identifier_location == "start":
+            has_identifier = ids.str[0:existing_length] == existing_identifier
+            ids = ids.where(cond=~(is_normal & has_identifier), other=ids.str[existing_length:])
+        else:
+            has_identifier = ids.str[-existing_length:] == existing_identifier # Note that we use the negative of the existing length, since we're working with the end of the string
+            ids = ids.where(cond=~(is_normal & has_identifier), other=ids.str[:-existing_length])
 
-    return data_dict
+    # Append ".N" to the patient IDs of normal samples
+    ids = ids.where(cond=~is_normal, other=ids + ".N")
+
+    return pd.Index(ids, name="Patient_ID")
 
 def join_col_to_dataframe(df, col):
     """Join a sample status column into a dataframe, automatically accounting for whether the dataframe has a column multiindex or not.
@@ -237,6 +646,7 @@ def join_col_to_dataframe(df, col):
 
     return df
 
+@profiled_step
 def standardize_axes_names(data_dict):
     """For all dataframes in the given dictionary, sets the name of the index axes to "Patient_ID", because that's what they all are by that point, and sets the name of the column axes to "Name".
 
@@ -254,6 +664,7 @@ def standardize_axes_names(data_dict):
 
     return data_dict
 
+@profiled_step
 def sort_all_rows(data_dict):
     """For all dataframes in the given dictionary, sort them first by sample status, with tumor samples first, and then by the index.
 
@@ -263,12 +674,12 @@ def sort_all_rows(data_dict):
     Returns:
     dict: The dataframe dictionary, with the dataframes sorted by their indices. Keys are str of dataframe names, values are pandas.DataFrame
     """
-    # Get the Sample_Tumor_Normal column as a single-column dataframe
-    sample_status_col = data_dict["clinical"]["Sample_Tumor_Normal"].copy(deep=True) # We'll need this every time
+    # Rank the samples in the clinical dataframe once, and then sort every table by looking up the ranks of its rows
+    sample_ranks = get_sample_ranks(data_dict["clinical"]["Sample_Tumor_Normal"])
 
     for name in data_dict.keys(): # Loop over the keys so we can alter the values without any issues
         df = data_dict[name]
-        df = sort_df_by_sample_status(df, sample_status_col)
+        df = sort_df_by_sample_ranks(df, sample_ranks)
         data_dict[name] = df
 
     return data_dict
@@ -282,23 +693,88 @@ def sort_df_by_sample_status(df, sample_status_col):
     Returns:
     pandas.DataFrame: The dataframe, sorted.
     """
-    # Add in the tumor/normal statuses for these samples, if they aren't already in the table
-    added_sample_statuses = False # So we can keep track of whether to drop the column when we're done
+    return sort_df_by_sample_ranks(df, get_sample_ranks(sample_status_col))
 
-    if "Sample_Tumor_Normal" not in df.columns:
-        df = join_col_to_dataframe(df, sample_status_col)
-        added_sample_statuses = True
+def get_sample_ranks(sample_status_col):
+    """Get the position of each sample when they're sorted first by sample status, with tumor first, and then by Patient_ID. Samples without a status aren't ranked, since they go after all the others and are just sorted by Patient_ID.
 
-    # Sort first by the Sample_Tumor_Normal column, and then by the index
-    df.index.name = "Patient_ID" # To make sure we can reference it in the next line
-    df = df.sort_values(by=["Sample_Tumor_Normal", "Patient_ID"], ascending=[False, True]) # Sorts first by sample status, and in descending order, so "Tumor" samples are first
+    Parameters:
+    sample_status_col (pandas.Series): The Sample_Tumor_Normal column for the dataset, indexed by Patient_ID.
 
-    # If we added the Sample_Tumor_Normal column, drop it
-    if added_sample_statuses:
-        if isinstance(df.columns, pd.MultiIndex):
-            df = df.drop(columns="Sample_Tumor_Normal", level=0) # level=0 prevents a PerformanceWarning
-        else:
-            df = df.drop(columns="Sample_Tumor_Normal")
+    Returns:
+    pandas.Series: The rank of each sample that has a status, indexed by Patient_ID.
+    """
+    sample_status_col = sample_status_col[sample_status_col.notna()]
+    order = get_sample_status_order(sample_status_col.index, sample_status_col)
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return pd.Series(ranks, index=sample_status_col.index)
+
+def get_sample_status_order(ids, sample_statuses):
+    """Get the positions that sort rows first by sample status, in descending order so "Tumor" comes before "Normal", and then by Patient_ID. Rows without a status go last. Rows that tie keep their order.
+
+    Parameters:
+    ids (pandas.Index): The Patient_ID of each row.
+    sample_statuses (pandas.Series or array-like): The sample status of each row, in the same order.
+
+    Returns:
+    numpy.ndarray: The positions of the rows, in sorted order.
+    """
+    status_codes, statuses = pd.factorize(np.asarray(sample_statuses, dtype=object), sort=True)
+    status_key = np.where(status_codes == -1, len(statuses), len(statuses) - 1 - status_codes) # Descending, with missing statuses last
+
+    id_codes, unique_ids = pd.factorize(ids, sort=True)
+    id_key = np.where(id_codes == -1, len(unique_ids), id_codes)
+
+    return np.lexsort((id_key, status_key)) # lexsort sorts by the last key first, and it's stable
+
+def get_rank_order(ids, sample_ranks):
+    """Get the positions that sort rows by the ranks of their samples, from get_sample_ranks. Rows for samples that aren't ranked go after all the others, sorted by Patient_ID. Rows that tie keep their order.
+
+    Parameters:
+    ids (pandas.Index): The Patient_ID of each row.
+    sample_ranks (pandas.Series): The ranks of the samples, from get_sample_ranks.
+
+    Returns:
+    numpy.ndarray: The positions of the rows, in sorted order.
+    """
+    positions = sample_ranks.index.get_indexer(ids)
+    if (positions >= 0).all():
+        # Every row is ranked, and only rows for the same sample share a rank, so we don't need to sort by Patient_ID too
+        return np.argsort(sample_ranks.to_numpy().take(positions), kind="stable")
+
+    # Rows for samples that aren't ranked go after all the others, sorted by Patient_ID
+    rank_key = np.where(positions >= 0, sample_ranks.to_numpy().take(positions), len(sample_ranks))
+    id_codes, unique_ids = pd.factorize(ids, sort=True)
+    id_key = np.where(id_codes == -1, len(unique_ids), id_codes)
+    return np.lexsort((id_key, rank_key))
+
+def sort_df_by_sample_ranks(df, sample_ranks):
+    """Sort a dataframe first by sample status, with tumor first, and then by Patient_ID, like sort_df_by_sample_status, using sample ranks that were already computed with get_sample_ranks. Only the order of the rows changes, so the dataframe is only copied if it isn't sorted already.
+
+    Parameters:
+    df (pandas.DataFrame): The dataframe to sort.
+    sample_ranks (pandas.Series): The ranks of the samples, from get_sample_ranks.
+
+    Returns:
+    pandas.DataFrame: The dataframe, sorted.
+    """
+    has_statuses = "Sample_Tumor_Normal" in df.columns
+
+    if has_statuses:
+        # The table has its own sample statuses, so we sort by those
+        order = get_sample_status_order(df.index, df["Sample_Tumor_Normal"])
+    else:
+        order = get_rank_order(df.index, sample_ranks)
+
+    if (order == np.arange(len(order))).all():
+        df = df.copy(deep=False)
+    else:
+        df = df.take(order)
+
+    df.index = df.index.rename("Patient_ID") # We rename copies of the axes, since a shallow copy shares them with the original dataframe
+    if not has_statuses and not isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.rename("Name") # The columns used to be renamed this way when the sample statuses were joined in
 
     return df
 
@@ -319,13 +795,89 @@ def add_index_levels(to, source, fill=""):
         return to # Because otherwise we'd just end up constructing a duplicate of "to", and who would want to do that?
 
     all_names = ["Name", "Site", "Peptide", "Database_ID"]
-    levels = {}
+    levels = {} # Keys are level names, values are tuples of the level's values and codes, so we can build the multiindex without factorizing the levels "to" already had again
 
     for name in all_names:
         if name in to.names:
-            levels[name] = to.get_level_values(name)
+            if isinstance(to, pd.MultiIndex):
+                position = to.names.index(name)
+                levels[name] = (to.levels[position], to.codes[position])
+            else:
+                try:
+                    codes, uniques = pd.factorize(to, sort=True) # Sorted, like MultiIndex.from_arrays would make them
+                except TypeError: # Values that can't be compared
+                    codes, uniques = pd.factorize(to)
+                levels[name] = (uniques, codes)
         elif name in source.names:
-            levels[name] = [fill for i in range(to.size)]
+            if pd.isna(fill):
+                levels[name] = ([], np.full(to.size, -1, dtype=np.int8)) # A code of -1 means NaN
+            else:
+                levels[name] = ([fill], np.zeros(to.size, dtype=np.int8))
 
-    new_columns = pd.MultiIndex.from_arrays(list(levels.values()), names=list(levels.keys()))
+    new_columns = pd.MultiIndex(levels=[level for level, codes in levels.values()], codes=[codes for level, codes in levels.values()], names=list(levels.keys()), verify_integrity=False)
     return new_columns
+
+def join_dataframes(dfs, how="outer", sample_ranks=None):
+    """Join several dataframes on their indices, giving all their columns the same levels. This gives the same result as joining them one at a time from left to right with DataFrame.join, but computes the joined index once from all the indices, and then aligns each dataframe to it and concatenates them all at once, instead of re-aligning a growing dataframe for every join.
+
+    Parameters:
+    dfs (list of pandas.DataFrame): The dataframes to join, in order. Their column levels should be some of "Name", "Site", "Peptide" and "Database_ID", in that order.
+    how (str, optional): The type of join, either "outer", "inner", "left" or "right". Each dataframe is joined to the ones before it this way. Default "outer".
+    sample_ranks (pandas.Series, optional): Sample ranks from get_sample_ranks. If given, the rows of the joined dataframe are put in that order as each dataframe is aligned to the joined index, instead of sorting the joined dataframe afterwards. If the dataframes have to be joined one at a time, e.g. because an index has duplicates, the joined dataframe is sorted with sort_df_by_sample_ranks instead. Default None keeps the order of the joined index.
+
+    Returns:
+    pandas.DataFrame: The joined dataframe.
+    """
+    dfs = list(dfs)
+    all_names = ["Name", "Site", "Peptide", "Database_ID"]
+    if any(not df.index.is_unique for df in dfs) or any(name not in all_names for df in dfs for name in df.columns.names):
+        # Aligning to one joined index only works for unique indices, and add_index_levels only knows the standard levels, so otherwise we join them one at a time
+        joined = dfs[0].copy(deep=False) # So we don't change the columns of the dataframes we were given
+        for df in dfs[1:]:
+            if joined.columns.names != df.columns.names:
+                df = df.copy(deep=False)
+                joined.columns = add_index_levels(to=joined.columns, source=df.columns)
+                df.columns = add_index_levels(to=df.columns, source=joined.columns)
+            joined = joined.join(df, how=how)
+        if sample_ranks is not None:
+            joined = sort_df_by_sample_ranks(joined, sample_ranks)
+        return joined
+
+    # Compute the joined index from just the indices
+    index = dfs[0].index
+    for df in dfs[1:]:
+        index = index.join(df.index, how=how)
+    if sample_ranks is not None:
+        index = index.take(get_rank_order(index, sample_ranks))
+
+    # Give all the columns every level that any of them have, in one pass
+    names = [name for name in all_names if any(name in df.columns.names for df in dfs)]
+    source = pd.MultiIndex.from_arrays([[] for name in names], names=names) if len(names) > 1 else pd.Index([], name=names[0] if len(names) > 0 else None)
+
+    # In a chain of right joins, each dataframe only keeps the rows that are in all the dataframes joined after it, even if a later dataframe has them again
+    later_indices = [None] * len(dfs)
+    if how == "right":
+        for i in range(len(dfs) - 2, -1, -1):
+            later_indices[i] = dfs[i + 1].index if later_indices[i + 1] is None else later_indices[i + 1].intersection(dfs[i + 1].index)
+
+    aligned = []
+    for df, later_index in zip(dfs, later_indices):
+        df = df.copy(deep=False) # So we don't change the columns of the dataframes we were given
+        df.columns = add_index_levels(to=df.columns, source=source)
+        if later_index is not None:
+            df = df[df.index.isin(later_index)]
+        if not df.index.equals(index):
+            df = df.reindex(index)
+        aligned.append(df)
+
+    joined = pd.concat(aligned, axis=1)
+    joined.index = index
+
+    # DataFrame.join refuses to join dataframes with the same columns, so we do too. A dataframe can still have duplicate columns within itself.
+    if not joined.columns.is_unique:
+        unique_columns = aligned[0].columns.unique().append([df.columns.unique() for df in aligned[1:]])
+        if not unique_columns.is_unique:
+            overlap = unique_columns[unique_columns.duplicated()].unique()
+            raise ValueError(f"columns overlap but no suffix specified: {overlap}")
+
+    return joined
@@ -11,30 +11,198 @@
 
 import pandas as pd
 import numpy as np
+import concurrent.futures
+import copy
+import functools
+import inspect
+import os
+import time
 import warnings
+import weakref
 from functools import reduce
-import re
+from . import dataframe_tools
+from .cache_tools import LazyDataDict, ResultCache, get_cache_key, read_cache, write_cache
+from .options import get_option, resolve_option
 from .file_download import update_index
 from .file_tools import validate_version, get_version_files_paths
-from .dataframe_tools import add_index_levels, join_col_to_dataframe, sort_df_by_sample_status
+from .dataframe_tools import add_index_levels, join_col_to_dataframe, set_columns_at, view_dataframe
 from .exceptions import *
 
 import cptac.utils as ut
 
+# Wrap each value of an object array in its own list, like [value]
+_wrap_in_list = np.frompyfunc(lambda value: [value], 1, 1)
+
+def _get_genotypes(genes, samples, sample_statuses, gene_codes, sample_codes, mutations, locations, cnv, mutations_filter, mutation_classes, mutation_hotspot):
+    """Prioritize the mutations and CNV of some genes into one genotype for each gene in each sample, for Dataset.get_genotype_all_vars. This is a module level function so chunks of genes can be sent to other processes.
+
+    Parameters:
+    genes (list of str): The genes.
+    samples (pandas.Index): The samples, in the order to return them.
+    sample_statuses (numpy.ndarray): The sample status of each sample, "Tumor", "Normal" or NaN.
+    gene_codes (numpy.ndarray of int): The position in genes of the gene of each mutation. The mutations are grouped by gene, and then by sample.
+    sample_codes (numpy.ndarray of int): The position in samples of the sample of each mutation.
+    mutations (numpy.ndarray): The type of each mutation.
+    locations (numpy.ndarray): The location of each mutation.
+    cnv (numpy.ndarray of float): The CNV of each sample for each gene, with a row for each sample and a column for each gene.
+    mutations_filter (list of str): The mutation types to prioritize, in order of priority.
+    mutation_classes (tuple): The lists of truncation, missense and noncoding mutation types, which are prioritized in that order after the types in the filter.
+    mutation_hotspot (list of str or None): The hotspot locations. "_hotspot" is added to the type of the mutations at them.
+
+    Returns:
+    pandas.DataFrame: The Mutation, Location and Mutation_Status of each gene in each sample, indexed by Gene and Patient_ID.
+    """
+    filter_index = pd.Index(mutations_filter, dtype=object).drop_duplicates()
+    truncations, missenses, noncodings = mutation_classes
+
+    def get_priorities(types):
+        # Mutation types in the filter come first, in the order of the filter, then truncations, missenses, noncoding mutations, and all other types
+        types = pd.Index(types, dtype=object)
+        filter_ranks = filter_index.get_indexer(types)
+        classes = np.select([types.isin(truncations), types.isin(missenses), types.isin(noncodings)], [0, 1, 2], 3)
+        return np.where(filter_ranks >= 0, filter_ranks, len(filter_index) + classes)
+
+    num_samples = len(samples)
+    cells = gene_codes * num_samples + sample_codes # The position of each mutation's gene and sample in the flattened genotypes
+    group_starts = np.flatnonzero(np.concatenate([[True], cells[1:] != cells[:-1]])) if len(cells) > 0 else np.array([], dtype=np.intp)
+    group_sizes = np.diff(np.append(group_starts, len(cells)))
+    group_ids = np.repeat(np.arange(len(group_starts)), group_sizes)
+
+    # Mark the mutations at hotspots. Each mutation gets the type of the first mutation at the same location in its sample, like the hotspot lookup by location has always done.
+    if mutation_hotspot is not None and len(mutations) > 0:
+        location_codes = pd.factorize(locations)[0] + 1 # NaN locations get a code of 0
+        keys, first_at_location, location_inverse = np.unique(group_ids * (location_codes.max() + 1) + location_codes, return_index=True, return_inverse=True)
+        mutations = mutations[first_at_location[location_inverse]]
+        at_hotspot = pd.Index(locations, dtype=object).isin(mutation_hotspot)
+        mutations[at_hotspot] = [mutation + "_hotspot" for mutation in mutations[at_hotspot]]
+
+    # Choose the best mutation for each gene and sample. Ties go to the first one.
+    priorities = get_priorities(mutations)
+    best = np.lexsort((np.arange(len(mutations)), priorities, group_ids))[group_starts]
+
+    # Samples without a mutation in a gene are wildtype, or NaN if they have no sample status
+    has_status = pd.notna(sample_statuses)
+    wildtypes = np.full(num_samples, np.nan, dtype=object)
+    wildtypes[sample_statuses == "Tumor"] = "Wildtype_Tumor"
+    wildtypes[sample_statuses == "Normal"] = "Wildtype_Normal"
+    chosen_mutations = np.tile(wildtypes, len(genes))
+    no_mutations = np.full(num_samples, np.nan, dtype=object)
+    no_mutations[has_status] = "No_mutation"
+    chosen_locations = np.tile(no_mutations, len(genes))
+    num_mutations = np.zeros(len(genes) * num_samples, dtype=np.intp)
+    chosen_mutations[cells[group_starts]] = mutations[best]
+    chosen_locations[cells[group_starts]] = locations[best]
+    num_mutations[cells[group_starts]] = group_sizes
+
+    # A Deletion or Amplification from the CNV is added after the mutations, so it's chosen if it has a better priority than all of them
+    cnv = cnv.T.ravel() # The flattened genotypes have the samples for each gene together
+    with np.errstate(invalid="ignore"):
+        deletion = cnv <= -.2
+        amplification = cnv >= .2
+    has_cnv_mutation = deletion | amplification
+    cnv_mutations = np.where(deletion, "Deletion", "Amplification").astype(object)
+    replace = has_cnv_mutation & (get_priorities(cnv_mutations) < get_priorities(chosen_mutations))
+    chosen_mutations[replace] = cnv_mutations[replace]
+    chosen_locations[replace] = cnv_mutations[replace]
+
+    # Get the status, counting the CNV mutation and not counting wildtype as a mutation
+    num_listed = np.maximum(num_mutations, 1) + has_cnv_mutation
+    is_wildtype = (num_mutations == 0) & np.tile(has_status, len(genes))
+    statuses = np.where(num_listed > 1, np.where((num_listed == 2) & is_wildtype, "Single_mutation", "Multiple_mutation"), np.where(is_wildtype, np.tile(wildtypes, len(genes)).astype(str), "Single_mutation"))
+
+    index = pd.MultiIndex.from_product([pd.Index(genes, name="Gene"), samples])
+    genotypes = pd.DataFrame({
+        "Mutation": chosen_mutations.astype(str),
+        "Location": chosen_locations.astype(str),
+        "Mutation_Status": statuses,
+    }, index=index)
+    genotypes.columns.name = "Name"
+    return genotypes
+
+def _cached_join(join_method):
+    """Decorator for the join methods, to look up their results in the dataset's join cache, if it's enabled with Dataset.enable_join_cache, before computing them."""
+    signature = inspect.signature(join_method)
+
+    @functools.wraps(join_method)
+    def wrapper(self, *args, **kwargs):
+        if getattr(self, "_join_cache", None) is None:
+            return _run_join(join_method, self, args, kwargs)[0]
+
+        # Normalize the arguments, so e.g. passing a parameter by position or by name, or leaving out a default, gives the same key. quiet only controls warnings, so it's left out.
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (join_method.__name__,) + tuple((name, _normalize_join_arg(value)) for name, value in list(bound.arguments.items())[1:] if name != "quiet")
+        try:
+            hash(key)
+        except TypeError: # Arguments of unexpected types can't be looked up, so we just compute the join
+            return _run_join(join_method, self, args, kwargs)[0]
+
+        cached = self._join_cache.get(key)
+        if cached is None:
+            result, caught = _run_join(join_method, self, args, kwargs)
+            self._join_cache.put(key, (result, caught), dataframe_tools.get_memory_usage(result))
+        else:
+            result, caught = cached
+            for caught_warning in caught: # Show the same warnings as the first time
+                warnings.warn(caught_warning.message, stacklevel=2)
+
+        # Return a view, so edits on the result don't change the cached copy
+        return view_dataframe(result)
+
+    return wrapper
+
+def _run_join(join_method, dataset, args, kwargs):
+    """Run a join method for the _cached_join decorator, and show its warnings as coming from the code that called the join method, like they would without the decorator.
+
+    Returns:
+    pandas.DataFrame: The join method's result.
+    list of warnings.WarningMessage: The warnings it showed, so they can be shown again if the result is reused.
+    """
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        result = join_method(dataset, *args, **kwargs)
+
+    for caught_warning in caught:
+        warnings.warn(caught_warning.message, stacklevel=3) # Skips this function and the decorator
+    return result, caught
+
+def _normalize_join_arg(value):
+    """Make a hashable version of a join method argument for a join cache key. A str gives the same key as a list with just that str, since the join methods treat them the same. The order of lists is kept, since it can set the order of the joined columns or, for mutations_filter, the priority of the mutations."""
+    if isinstance(value, str):
+        return (value,)
+    elif isinstance(value, (list, tuple, pd.Series, pd.Index, np.ndarray)):
+        return tuple(_normalize_join_arg(item) if isinstance(item, (list, tuple)) else item for item in value)
+    elif isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    elif isinstance(value, dict):
+        return tuple((key, _normalize_join_arg(item)) for key, item in value.items())
+    else:
+        return value
+
 class Dataset:
     """
     Note that all cancer datasets are class objects that inherit from cptac.dataset. Therefore
     the same function calls exist for cptac.Endometrial, cptac.Colon, etc.
     """
 
-    def __init__(self, cancer_type, version, valid_versions, data_files, no_internet):
-        """Initialize variables for a Dataset object.
+    # The attributes that cache values computed from the dataframes. They're set by _reset_caches, and aren't sent to other processes when the dataset is shared.
+    _CACHE_ATTRIBUTES = ("_tissue_positions", "_column_positions", "_site_indices", "_row_positions", "_sample_ranks", "_mutation_priorities", "_gene_prefix_indices", "_join_cache")
+
+    def __init__(self, cancer_type, version, valid_versions, data_files, no_internet, use_cache=True, n_jobs=1, precision=None, memmap=None, genes=None, tables=None):
+        """Initialize variables for a Dataset object, then load and format its dataframes. Only a dataset that's already in the cache is loaded lazily, with each dataframe read the first time it's used. Otherwise, all the data files are parsed and formatted together first.
 
         Parameters:
         cancer_type (str): The cancer type requested for this dataset
         version (str): The version number requested for this dataset
         valid_versions (list of str): A list of all possible valid versions for this dataset
         data_files (dict, keys of str, values of list of str): A dictionary where the keys are the existing version of the dataset, and the values are lists of the data file names for that version.
+        no_internet (bool): Whether to skip the index update step.
+        use_cache (bool, optional): Whether to load the formatted dataframes from the cache if they've already been parsed, and to cache them if they haven't. With use_cache=False, every dataframe is parsed and formatted each time the dataset is loaded. Default True.
+        n_jobs (int, optional): The number of processes to parse the data files with, if they aren't loaded from the cache. Pass -1 to use all available cores. Default 1 parses them all in this process.
+        precision (str, optional): The float dtype to store the omics dataframes in, either "float64" or "float32". float32 halves the memory used by the omics values. Default None uses the package-wide default set with cptac.set_option("precision", ...), which starts as "float64".
+        memmap (bool, optional): Whether to leave the values of the numeric omics dataframes in read-only memory-mapped files in the cache, instead of reading them into memory. All the processes on a machine that load the same dataset then share one copy of the values. The dataframes returned by the get_* methods are backed by the same files, so on pandas versions without copy-on-write they can't be edited in place. Requires use_cache=True. Default None uses the package-wide default set with cptac.set_option("memmap", ...), which starts as False.
+        genes (str or list of str, optional): If given, only keep the data for these genes in the omics dataframes and the somatic_mutation dataframe. The miRNA, circular_RNA, metabolomics and lipidomics dataframes aren't named by gene, so they're kept whole. Where the data files allow it, the lines for other genes are skipped before their values are parsed. Default None keeps all genes.
+        tables (str or list of str, optional): If given, only keep these dataframes, plus the clinical dataframe, which is always kept. Dataframes loaded from the cache that aren't requested are never read. Default None keeps all dataframes.
         """
         # Initialize the _cancer_type instance variable
         self._cancer_type = cancer_type.lower()
@@ -46,6 +214,16 @@ class Dataset:
             except NoInternetError:
                 pass
 
+        # Validate the precision and memmap options before we do any loading
+        self._precision = resolve_option("precision", precision)
+        self._memmap = resolve_option("memmap", memmap)
+        if self._memmap and not use_cache:
+            raise InvalidParameterError("The memory-mapped files are kept in the cache, so memmap=True requires use_cache=True.")
+
+        # Validate the genes and tables to keep
+        self._genes = self._validate_selection("genes", genes)
+        tables = self._validate_selection("tables", tables)
+
         # Validate the version
         self._version = validate_version(version, self._cancer_type, use_context="init", valid_versions=valid_versions)
 
@@ -53,9 +231,10 @@ class Dataset:
         version_data_files = data_files[self._version] # Get the data files for this version from the data files dictionary
         self._data_files_paths = get_version_files_paths(self._cancer_type, self._version, version_data_files)
 
-        # Initialize dataframe and definitions dicts as empty for this parent class
-        self._data = {}
+        # Initialize dataframe and definitions dicts as empty for this parent class. The dataframe dict can hold tables that are only read from the cache when first accessed.
+        self._data = LazyDataDict()
         self._definitions = {}
+        self._reset_caches()
 
         # Assign the valid dfs lists, but make them instance variables so they're easy to override if needed
         # These are the omics dataframes that are valid for use in the utilities functions
@@ -82,6 +261,15 @@ class Dataset:
             #"followup", # Right now there are duplicate rows, so don't include follow up tables for joins.
             ] # We don't allow the treatment df, as in Ovarian, or medical_history df, as in Ccrcc, because they both have multiple rows for each sample.
 
+        # Fill the self._data dict, either from the cache or by parsing the data files
+        self._load_data(use_cache, n_jobs)
+
+        # Drop the dataframes that weren't requested. The clinical dataframe is always kept, since it has the sample status of every sample.
+        if tables is not None:
+            for name in list(self._data.keys()):
+                if name not in tables and name != "clinical":
+                    del self._data[name]
+
     # Methods to get metadata dataframes
     def get_clinical(self, tissue_type="both"):
         """Get the clinical dataframe."""
@@ -159,6 +347,65 @@ class Dataset:
         """
         return self._get_omics_cols("phosphoproteomics", genes)
 
+    def query_sites(self, table="phosphoproteomics", genes=None, residues=None, start=None, end=None, peptides=None, tissue_type="both"):
+        """Select the columns for some sites from a dataframe with a Site column level, like phosphoproteomics or acetylproteomics, by gene, residue, position or peptide. The sites are looked up in an index that's built the first time a dataframe is queried, so the column names aren't searched or parsed again for each query.
+
+        Parameters:
+        table (str, optional): The name of the dataframe to select from. Default "phosphoproteomics".
+        genes (str or list of str, optional): Only select sites on these genes. Default None selects sites on all genes.
+        residues (str or list of str, optional): Only select columns with at least one localized site on one of these residues, e.g. "Y" or ["S", "T"]. Default None allows any residue.
+        start (int, optional): Only select columns with at least one localized site at this position or after it, on one of the given residues if residues was passed. Default None doesn't set a lower bound.
+        end (int, optional): Only select columns with at least one localized site at this position or before it. It's checked together with start and residues, so all of them have to match the same site. Default None doesn't set an upper bound.
+        peptides (str or list of str, optional): Only select columns for these peptides. Default None selects columns for all peptides.
+        tissue_type (str, optional): Acceptable values in ["tumor","normal","both"]. Specifies the desired tissue type desired in the dataframe. Default "both".
+
+        Returns:
+        pandas.DataFrame: The selected columns of the dataframe, in the same order as in the dataframe.
+        """
+        df = self._get_dataframe(table, tissue_type, copy=False)
+        if "Site" not in df.columns.names:
+            raise InvalidParameterError(f"The {table} dataframe doesn't have a Site column level, so its sites can't be queried.")
+        if peptides is not None and "Peptide" not in df.columns.names:
+            raise InvalidParameterError(f"The {table} dataframe doesn't have a Peptide column level, so it can't be queried by peptide.")
+        for param_name, param in (("start", start), ("end", end)):
+            if param is not None and not isinstance(param, (int, np.integer)):
+                raise InvalidParameterError(f"Parameter {param_name} must be an int, not {type(param)}.")
+
+        # Narrow down the columns by gene and peptide, using the column position indices
+        selected = None
+        for param_name, level, selection in (("genes", "Name", genes), ("peptides", "Peptide", peptides)):
+            selection = self._validate_selection(param_name, selection)
+            if selection is not None:
+                level_positions = self._get_column_positions(table, level)
+                positions = np.concatenate([level_positions[value] for value in selection if value in level_positions] + [np.array([], dtype=np.intp)])
+                selected = np.unique(positions) if selected is None else np.intersect1d(selected, positions)
+
+        # Then filter them by their parsed sites
+        residues = self._validate_selection("residues", residues)
+        if residues is not None or start is not None or end is not None:
+            site_index = self._get_site_index(table)
+            if selected is None:
+                site_positions = slice(None)
+                site_columns = np.repeat(np.arange(df.shape[1]), site_index["counts"])
+            else:
+                site_positions = dataframe_tools.get_segment_positions(site_index["offsets"][selected], site_index["counts"][selected])
+                site_columns = np.repeat(selected, site_index["counts"][selected])
+
+            site_residues = site_index["residues"][site_positions]
+            site_locations = site_index["positions"][site_positions]
+            matches = np.ones(len(site_columns), dtype=bool)
+            if residues is not None:
+                matches &= np.isin(site_residues, np.array([residue.upper() for residue in residues], dtype="S1"))
+            if start is not None:
+                matches &= site_locations >= start
+            if end is not None:
+                matches &= site_locations <= end
+            selected = np.unique(site_columns[matches])
+
+        if selected is None:
+            selected = np.arange(df.shape[1])
+        return df.take(selected, axis=1)
+
     def get_proteomics(self, tissue_type="both"):
         """Get the proteomics dataframe."""
         return self._get_dataframe("proteomics",tissue_type)
@@ -176,9 +423,24 @@ class Dataset:
         """Get the somatic_mutation dataframe."""
         return self._get_dataframe("somatic_mutation")
 
-    def get_somatic_mutation_binary(self):
-        """Get the somatic_mutation_binary dataframe, which has a binary value indicating, for each location on each gene, whether there was a mutation in that gene at that location, for each sample."""
-        return self._get_dataframe("somatic_mutation_binary")
+    def get_somatic_mutation_binary(self, genes=None, match="exact", tissue_type="both"):
+        """Get the somatic_mutation_binary dataframe, which has a binary value indicating, for each location on each gene, whether there was a mutation in that gene at that location, for each sample.
+
+        Parameters:
+        genes (str or list of str, optional): Only get the columns for these genes, e.g. "TP53" gets all the columns named like "TP53_p.R273H". The columns are looked up in an index of the column names by gene, which is built the first time, so the column names aren't searched for each gene. Default None gets all the columns.
+        match (str, optional): "exact" to get the columns whose gene is one of the genes, or "prefix" to get the columns whose gene starts with one of them, e.g. "HLA-" gets the columns for all the HLA genes. Default "exact".
+        tissue_type (str, optional): Acceptable values in ["tumor","normal","both"]. Specifies the desired tissue type desired in the dataframe. Default "both".
+
+        Returns:
+        pandas.DataFrame: The selected columns, in the same order as in the dataframe.
+        """
+        if genes is None:
+            return self._get_dataframe("somatic_mutation_binary", tissue_type)
+
+        positions, not_found = self._get_binary_positions(genes, match)
+        if len(not_found) > 0:
+            warnings.warn(f"The following genes have no columns in the somatic_mutation_binary dataframe, so they were left out: {', '.join(not_found)}", ParameterWarning, stacklevel=2)
+        return self._get_dataframe("somatic_mutation_binary", tissue_type, copy=False).take(positions, axis=1)
 
     # Help methods
     def define(self, term):
@@ -212,8 +474,32 @@ class Dataset:
         """Print list of loaded dataframes and dimensions."""
         print("Below are the dataframes contained in this dataset:")
         for name in sorted(self._data.keys(), key=str.lower):
-            df = self._data[name]
-            print("\t{}\n\t\tDimensions: {}".format(name, df.shape))
+            shape = self._data.get_shape(name) # This doesn't load tables that haven't been used yet
+            print("\t{}\n\t\tDimensions: {}".format(name, shape))
+
+    def load_profile(self):
+        """Get a record of how long each part of loading the dataset took, and how much memory the dataframes use.
+
+        Returns:
+        dict: The profile, which only contains str, numbers, lists, dicts and None, so it can be serialized as JSON. Its keys are:
+            "dataset" and "version": The cancer type and data version.
+            "source": "cache" if the dataframes were loaded from the cache, or "data files" if the data files were parsed.
+            "total_seconds": The wall time of the whole load.
+            "files": A list with a dict for each data file parsed, in the order they were loaded. Each has the name of the file, its wall time in "seconds", its size on disk in "bytes_read", and a "tables" dict with the memory in bytes of each dataframe it loaded. Empty if the dataframes were loaded from the cache.
+            "steps": A list with a dict for each step after the files were parsed, in the order they ran, like unionize_indices, reformat_normal_patient_ids, sort_all_rows and standardize_axes_names. Each has the name of the "step", its wall time in "seconds", and the memory in bytes of what it returned in "memory_bytes", or None for reading and writing the cache. The "format_data" step includes the time of the formatting steps that ran within it.
+            "tables": A list with a dict for each dataframe in the dataset now, with its "table" name, its "shape", and its current memory in "memory_bytes", or None if it's cached and hasn't been used yet.
+        """
+        profile = copy.deepcopy(self._load_profile)
+        profile["tables"] = []
+        for name in self._data.keys():
+            loaded = self._data.is_loaded(name) if isinstance(self._data, LazyDataDict) else True
+            profile["tables"].append({
+                "table": name,
+                "shape": list(self._data.get_shape(name)) if isinstance(self._data, LazyDataDict) else list(self._data[name].shape),
+                "memory_bytes": dataframe_tools.get_memory_usage(self._data[name]) if loaded else None,
+            })
+
+        return profile
 
     def list_definitions(self):
         """Print all terms defined in the dataset's list of definitions."""
@@ -223,13 +509,44 @@ class Dataset:
         else:
             raise NoDefinitionsError("No definitions provided for this dataset.")
 
-    def get_genotype_all_vars(self, mutations_genes, mutations_filter=None, show_location=True, mutation_hotspot=None):
+    def enable_join_cache(self, max_memory=512 * 1024 ** 2):
+        """Cache the results of the join methods, so calling one again with the same arguments returns the saved result instead of joining the tables again. The least recently used results are dropped once the cached results use more than max_memory. Warnings about the join, like the ones about inserted NaNs, are only shown the first time. Enabling the cache again replaces the old one.
+
+        Parameters:
+        max_memory (int, optional): The most memory the cached results can use, in bytes. Default 512 MiB.
+
+        Returns:
+        None
+        """
+        if not isinstance(max_memory, (int, float, np.integer, np.floating)) or max_memory < 0:
+            raise InvalidParameterError(f"Parameter max_memory must be a non-negative number of bytes, not {max_memory}.")
+        self._join_cache = ResultCache(max_memory)
+
+    def disable_join_cache(self):
+        """Stop caching the results of the join methods, and drop the cached results."""
+        self._join_cache = None
+
+    def join_cache_info(self):
+        """Get how often the join cache was used, and how much memory it uses.
+
+        Returns:
+        dict: "hits" and "misses" count the join calls that were and weren't answered from the cache, "evictions" counts the results dropped to stay within the memory budget, "entries" is the number of cached results, "current_bytes" is the memory they use, and "max_bytes" is the memory budget. None if the cache isn't enabled.
+        """
+        if self._join_cache is None:
+            return None
+        return self._join_cache.info()
+
+    def get_genotype_all_vars(self, mutations_genes, mutations_filter=None, show_location=True, mutation_hotspot=None, n_jobs=1):
         """Return a dataframe that has the mutation type and wheather or not it is a multiple mutation
         Parameters:
-        mutation_genes (str, or list or array-like of str): The gene(s) to get mutation data for.
+        mutation_genes (str, or list or array-like of str): The gene(s) to get mutation data for. For a list of genes, the genotypes of all of them are computed at once, and returned in one dataframe.
         mutations_filter (list, optional):  List of mutations to prioritize when filtering out multiple mutations, in order of priority.
         show_location (bool, optional): Whether to include the Location column from the mutation dataframe. Defaults to True.
         mutation_hotspot (optional): a list of hotspots
+        n_jobs (int, optional): For a list of genes, the number of processes to split the genes between. Pass -1 to use all available cores. Default 1 computes them all in this process.
+
+        Returns:
+        pandas.DataFrame: The Mutation, Location and Mutation_Status of each sample. For a single gene, the index is the Patient_ID. For a list of genes, even a list of one gene, the index is a multiindex of the Gene and the Patient_ID, and the genotypes of each gene are the same as if it was passed alone. Samples without any mutations for a gene are wildtype, plus any Deletion or Amplification from the CNV.
         """
 
         #If they don't give us a filter, this is the default.
@@ -272,170 +589,17 @@ class Dataset:
                                         'Silent',
                                         'Wildtype']
 
-        if self.get_cancer_type() == 'colon':
-            truncations = ['frameshift deletion', 'frameshift insertion', 'frameshift substitution', 'stopgain', 'stoploss']
-            missenses = ['nonframeshift deletion', 'nonframeshift insertion', 'nonframeshift substitution', 'nonsynonymous SNV']
-        elif self.get_cancer_type() == 'hnscc' and self.version() == "0.1":
-            truncations =["stopgain", "stoploss"]
-            missenses = ["nonframeshift insertion", "nonframeshift deletion"]
+        # A single gene is prioritized the same way as a list of genes, and just returned without the Gene level of the index
+        if isinstance(mutations_genes, str):
+            genotypes = self._get_genotypes_all_genes([mutations_genes], mutations_filter, mutation_hotspot, n_jobs).droplevel("Gene")
         else:
-            truncations = ['Frame_Shift_Del', 'Frame_Shift_Ins', 'Nonsense_Mutation', 'Nonstop_Mutation', 'Splice_Site']
-            missenses = ['In_Frame_Del', 'In_Frame_Ins', 'Missense_Mutation']
-
-        if self.get_cancer_type() == "gbm":
-            noncodings = ["Intron", "RNA", "3'Flank", "Splice_Region", "5'UTR", "5'Flank", "3'UTR"]
-
-
-
-        #check that gene is in the somatic_mutation DataFrame
-        somatic_mutation = self.get_somatic_mutation()
-        if mutations_genes not in somatic_mutation["Gene"].unique(): #if the gene isn't in the somacic mutations df it will still have CNV data that we want
-            def add_del_and_amp_no_somatic(row):
-                if row[mutations_genes] <= -.2:
-                    mutations = 'Deletion'
-
-                elif row[mutations_genes] >= .2:
-                    mutations = 'Amplification'
-                else:
-                    mutations = "No_Mutation"
-
-                return mutations
-
-
-            cnv = self.get_CNV()
-            gene_cnv = cnv[["PTEN"]]
-            mutation_col = gene_cnv.apply(add_del_and_amp_no_somatic, axis=1)
-            df = gene_cnv.assign(Mutation = mutation_col)
-            return df
-
-
-        #combine the cnv and mutations dataframe
-        combined = self.join_omics_to_mutations(omics_df_name="CNV", mutations_genes=mutations_genes, omics_genes=mutations_genes)
-
-
-        #drop the database index from ccrcc
-        if self.get_cancer_type() == "ccrcc" or self.get_cancer_type() == "brca":
-             cc = self.get_CNV()
-             drop = ['Database_ID']
-             combined = ut.reduce_multiindex(df=combined, levels_to_drop=drop)
-
-
-        #If there are hotspot mutations, append 'hotspot' to the mutation type so that it's prioritized correctly
-        def mark_hotspot_locations(row):
-            #iterate through each location in the current row
-            mutations = []
-            for location in row[mutations_genes+'_Location']:
-                if location in mutation_hotspot: #if it's a hotspot mutation
-                    #get the position of the location
-                    position = row[mutations_genes+'_Location'].index(location)
-                    #use that to change the correct mutation
-                    mutations.append(row[mutations_genes+"_Mutation"][position] + "_hotspot")
-                else:
-                    # get the position of the location
-                    position = row[mutations_genes+'_Location'].index(location)
-                    mutations.append(row[mutations_genes+"_Mutation"][position])
-            return mutations
-
-        if mutation_hotspot is not None:
-            combined['hotspot'] = combined.apply(mark_hotspot_locations, axis=1)
-            combined[mutations_genes+"_Mutation"] = combined['hotspot']
-            combined = combined.drop(columns='hotspot')
-
-        # Based on cnv make a new column with mutation type that includes deletions and amplifications
-        def add_del_and_amp(row):
-            if row[mutations_genes+"_CNV"] <= -.2:
-                mutations = row[mutations_genes+"_Mutation"] + ['Deletion']
-                locations = row[mutations_genes+'_Location']+['Deletion']
-
-            elif row[mutations_genes+"_CNV"] >= .2:
-                mutations = row[mutations_genes+"_Mutation"] + ['Amplification']
-                locations = row[mutations_genes+'_Location']+['Amplification']
-            else:
-                mutations = row[mutations_genes+"_Mutation"]
-                locations = row[mutations_genes+"_Location"]
-
-            return mutations, locations
-
-
-        combined['mutations'], combined['locations'] = zip(*combined.apply(add_del_and_amp, axis=1))
-
-
-        #now that we have the deletion and amplifications, we need to prioritize the correct mutations.
-        def sort(row):
-            sortedcol = []
-            location = []
-            chosen_indices = []
-            sample_mutations_list = row['mutations']
-            sample_locations_list = row['locations']
-            if len(sample_mutations_list) == 1: #if there's only one mutation in the list
-                sortedcol.append(sample_mutations_list[0])
-                location.append(sample_locations_list[0])
-
-            else:
-                for filter_val in mutations_filter: # This will start at the beginning of the filter list, thus filters earlier in the list are prioritized, like we want
-                    if filter_val in sample_mutations_list:
-                        chosen_indices = [index for index, value in enumerate(sample_mutations_list) if value == filter_val]
-                    if len(chosen_indices) > 0: # We found at least one mutation from the filter to prioritize, so we don't need to worry about later values in the filter priority list
-                        break
-
-                if len(chosen_indices) == 0: # None of the mutations for the sample were in the filter, so we're going to have to use our default hierarchy
-                    for mutation in sample_mutations_list:
-                        if mutation in truncations:
-                            chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-                if len(chosen_indices) == 0: # None of them were in the filter, nor were truncations, so we'll grab all the missenses
-                    for mutation in sample_mutations_list:
-                        if mutation in missenses:
-                            chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-                if self.get_cancer_type() == "gbm" and len(chosen_indices) == 0: # None of them were in the filter, nor were truncations, nor missenses, so we'll grab all the noncodings
-                    for mutation in sample_mutations_list:
-                        if mutation in noncodings:
-                            chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-                soonest_mutation = sample_mutations_list[chosen_indices[0]]
-                soonest_location = sample_locations_list[chosen_indices[0]]
-                chosen_indices.clear()
-                sortedcol.append(soonest_mutation)
-                location.append(soonest_location)
-
-            return pd.Series([sortedcol, location],index=['mutations', 'locations'])
-
-        df = combined.apply(sort, axis=1)
-        combined['Mutation'] = df['mutations']
-        combined['Location'] = df['locations']
-
-        #get a sample_status column that says if the gene has multiple mutations (including dletion and amplification)
-        def sample_status(row):
-            if len(row['mutations']) > 1: #if there's more than one mutation
-                if len(row['mutations']) == 2 and "Wildtype_Tumor" in row['mutations']: #one of the mutations might be a "wildtype tumor"
-                    status ="Single_mutation"
-
-                elif len(row['mutations']) == 2 and "Wildtype_Normal" in row['mutations']:
-                    status ="Single_mutation"
-
-                else:
-                    status = "Multiple_mutation"
-            else:
-                if row["mutations"] == ["Wildtype_Normal"]:
-                    status = "Wildtype_Normal"
-                elif row['mutations'] == ['Wildtype_Tumor']:
-                    status = "Wildtype_Tumor"
-                else:
-                    status = "Single_mutation"
-
-            return status
-        combined['Mutation_Status'] = combined.apply(sample_status, axis=1)
-
-        #drop all the unnecessary Columns
-        df = combined.drop(columns=[mutations_genes+"_CNV", mutations_genes+"_Mutation", mutations_genes+"_Location", mutations_genes+"_Mutation_Status", 'Sample_Status', 'mutations','locations'])
-        df['Mutation'] = [','.join(map(str, l)) for l in df['Mutation']]
-        df['Location'] = [','.join(map(str, l)) for l in df['Location']]
-        if show_location == False: df = df.drop(columns="Location") #if they don't want us to show the location, drop it
-        return df
+            genotypes = self._get_genotypes_all_genes(mutations_genes, mutations_filter, mutation_hotspot, n_jobs)
 
+        if show_location == False: genotypes = genotypes.drop(columns="Location") #if they don't want us to show the location, drop it
+        return genotypes
 
     # Join functions
+    @_cached_join
     def join_omics_to_omics(self, df1_name, df2_name, genes1=None, genes2=None, how="outer", quiet=False, tissue_type="both"):
         """Take specified column(s) from one omics dataframe, and join to specified columns(s) from another omics dataframe. Intersection (inner join) of indices is used.
 
@@ -458,23 +622,16 @@ class Dataset:
         selected1 = self._get_omics_cols(df1_name, genes1, tissue_type)
         selected2 = self._get_omics_cols(df2_name, genes2, tissue_type)
 
-        # Make the multiindices the same
-        if selected1.columns.names != selected2.columns.names:
-            selected1.columns = add_index_levels(to=selected1.columns, source=selected2.columns)
-            selected2.columns = add_index_levels(to=selected2.columns, source=selected1.columns)
-
-        joined = selected1.join(selected2, how= how)
+        # Join them, making the multiindices the same, and putting the rows in sample status order as we go
+        joined = dataframe_tools.join_dataframes([selected1, selected2], how, sample_ranks=self._get_sample_ranks())
 
         # Warn them about any NaNs that were inserted in the outer join
         if not quiet and how != "inner":
             self._warn_inserted_nans(df1_name, df2_name, selected1.index, selected2.index)
 
-        # Sort the dataframe so all the tumor samples are first, then all the normal samples
-        sample_status_col = self._get_dataframe("clinical")["Sample_Tumor_Normal"]
-        joined = sort_df_by_sample_status(joined, sample_status_col)
-
         return joined
 
+    @_cached_join
     def join_omics_to_mutations(self, omics_df_name, mutations_genes, omics_genes=None, mutations_filter=None, show_location=True, how="outer", quiet=False, tissue_type="both"):
         """Select all mutations for specified gene(s), and joins them to all or part of the given omics dataframe. Intersection (inner join) of indices is used. Each location or mutation cell contains a list, which contains the one or more location or mutation values corresponding to that sample for that gene, or a value indicating that the sample didn't have a mutation in that gene.
 
@@ -508,11 +665,11 @@ class Dataset:
             self._warn_inserted_nans(omics_df_name, "somatic_mutation", omics.index, mutations.index)
 
         # Sort the dataframe so all the tumor samples are first, then all the normal samples
-        sample_status_col = self._get_dataframe("clinical")["Sample_Tumor_Normal"]
-        joined = sort_df_by_sample_status(joined, sample_status_col)
+        joined = dataframe_tools.sort_df_by_sample_ranks(joined, self._get_sample_ranks())
 
         return joined
 
+    @_cached_join
     def join_metadata_to_metadata(self, df1_name, df2_name, cols1=None, cols2=None, how="outer", quiet=False, tissue_type="both"):
         """Take specified column(s) from one metadata dataframe, and join to specified columns(s) from another metadata dataframe. Intersection (inner join) of indices is used.
 
@@ -542,11 +699,11 @@ class Dataset:
             self._warn_inserted_nans(df1_name, df2_name, selected1.index, selected2.index)
 
         # Sort the dataframe so all the tumor samples are first, then all the normal samples
-        sample_status_col = self._get_dataframe("clinical")["Sample_Tumor_Normal"]
-        joined = sort_df_by_sample_status(joined, sample_status_col)
+        joined = dataframe_tools.sort_df_by_sample_ranks(joined, self._get_sample_ranks())
 
         return joined
 
+    @_cached_join
     def join_metadata_to_omics(self, metadata_df_name, omics_df_name, metadata_cols=None, omics_genes=None, how="outer", quiet=False, tissue_type="both"):
         """Joins columns from a metadata dataframe (clinical, derived_molecular, or experimental_design) to part or all of an omics dataframe. Intersection (inner join) of indices is used.
 
@@ -569,22 +726,16 @@ class Dataset:
         metadata_selected = self._get_metadata_cols(metadata_df_name, metadata_cols, tissue_type)
         omics_selected = self._get_omics_cols(omics_df_name, omics_genes,tissue_type)
 
-        # Make the indices the same
-        if metadata_selected.columns.names != omics_selected.columns.names:
-            metadata_selected.columns = add_index_levels(to=metadata_selected.columns, source=omics_selected.columns)
-
-        joined = metadata_selected.join(omics_selected, how=how)
+        # Join them, making the indices the same, and putting the rows in sample status order as we go
+        joined = dataframe_tools.join_dataframes([metadata_selected, omics_selected], how, sample_ranks=self._get_sample_ranks())
 
         # Warn them about any NaNs that were inserted in the outer join
         if not quiet and how != "inner":
             self._warn_inserted_nans(metadata_df_name, omics_df_name, metadata_selected.index, omics_selected.index)
 
-        # Sort the dataframe so all the tumor samples are first, then all the normal samples
-        sample_status_col = self._get_dataframe("clinical")["Sample_Tumor_Normal"]
-        joined = sort_df_by_sample_status(joined, sample_status_col)
-
         return joined
 
+    @_cached_join
     def join_metadata_to_mutations(self, metadata_df_name, mutations_genes, metadata_cols=None, mutations_filter=None, show_location=True, how="outer", quiet=False, tissue_type="both"):
         """Select all mutations for specified gene(s), and joins them to all or part of the given metadata dataframe. Intersection (inner join) of indices is used. Each location or mutation cell contains a list, which contains the one or more location or mutation values corresponding to that sample for that gene, or a value indicating that the sample didn't have a mutation in that gene.
 
@@ -619,11 +770,11 @@ class Dataset:
             self._warn_inserted_nans(metadata_df_name, "somatic_mutation", metadata.index, mutations.index)
 
         # Sort the dataframe so all the tumor samples are first, then all the normal samples
-        sample_status_col = self._get_dataframe("clinical")["Sample_Tumor_Normal"]
-        joined = sort_df_by_sample_status(joined, sample_status_col)
+        joined = dataframe_tools.sort_df_by_sample_ranks(joined, self._get_sample_ranks())
 
         return joined
     
+    @_cached_join
     def multi_join(self, join_dict, mutations_filter=None, flatten=False, levels_to_drop=[], how="outer", tissue_type="both"):    
         """Takes a dictionary which keys are dataframes and values are columns from those dataframes and joins all the columns into one dataframe. If the value is an empty list it will join the dataframe
         
@@ -644,7 +795,7 @@ class Dataset:
         
         Returns: pandas.DataFrame
         """
-        column_names = []    
+        column_names = set()
         to_join=[]
         
         for df_name in join_dict.keys():
@@ -652,13 +803,11 @@ class Dataset:
             if df_name in self._valid_omics_dfs:
                 # If key is somatic_mutation_binary it will join all columns that match a gene
                 if df_name == "somatic_mutation_binary":
-                    binary_data = self.get_somatic_mutation_binary()
-                    binary_data = "\n".join(list(binary_data.columns))
-                    found_genes = []
                     if len(join_dict[df_name]) != 0:
-                        for gene in join_dict[df_name]:
-                            found_genes += (re.findall((gene+".+\n"), binary_data))
-                        found_genes = list(map(lambda x: x.strip("\n"), found_genes))#returns a list of columns that match the given gene
+                        positions, not_found = self._get_binary_positions(join_dict[df_name]) # Look up the columns for each gene in the index, instead of searching all the column names
+                        if len(not_found) > 0:
+                            warnings.warn(f"The following genes have no columns in the somatic_mutation_binary dataframe, so they were left out: {', '.join(not_found)}", ParameterWarning, stacklevel=3)
+                        found_genes = self._data[df_name].columns.take(positions) # The columns that match the given genes
                         columns = self._get_omics_cols(df_name, found_genes, tissue_type= tissue_type)
                     else:
                         columns = self._get_omics_cols(df_name, None, tissue_type= tissue_type)
@@ -677,18 +826,22 @@ class Dataset:
             elif df_name == "somatic_mutation":
                 columns = self._get_genes_mutations(join_dict[df_name], mutations_filter = mutations_filter)
 
-            ### Checks if there are columns with the same name and adds the name of the
+            ### Checks if there are columns with the same name and adds the name of the dataframe to them, renaming them all at once
+            renames = {}
             for i in columns.columns:
                 if type(i) == tuple:
                     i = reduce(lambda  x, y: str(x)+str(y), i)#returns a flattened column name
                 if i in column_names:
-                    columns = columns.rename(columns={i: str(i)+'_'+df_name})
-                column_names.append(i)
+                    renames[i] = str(i)+'_'+df_name
+                column_names.add(i)
+            if len(renames) > 0:
+                columns = columns.rename(columns=renames)
             ###     
 
             to_join.append(columns)
 
-        joined, how = reduce(self._join_dataframe, to_join, how)
+        # Join them all at once, instead of one at a time
+        joined = dataframe_tools.join_dataframes(to_join, how)
     
         if len(levels_to_drop) != 0:
             joined = ut.reduce_multiindex(joined, levels_to_drop=levels_to_drop)
@@ -698,39 +851,234 @@ class Dataset:
         return joined
 
     # "Private" methods
-    
-    def _get_dataframe(self, name, tissue_type="both"):
+
+    def _load_data(self, use_cache, n_jobs):
+        """Fill the self._data and self._definitions dicts. If the dataframes have already been parsed from the current data files by the current code, read them from the cache. Otherwise, parse and format them, then cache them.
+
+        Only the cached dataframes are lazy, i.e. read the first time they're used. The formatting steps need the index of every dataframe, so on a cache miss, or with use_cache=False, all the data files are parsed and formatted here, even the ones whose dataframes are never used. After a cache miss, the formatted dataframes are swapped for the lazy cached ones, so the unused ones don't stay in memory.
+
+        Parameters:
+        use_cache (bool): Whether to read and write the cache of formatted dataframes.
+        n_jobs (int): The number of processes to parse the data files with. -1 means to use all available cores.
+        """
+        if not isinstance(n_jobs, int) or isinstance(n_jobs, bool) or (n_jobs < 1 and n_jobs != -1):
+            raise InvalidParameterError(f"{n_jobs} is not a valid value for n_jobs. Pass a positive integer, or -1 to use all available cores.")
+
+        # Record how long each part of the loading takes, and how much memory it uses, for load_profile
+        load_start = time.perf_counter()
+        self._load_profile = {
+            "dataset": self._cancer_type,
+            "version": self._version,
+            "source": "data files",
+            "total_seconds": None,
+            "files": [],
+            "steps": [],
+        }
+
+        if use_cache:
+            cache_key = self._get_cache_key()
+            start = time.perf_counter()
+            try:
+                cached = read_cache(self._cancer_type, self._version, cache_key, memmap=self._memmap)
+            except Exception: # A corrupted or unreadable cache shouldn't stop the dataset from loading, so we'll just parse the data files again
+                cached = None
+
+            if cached is not None:
+                self._data, self._definitions = cached
+                self._load_profile["source"] = "cache"
+                self._load_profile["steps"].append({"step": "read_cache", "seconds": time.perf_counter() - start, "memory_bytes": None}) # The cached tables aren't read until they're used
+                self._load_profile["total_seconds"] = time.perf_counter() - load_start
+                return
+
+        # Load the data files into dataframes in the self._data dict
+        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
+        if n_jobs == 1:
+            for file_path in self._data_files_paths:
+
+                # Print a loading message. We add a dot every time, so the user knows it's not frozen.
+                loading_msg = loading_msg + "."
+                print(loading_msg, end='\r')
+
+                self._load_profile["files"].append(self._load_data_file_profiled(file_path))
+
+        else:
+            # The files are independent until they're formatted, so we can parse them all at once in separate processes
+            max_workers = os.cpu_count() if n_jobs == -1 else n_jobs
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self._parse_data_file, file_path) for file_path in self._data_files_paths]
+
+                for future in futures: # We collect the results in file order, so the tables are in the same order as when they're parsed serially
+                    file_data, file_definitions, file_record = future.result()
+                    self._data.update(file_data)
+                    self._definitions.update(file_definitions)
+                    self._load_profile["files"].append(file_record)
+
+                    loading_msg = loading_msg + "."
+                    print(loading_msg, end='\r')
+
+        print(' ' * len(loading_msg), end='\r') # Erase the loading message
+        formatting_msg = "Formatting dataframes..."
+        print(formatting_msg, end='\r')
+
+        with dataframe_tools.profile_steps() as step_records:
+            start = time.perf_counter()
+            self._format_data()
+            step_records.append({"step": "format_data", "seconds": time.perf_counter() - start, "memory_bytes": dataframe_tools.get_memory_usage(self._data)})
+
+            # Keep only the requested genes. The formatting steps need all the samples in every table, so this is done afterwards.
+            if self._genes is not None:
+                self._data = dataframe_tools.select_genes(self._data, self._valid_omics_dfs + ["somatic_mutation"], self._genes)
+
+            # Store the omics values in the requested float precision
+            self._data = dataframe_tools.convert_float_precision(self._data, self._valid_omics_dfs, self._precision)
+
+        self._load_profile["steps"].extend(step_records)
+
+        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
+
+        if use_cache:
+            start = time.perf_counter()
+            try:
+                write_cache(self._cancer_type, self._version, cache_key, self._data, self._definitions, options=self._get_cache_options())
+            except OSError as error:
+                warnings.warn(f"Failed to cache the formatted {self._cancer_type} dataframes, so they will be parsed again the next time the dataset is loaded. {error}", FailedCacheWarning, stacklevel=4)
+            else:
+                # Swap in the lazy cached tables, so the parsed tables that are never used don't stay in memory, and the memory-mapped ones are shared
+                self._data, self._definitions = read_cache(self._cancer_type, self._version, cache_key, memmap=self._memmap)
+            self._load_profile["steps"].append({"step": "write_cache", "seconds": time.perf_counter() - start, "memory_bytes": None})
+
+        self._load_profile["total_seconds"] = time.perf_counter() - load_start
+
+    def _load_data_file(self, file_path):
+        """Load the data file at the given path into one or more dataframes in the self._data dict. Each dataset class overrides this with the parsing code for its own data files.
+
+        Parameters:
+        file_path (str): The path to the data file to load.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} doesn't implement _load_data_file.")
+
+    def _parse_data_file(self, file_path):
+        """Parse a single data file in a worker process, and return what it loaded instead of keeping it in this object.
+
+        Parameters:
+        file_path (str): The path to the data file to parse.
+
+        Returns:
+        tuple of dict, dict, dict: The dataframes the file was loaded into, with their names as keys, any definitions it contained, and the record of how long it took to load, for load_profile.
+        """
+        self._data = LazyDataDict()
+        self._definitions = {}
+        file_record = self._load_data_file_profiled(file_path)
+        return dict(self._data), self._definitions, file_record
+
+    def _load_data_file_profiled(self, file_path):
+        """Load a data file with self._load_data_file, and record how long it took, how many bytes were read, and how much memory the tables it loaded use.
+
+        Parameters:
+        file_path (str): The path to the data file to load.
+
+        Returns:
+        dict: The record for the file, for load_profile.
+        """
+        tables_before = dict(self._data)
+        start = time.perf_counter()
+        self._load_data_file(file_path)
+        seconds = time.perf_counter() - start
+
+        return {
+            "file": os.path.basename(file_path),
+            "seconds": seconds,
+            "bytes_read": os.path.getsize(file_path),
+            "tables": {name: dataframe_tools.get_memory_usage(df) for name, df in self._data.items() if tables_before.get(name) is not df}, # Only the tables this file added or replaced
+        }
+
+    def _format_data(self):
+        """Format the dataframes that were loaded into the self._data dict, once all the data files have been loaded. Each dataset class overrides this with the formatting steps for its own dataframes."""
+        raise NotImplementedError(f"{self.__class__.__name__} doesn't implement _format_data.")
+
+    def _get_cache_key(self):
+        """Get the key for this dataset's cached dataframes. It changes whenever the data files, the parsing and formatting code, or the package version change.
+
+        Returns:
+        str: The cache key.
+        """
+        # The parsing code is in the dataset's own module, and the formatting code is also in this module and in dataframe_tools
+        source_paths = [inspect.getfile(cls) for cls in type(self).__mro__ if issubclass(cls, Dataset)]
+        source_paths.append(inspect.getfile(dataframe_tools))
+
+        return get_cache_key(self._cancer_type, self._version, self._data_files_paths, source_paths, options=self._get_cache_options())
+
+    def _get_cache_options(self):
+        """Get the loading options that change the contents of the cached dataframes, so they can be made part of the cache key.
+
+        Returns:
+        dict: The options, with option names as keys.
+        """
+        return {"precision": self._precision, "genes": self._genes}
+
+    def _validate_selection(self, param_name, selection):
+        """Check a list of names passed to select part of the dataset, like the genes or tables constructor parameters.
+
+        Parameters:
+        param_name (str): The name of the parameter, for the error message.
+        selection (str, or list or array-like of str): The names passed to the parameter. A single str is treated as a list of one name. None means to select everything.
+
+        Returns:
+        list of str: The selected names, sorted and with duplicates removed, or None if selection was None.
+        """
+        if selection is None:
+            return None
+        if isinstance(selection, str):
+            selection = [selection]
+        elif not isinstance(selection, (list, tuple, set, pd.Series, pd.Index, np.ndarray)):
+            raise InvalidParameterError(f"Parameter {param_name} must be a str or a list or array-like of str, not {type(selection)}.")
+
+        selection = list(selection)
+        if not all(isinstance(name, str) for name in selection):
+            raise InvalidParameterError(f"Parameter {param_name} must only contain str.")
+
+        return sorted(set(selection))
+
+    def _get_dataframe(self, name, tissue_type="both", copy=True):
         """Check if a dataframe with the given name exists, and return a copy of it if it does.
 
         Parameters:
         name (str): The name of the dataframe to get.
         tissue_type (str): Acceptable values in ["tumor","normal","both"]. Specifies the desired tissue type desired in the dataframe. Defaults to "both".
+        copy (bool, optional): Whether to copy the dataframe, so edits on it don't affect the master. Only pass False if the result won't be edited. Default True.
 
         Returns:
-        pandas.DataFrame: A copy of the desired dataframe, if it exists in this dataset.
+        pandas.DataFrame: A copy of the desired dataframe, if it exists in this dataset. If cptac.set_option("views", True) was used, it's a view that shares its values with the master instead, where possible.
         """
-        if name in self._data.keys():
-            df = self._data[name]
-            return_df = df.copy(deep=True) # We copy it, with deep=True, so edits on their copy don't affect the master for this instance
-            return_df.index.name = df.index.name
-            return_df.columns.name = df.columns.name
-
-            if tissue_type == "tumor":
-                return self._tumor_only(return_df)
-            elif tissue_type == "normal":
-                return self._normal_only(return_df)
-            elif tissue_type == "both":
-                return return_df
-            else:
-                raise InvalidParameterError(f"Unrecognized value for tissue_type parameter. You passed '{tissue_type}'. Valid options are 'tumor', 'normal', or 'both'.")
-        else:
+        if name not in self._data.keys():
             raise DataFrameNotIncludedError(f"{name} dataframe not included in the {self.get_cancer_type()} dataset.")
 
+        df = self._data[name]
+
+        # Select the rows before copying, so only the rows we return get copied
+        if tissue_type == "tumor":
+            return df.take(self._get_tissue_positions(name)[0]) # take already makes a new dataframe, so it doesn't need to be copied
+        elif tissue_type == "normal":
+            return df.take(self._get_tissue_positions(name)[1])
+        elif tissue_type != "both":
+            raise InvalidParameterError(f"Unrecognized value for tissue_type parameter. You passed '{tissue_type}'. Valid options are 'tumor', 'normal', or 'both'.")
+
+        if not copy:
+            return df
+        elif self._data.is_memory_mapped(name):
+            return_df = df.copy(deep=False) # A deep copy would read the whole memory-mapped table into memory. The values are read-only, so edits on their copy still can't affect the master.
+        elif get_option("views"):
+            return_df = view_dataframe(df) # Shares the values with the master, with copy-on-write or as read-only values
+        else:
+            return_df = df.copy(deep=True) # We copy it, with deep=True, so edits on their copy don't affect the master for this instance
+        return_df.index.name = df.index.name
+        return_df.columns.name = df.columns.name
+        return return_df
+
     def _get_sample_status_map(self):
         """Get a pandas Series from the clinical dataframe, with sample ids as the index, and each sample's status (tumor or normal) as the values."""
-        clinical = self.get_clinical()
-        status_map = clinical["Sample_Tumor_Normal"]
-        status_map.name = "Sample_Status"
+        clinical = self._get_dataframe("clinical", copy=False)
+        status_map = clinical["Sample_Tumor_Normal"].rename("Sample_Status")
         return status_map
 
     def _check_df_valid(self, df_name, df_type):
@@ -806,8 +1154,8 @@ class Dataset:
         # Check that they passed a valid omics df
         self._check_df_valid(omics_df_name, "omics")
 
-        # Get our omics df, using _get_dataframe to catch invalid requests
-        omics_df = self._get_dataframe(omics_df_name, tissue_type)
+        # Get our omics df, using _get_dataframe to catch invalid requests. We don't copy it yet, since we copy just the selected columns below.
+        omics_df = self._get_dataframe(omics_df_name, tissue_type, copy=False)
 
         # Process genes parameter
         if isinstance(genes, str): # If it's a single gene, make it a list so we can treat everything the same
@@ -815,6 +1163,8 @@ class Dataset:
         elif isinstance(genes, (list, pd.Series, pd.Index)): # If it's already a list or array-like, we're all good
             pass
         elif genes is None: # If it's the default of None, rename columns and return the entire dataframe
+            omics_df = self._get_dataframe(omics_df_name, tissue_type)
+
             # Add the gene name to end beginning of each column header, to preserve info when we join dataframes.
             if isinstance(omics_df.columns, pd.MultiIndex):
                 omics_df.columns = omics_df.columns.set_levels(omics_df.columns.levels[0] + '_' + omics_df_name, level=0)
@@ -827,19 +1177,23 @@ class Dataset:
         genes = pd.Index(genes, name="Name")
 
         if isinstance(omics_df.columns, pd.MultiIndex):
-            contained = genes.intersection(omics_df.columns.get_level_values("Name")).drop_duplicates() # Get the genes that actually exist in the dataframe's columns
-            mi_contained = omics_df.columns[omics_df.columns.get_level_values("Name").isin(genes)]
+            # Look up the columns for each gene, instead of searching all the columns
+            gene_positions = self._get_column_positions(omics_df_name, "Name")
+            contained = pd.Index([gene for gene in genes.unique() if gene in gene_positions], dtype=genes.dtype, name="Name") # Get the genes that actually exist in the dataframe's columns
+            positions = np.sort(np.concatenate([gene_positions[gene] for gene in contained] + [np.array([], dtype=np.intp)]))
+            mi_contained = omics_df.columns.take(positions)
 
             not_contained = genes.difference(contained).drop_duplicates() # So we can warn the user later
             arrays = [not_contained] + [[np.nan] for i in range(omics_df.columns.nlevels - 1)]
             mi_not_contained = pd.MultiIndex.from_product(arrays, names=omics_df.columns.names)
 
             genes = mi_contained.union(mi_not_contained) # To use for reindexing the dataframe
+            selected = omics_df.take(positions, axis=1)
         else:
             contained = genes.intersection(omics_df.columns).drop_duplicates() # Get the genes that actually exist in the dataframe's columns
             not_contained = genes.difference(contained).drop_duplicates() # So we can warn the user later
+            selected = omics_df[contained]
 
-        selected = omics_df[contained]
         selected = selected.reindex(columns=genes) # This will add the columns not included in the dataframe, and fill them with NaN.
 
         # Warn the user about columns filled with NaN
@@ -869,8 +1223,8 @@ class Dataset:
         # Check that they passed a valid metadata df
         self._check_df_valid(df_name, "metadata")
 
-        # Get our dataframe, using _get_dataframe to catch invalid requests
-        df = self._get_dataframe(df_name, tissue_type)
+        # Get our dataframe, using _get_dataframe to catch invalid requests. We don't copy it yet, since we copy just the selected columns below.
+        df = self._get_dataframe(df_name, tissue_type, copy=False)
 
         # Process genes parameter
         if isinstance(cols, str): # If it's a single column, make it a list so we can treat everything the same
@@ -878,7 +1232,7 @@ class Dataset:
         elif isinstance(cols, (list, pd.Series, pd.Index)): # If it's already a list or array-like, we're all good
             pass
         elif cols is None: # If it's the default of None, return the entire dataframe
-            return df
+            return self._get_dataframe(df_name, tissue_type)
         else: # If it's none of those, they done messed up. Tell 'em.
             raise InvalidParameterError("Columns parameter {} is of invalid type {}. Valid types: str, or list or array-like of str.".format(cols, type(cols)))
 
@@ -902,7 +1256,7 @@ class Dataset:
         Returns:
         pandas.DataFrame: The mutations in each patient for the specified gene(s).
         """
-        somatic_mutation = self.get_somatic_mutation()
+        somatic_mutation = self._get_dataframe("somatic_mutation", copy=False) # We only read from it, so it doesn't need to be copied
 
         # Process genes parameter
         if isinstance(genes, str): # If it's a single gene, make it a list so we can treat everything the same
@@ -925,67 +1279,59 @@ class Dataset:
                 if (filter_val not in somatic_mutation[mutation_col].values) and (filter_val not in somatic_mutation[location_col].values):
                     raise InvalidParameterError(f"Filter value {filter_val} does not exist in the mutations dataframe for this dataset. Check for typos and existence. Merge aborted.")
 
-        # Create an empty dataframe, which we'll fill with the columns we select using our genes, and then return.
-        df = pd.DataFrame(index=somatic_mutation.index.copy().drop_duplicates())
+        # Look up the rows for each gene in an index of the somatic_mutation rows by gene, which is built once, instead of searching the whole dataframe for each gene
+        gene_positions = self._get_row_positions("somatic_mutation", gene_col)
         genes = pd.Series(genes).drop_duplicates()
         for gene in genes:
-            gene_mutations = somatic_mutation[somatic_mutation[gene_col] == gene] # Get all the mutations for that gene
-            if len(gene_mutations) == 0: # If the gene doesn't match any genes in the dataframe, tell them
+            if gene not in gene_positions: # If the gene doesn't match any genes in the dataframe, tell them
                 raise InvalidParameterError("{} gene not found in somatic_mutation data.".format(gene))
-            gene_mutations = gene_mutations.drop(columns=[gene_col]) # Gene column is same for every sample, so we don't need it anymore.
-
-            # Check whether all filter values exist for this particular gene. If not, that's fine, we just want to warn the user.
-            if mutations_filter is not None:
-                for filter_val in mutations_filter:
-                    if (filter_val not in gene_mutations[mutation_col].values) and (filter_val not in gene_mutations[location_col].values):
-                        warnings.warn(f"Filter value {filter_val} does not exist in the mutations data for the {gene} gene, though it exists for other genes.", ParameterWarning, stacklevel=3)
-
-            # Create another empty dataframe, which we'll fill with the mutation and location data for this gene, as lists
-            prep_index = gene_mutations.index.copy().drop_duplicates()
-            prep_columns = gene_mutations.columns.copy()
-            mutation_status_idx = pd.Index([mutation_status_col]) # Prep mutation_status_col to be joined
-            prep_cols_with_mut_status = prep_columns.append(mutation_status_idx) # Add a mutation_status column, which will indicate if there are 1 or multiple mutations
-            mutation_lists = pd.DataFrame(index=prep_index, columns=prep_cols_with_mut_status)
-
-            # Get the mutation(s), mutation status, and location information for this gene and sample
-            # Yes, I know I'm doing that horrible thing, using nested for loops to work with dataframes. However, I tried refactoring it to use DataFrame.groupby and DataFrame.apply, and both actually made it slower. Go figure.
-            for sample in mutation_lists.index:
-                sample_data = gene_mutations.loc[sample] # Get slice of dataframe for the sample
-                sample_mutations = sample_data[mutation_col] # Get mutation(s)
-                sample_locations = sample_data[location_col] # Get location(s)
-
-                # Make the mutations a list (even if there's only one)
-                if isinstance(sample_mutations, pd.Series):
-                    sample_mutations_list = sample_mutations.tolist()
-                else:
-                    sample_mutations_list = [sample_mutations]
 
-                # Make the locations a list (even if there's only one)
-                if isinstance(sample_locations, pd.Series):
-                    sample_locations_list = sample_locations.tolist()
-                else:
-                    sample_locations_list = [sample_locations]
-
-                # Figure out what our mutation status is (either single_mutation or multiple_mutation)
-                if len(sample_mutations_list) > 1:
-                    sample_mutation_status = "Multiple_mutation"
-                else:
-                    sample_mutation_status = "Single_mutation"
-
-                if mutations_filter is not None: # Filter multiple mutations down to just one
-                    chosen_mutation, chosen_location = self._filter_multiple_mutations(mutations_filter, sample_mutations_list, sample_locations_list)
-                    mutation_lists.at[sample, mutation_col] = chosen_mutation
-                    mutation_lists.at[sample, location_col] = chosen_location
-                else: # Include all the mutations!
-                    mutation_lists.at[sample, mutation_col] = sample_mutations_list
-                    mutation_lists.at[sample, location_col] = sample_locations_list
-
-                # Also add the mutations status column
-                mutation_lists.at[sample, mutation_status_col] = sample_mutation_status
+        # The dataframe we'll return has a row for every sample with mutation data, and the columns for each gene
+        sample_index = somatic_mutation.index.drop_duplicates()
+        other_cols = [col for col in somatic_mutation.columns if col != gene_col] # Mutation, Location and any other columns, which are left as NaN
+        gene_cols = other_cols + [mutation_status_col] # A mutation_status column will indicate if there are 1 or multiple mutations
+        df = pd.DataFrame(index=sample_index)
+        if len(genes) == 0:
+            return df
 
-            mutation_lists = mutation_lists.add_prefix(gene + '_') # Add the gene name to end beginning of each column header, to preserve info when we join dataframes.
-            df = df.join(mutation_lists, how='outer') # Append the columns to our dataframe we'll return.
-            df.columns.name = "Name"
+        # Get the rows for all the genes, and group them by gene and then by sample, keeping each sample's mutations in the same order as in the dataframe
+        rows = np.concatenate([gene_positions[gene] for gene in genes])
+        gene_codes = np.repeat(np.arange(len(genes)), [len(gene_positions[gene]) for gene in genes])
+        sample_codes = sample_index.get_indexer(somatic_mutation.index[rows])
+        order = np.lexsort((sample_codes, gene_codes)) # lexsort is stable
+        rows, gene_codes, sample_codes = rows[order], gene_codes[order], sample_codes[order]
+        starts = np.flatnonzero(np.concatenate([[True], (gene_codes[1:] != gene_codes[:-1]) | (sample_codes[1:] != sample_codes[:-1])]))
+        ends = np.append(starts[1:], len(rows))
+
+        # Check whether all filter values exist for each gene. If not, that's fine, we just want to warn the user.
+        if mutations_filter is not None and len(mutations_filter) > 0:
+            gene_mutations = somatic_mutation[mutation_col].iloc[rows].to_numpy()
+            gene_locations = somatic_mutation[location_col].iloc[rows].to_numpy()
+            filter_found = np.column_stack([np.bincount(gene_codes[(gene_mutations == filter_val) | (gene_locations == filter_val)], minlength=len(genes)) > 0 for filter_val in mutations_filter])
+            for gene_code, filter_index in zip(*np.nonzero(~filter_found)):
+                warnings.warn(f"Filter value {mutations_filter[filter_index]} does not exist in the mutations data for the {genes.iloc[gene_code]} gene, though it exists for other genes.", ParameterWarning, stacklevel=3)
+
+        # Fill the mutation(s), location(s) and mutation status for each gene and sample into one block of values, then make it a dataframe
+        group_rows = sample_codes[starts]
+        group_cols = gene_codes[starts] * len(gene_cols)
+        mutation_offset = gene_cols.index(mutation_col)
+        location_offset = gene_cols.index(location_col)
+
+        values = np.full((len(sample_index), len(genes) * len(gene_cols)), np.nan, dtype=object)
+        values[group_rows, group_cols + len(other_cols)] = np.where(ends - starts > 1, "Multiple_mutation", "Single_mutation")
+        if mutations_filter is not None: # Filter multiple mutations down to just one, for all the genes and samples at once
+            chosen = rows[self._filter_multiple_mutations(mutations_filter, rows, starts)]
+            values[group_rows, group_cols + mutation_offset] = somatic_mutation[mutation_col].iloc[chosen].to_numpy()
+            values[group_rows, group_cols + location_offset] = somatic_mutation[location_col].iloc[chosen].to_numpy()
+        else: # Include all the mutations!
+            mutation_values = somatic_mutation[mutation_col].iloc[rows].tolist()
+            location_values = somatic_mutation[location_col].iloc[rows].tolist()
+            for row, col, start, end in zip(group_rows, group_cols, starts, ends):
+                values[row, col + mutation_offset] = mutation_values[start:end]
+                values[row, col + location_offset] = location_values[start:end]
+
+        columns = pd.Index([gene + '_' + col for gene in genes for col in gene_cols], name="Name") # Add the gene name to end beginning of each column header, to preserve info when we join dataframes.
+        df = pd.DataFrame(values, index=sample_index, columns=columns, dtype=object)
 
         return df
     def _join_other_to_mutations(self, other, mutations, mutations_were_filtered, show_location, how, quiet):
@@ -1016,70 +1362,198 @@ class Dataset:
         wildtype_tumor_fill = "Wildtype_Tumor"
         no_mutation_fill = "No_mutation"
 
+        # Get which samples are tumor, normal or have no sample status once, for all the columns we fill
+        sample_status = sample_status_map.reindex(joined.index)
+        is_normal = (sample_status == "Normal").to_numpy()[:, np.newaxis]
+        is_tumor = (sample_status == "Tumor").to_numpy()[:, np.newaxis]
+        has_status = sample_status.notna().to_numpy()[:, np.newaxis]
+        names = joined.columns.get_level_values("Name")
+
         # Fill in Wildtype_Normal or Wildtype_Tumor for NaN values (i.e., no mutation data for that sample) in joined dataframe mutation columns
         mutation_regex = r'^.*_Mutation$' # Construct regex to find all mutation columns
-        mutation_cols = joined.columns[joined.columns.get_level_values("Name").str.match(mutation_regex)] # Get a list of all mutation columns
+        mutation_positions = np.flatnonzero(names.str.match(mutation_regex)) # Get the positions of all mutation columns
+        mutation_values = joined.iloc[:, mutation_positions].to_numpy(dtype=object, copy=True)
+        mutation_missing = pd.isnull(mutation_values)
 
         fill_log = [] # We're going to keep track of value filling, and let the user know we did it.
-        for mutation_col in mutation_cols:
+        num_filled = (mutation_missing & (is_normal | is_tumor)).sum(axis=0) # See how many values we'll fill for each gene by using sum to get number of "True" in array
+        for position, gene_num_filled in zip(mutation_positions, num_filled):
+            if gene_num_filled > 0:
+                gene = names[position].rsplit("_", maxsplit=1)[0]
+                fill_log.append(f"{gene_num_filled} samples for the {gene} gene")
 
-            # Log how many values we're going to fill for this gene
-            num_filled = (((sample_status_map == "Normal") | (sample_status_map == "Tumor")) & (pd.isnull(joined[mutation_col]))).sum() # See how many values we'll fill by using sum to get number of "True" in array
-            if num_filled > 0:
-                if isinstance(mutation_col, tuple):
-                    gene = mutation_col[0].rsplit("_", maxsplit=1)[0]
-                else:
-                    gene = mutation_col.rsplit("_", maxsplit=1)[0]
-                fill_log.append(f"{num_filled} samples for the {gene} gene")
+        # Impute values for all the mutation columns at once
+        mutation_values[mutation_missing & is_normal] = wildtype_normal_fill # Change all NaN mutation values for Normal samples to Wildtype_Normal.
+        mutation_values[mutation_missing & is_tumor] = wildtype_tumor_fill # Change all NaN mutation values for Tumor samples to Wildtype_Tumor
 
-            # Impute values
-            joined.loc[(sample_status_map == "Normal") & (pd.isnull(joined[mutation_col])), mutation_col] = wildtype_normal_fill # Change all NaN mutation values for Normal samples to Wildtype_Normal.
-            joined.loc[(sample_status_map == "Tumor") & (pd.isnull(joined[mutation_col])), mutation_col] = wildtype_tumor_fill # Change all NaN mutation values for Tumor samples to Wildtype_Tumor
-
-            # If we didn't filter mutations, encapsulate the fill values in lists, to match the other values in the column
-            if not mutations_were_filtered:
-                joined[mutation_col] = joined[mutation_col].apply(lambda x: x if isinstance(x, list) else [x])
+        # If we didn't filter mutations, encapsulate the fill values in lists, to match the other values in the column
+        if not mutations_were_filtered:
+            mutation_values[mutation_missing] = _wrap_in_list(mutation_values[mutation_missing])
+        set_columns_at(joined, mutation_positions, mutation_values)
 
         if len(fill_log) > 0 and not quiet:
             warnings.warn(f"In joining the somatic_mutation table, no mutations were found for the following samples, so they were filled with Wildtype_Tumor or Wildtype_Normal: {', '.join(fill_log)}", FilledMutationDataWarning, stacklevel=3)
 
         # Depending on show_location, either fill NaN values in the joined dataframe location columns with "No_mutation", or just drop the location columns altogether
         location_regex = r'^.*_Location$' # Construct regex to find all location columns
-        location_cols = joined.columns[joined.columns.get_level_values("Name").str.match(location_regex)] # Get a list of all location columns
-        for location_col in location_cols:
-            if show_location: # If we're including the location column, fill NaN with "No_mutation", since that's what it means, so things are clearer to the user.
-
-                # Make sure Sample Status is not NaN, though--if it is, we have no mutation data at all for that sample, so we can't say "No_mutation". It must have been a sample that was in the other dataframe, but not the mutations.
-                joined.loc[(pd.isnull(joined[location_col])) & (pd.notnull(sample_status_map)), location_col] = no_mutation_fill 
-                
-                # If we didn't filter mutations, encapsulate the fill values in lists, to match the other values in the column
-                if not mutations_were_filtered:
-                    joined[location_col] = joined[location_col].apply(lambda x: x if isinstance(x, list) else [x])
-            else:
-                joined = joined.drop(columns=[location_col]) # Drop the location column, if the caller wanted us to.
+        location_positions = np.flatnonzero(names.str.match(location_regex)) # Get the positions of all location columns
+        if show_location: # If we're including the location columns, fill NaN with "No_mutation", since that's what it means, so things are clearer to the user.
+            location_values = joined.iloc[:, location_positions].to_numpy(dtype=object, copy=True)
+            location_missing = pd.isnull(location_values)
+
+            # Make sure Sample Status is not NaN, though--if it is, we have no mutation data at all for that sample, so we can't say "No_mutation". It must have been a sample that was in the other dataframe, but not the mutations.
+            location_values[location_missing & has_status] = no_mutation_fill
+
+            # If we didn't filter mutations, encapsulate the fill values in lists, to match the other values in the column
+            if not mutations_were_filtered:
+                location_values[location_missing] = _wrap_in_list(location_values[location_missing])
+            set_columns_at(joined, location_positions, location_values)
 
         # Fill NaN values in Mutation_Status column with either Wildtype_Tumor or Wildtype_Normal
         mutation_status_regex = r"^.*_Mutation_Status$" # Construct a regex to find all Mutation_Status columns
-        mutation_status_cols = joined.columns[joined.columns.get_level_values("Name").str.match(mutation_status_regex)] # Get a list of all Mutation_Status columns
-        for mutation_status_col in mutation_status_cols:
-            joined.loc[(sample_status_map == "Normal") & (pd.isnull(joined[mutation_status_col])), mutation_status_col] = "Wildtype_Normal" # Change all NaN mutation status values for Normal samples to Wildtype_Normal
-            joined.loc[(sample_status_map == "Tumor") & (pd.isnull(joined[mutation_status_col])), mutation_status_col] = "Wildtype_Tumor" # Change all NaN mutation status values for Tumor samples to Wildtype_Tumor
+        mutation_status_positions = np.flatnonzero(names.str.match(mutation_status_regex)) # Get the positions of all Mutation_Status columns
+        mutation_status_values = joined.iloc[:, mutation_status_positions].to_numpy(dtype=object, copy=True)
+        mutation_status_missing = pd.isnull(mutation_status_values)
+        mutation_status_values[mutation_status_missing & is_normal] = "Wildtype_Normal" # Change all NaN mutation status values for Normal samples to Wildtype_Normal
+        mutation_status_values[mutation_status_missing & is_tumor] = "Wildtype_Tumor" # Change all NaN mutation status values for Tumor samples to Wildtype_Tumor
+        set_columns_at(joined, mutation_status_positions, mutation_status_values)
+
+        if not show_location:
+            joined = joined.drop(columns=joined.columns[location_positions]) # Drop the location columns, if the caller wanted us to.
 
         return joined
 
-    def _filter_multiple_mutations(self, mutations_filter, sample_mutations_list, sample_locations_list):
-        """Based on a mutations filter, choose one mutation and its location from two lists of mutations and locations.
+    def _get_genotypes_all_genes(self, genes, mutations_filter, mutation_hotspot, n_jobs):
+        """Get the genotypes for a list of genes at once, for get_genotype_all_vars. A single gene is passed as a list of one, so there's only one implementation of the prioritization.
+
+        Parameters:
+        genes (list or array-like of str): The genes.
+        mutations_filter (list of str): The mutation types to prioritize, in order of priority.
+        mutation_hotspot (list of str or None): The hotspot locations.
+        n_jobs (int): The number of processes to split the genes between. -1 means to use all available cores.
+
+        Returns:
+        pandas.DataFrame: The genotypes, indexed by Gene and Patient_ID.
+        """
+        if not isinstance(genes, (list, tuple, pd.Series, pd.Index, np.ndarray)):
+            raise InvalidParameterError("Genes parameter {} is of invalid type {}. Valid types: str, or list or array-like of str.".format(genes, type(genes)))
+        if not isinstance(n_jobs, int) or isinstance(n_jobs, bool) or (n_jobs < 1 and n_jobs != -1):
+            raise InvalidParameterError(f"{n_jobs} is not a valid value for n_jobs. Pass a positive integer, or -1 to use all available cores.")
+        genes = list(dict.fromkeys(genes)) # Drop duplicates, keeping the order
+
+        somatic_mutation = self._get_dataframe("somatic_mutation", copy=False)
+        cnv = self._get_dataframe("CNV", copy=False)
+
+        # Every gene has the same samples, which are the ones with CNV or mutation data, sorted by sample status like in the join functions
+        samples = cnv.index.union(somatic_mutation.index.drop_duplicates())
+        sample_statuses = self._get_sample_status_map().reindex(samples)
+        order = dataframe_tools.get_sample_status_order(samples, sample_statuses)
+        samples = samples[order]
+        sample_statuses = sample_statuses.to_numpy(dtype=object)[order]
+
+        # Get the CNV of each gene, using the first column for each gene if the CNV dataframe has a column multiindex
+        cnv_names = cnv.columns.get_level_values("Name") if isinstance(cnv.columns, pd.MultiIndex) else cnv.columns
+        first_columns = np.flatnonzero(~cnv_names.duplicated())
+        cnv_positions = cnv_names[first_columns].get_indexer(genes)
+        cnv_values = np.full((len(samples), len(genes)), np.nan)
+        cnv_values[:, cnv_positions >= 0] = cnv.iloc[:, first_columns[cnv_positions[cnv_positions >= 0]]].reindex(samples).to_numpy(dtype=float)
+        if (cnv_positions < 0).any():
+            warnings.warn(f"The following genes were not found in the CNV dataframe, so no Deletion or Amplification was added for them: {', '.join(np.array(genes, dtype=object)[cnv_positions < 0])}", ParameterWarning, stacklevel=3)
+
+        # Get the mutations for all the genes, grouped by gene and then by sample, keeping each sample's mutations in the same order as in the dataframe
+        gene_positions = self._get_row_positions("somatic_mutation", "Gene")
+        found = [gene_code for gene_code, gene in enumerate(genes) if gene in gene_positions]
+        rows = np.concatenate([gene_positions[genes[gene_code]] for gene_code in found] + [np.array([], dtype=np.intp)])
+        gene_codes = np.repeat(np.array(found, dtype=np.intp), [len(gene_positions[genes[gene_code]]) for gene_code in found])
+        sample_codes = samples.get_indexer(somatic_mutation.index[rows])
+        order = np.lexsort((sample_codes, gene_codes)) # lexsort is stable
+        rows, gene_codes, sample_codes = rows[order], gene_codes[order], sample_codes[order]
+        mutations = somatic_mutation["Mutation"].iloc[rows].to_numpy(dtype=object)
+        locations = somatic_mutation["Location"].iloc[rows].to_numpy(dtype=object)
+
+        # Warn about the same filled values as join_omics_to_mutations would: samples with no CNV data, and tumor or normal samples with no mutations for a gene
+        self._warn_inserted_nans("CNV", "somatic_mutation", cnv.index, somatic_mutation.index.drop_duplicates())
+        has_mutation = np.zeros((len(samples), len(genes)), dtype=bool)
+        has_mutation[sample_codes, gene_codes] = True
+        has_status = np.isin(sample_statuses, ["Tumor", "Normal"])
+        num_filled = (~has_mutation & has_status[:, np.newaxis]).sum(axis=0)
+        fill_log = [f"{gene_num_filled} samples for the {gene} gene" for gene, gene_num_filled in zip(genes, num_filled) if gene_num_filled > 0]
+        if len(fill_log) > 0:
+            warnings.warn(f"In joining the somatic_mutation table, no mutations were found for the following samples, so they were filled with Wildtype_Tumor or Wildtype_Normal: {', '.join(fill_log)}", FilledMutationDataWarning, stacklevel=3)
+
+        # Split the genes into chunks, one for each process
+        max_workers = 1 if n_jobs == 1 else os.cpu_count() if n_jobs == -1 else n_jobs
+        gene_bounds = np.linspace(0, len(genes), min(max_workers, max(len(genes), 1)) + 1).astype(int)
+        row_bounds = np.searchsorted(gene_codes, gene_bounds)
+        chunks = []
+        for gene_start, gene_end, row_start, row_end in zip(gene_bounds[:-1], gene_bounds[1:], row_bounds[:-1], row_bounds[1:]):
+            chunks.append((genes[gene_start:gene_end], samples, sample_statuses, gene_codes[row_start:row_end] - gene_start, sample_codes[row_start:row_end], mutations[row_start:row_end], locations[row_start:row_end], cnv_values[:, gene_start:gene_end], mutations_filter, self._get_mutation_classes(), mutation_hotspot))
+
+        if len(chunks) == 1:
+            genotypes = [_get_genotypes(*chunks[0])]
+        else:
+            # The chunks are independent, so we can prioritize them all at once in separate processes. Each process only gets the mutations and CNV of its genes.
+            with concurrent.futures.ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                futures = [executor.submit(_get_genotypes, *chunk) for chunk in chunks]
+                genotypes = [future.result() for future in futures] # We collect the results in gene order
+
+        return pd.concat(genotypes) if len(genotypes) > 1 else genotypes[0]
+
+    def _filter_multiple_mutations(self, mutations_filter, rows, starts):
+        """Based on a mutations filter, choose one mutation from each group of rows of the somatic_mutation dataframe, e.g. from the mutations for each gene in each sample. All the groups are filtered at once.
 
         Parameters:
         mutations_filter (list of str): A list of mutations to prioritize, in order of priority. Passing an empty list will cause truncations to be chosen over missense, and mutations earlier in the sequence over later ones.
-        sample_mutations_list (list of str): The mutations to filter.
-        sample_locations_list (list of str): The locations to filter, in the same order as the mutations.
+        rows (numpy.ndarray of int): The positions of the rows to filter in the somatic_mutation dataframe, with the rows of each group next to each other.
+        starts (numpy.ndarray of int): The position in rows where each group starts, in increasing order.
+
+        Returns:
+        numpy.ndarray of int: The position in rows of the chosen mutation for each group.
+        """
+        somatic_mutation = self._data["somatic_mutation"]
+        mutation_priorities = self._get_mutation_priorities()
+        mutations = somatic_mutation["Mutation"].iloc[rows].to_numpy()
+        locations = somatic_mutation["Location"].iloc[rows].to_numpy()
+        groups = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(rows))))
+        positions = np.arange(len(rows))
+
+        # Give each mutation a priority, lower is better. Mutations in the filter come first, in the order of the filter, and a filter value prioritizes the mutations of that type over the ones at that location. Then come truncations, missenses, GBM noncoding mutations, and all other mutations.
+        default_start = 2 * len(mutations_filter)
+        priorities = default_start + mutation_priorities["classes"][rows].astype(np.int64)
+        for i, filter_val in enumerate(mutations_filter):
+            priorities = np.where(locations == filter_val, np.minimum(priorities, 2 * i + 1), priorities)
+            priorities = np.where(mutations == filter_val, np.minimum(priorities, 2 * i), priorities)
+
+        # The candidates in each group are the mutations with its best priority
+        best = np.minimum.reduceat(priorities, starts)
+        candidates = priorities == best[groups]
+
+        # There were no truncations or missenses, so they should all be Silent mutations
+        unknown = (best[groups] == default_start + 3) & ~np.isin(mutations, ["Silent", "synonymous SNV"])
+        for mutation in mutations[unknown]:
+            warnings.warn(f"Unknown mutation type {mutation}. Assigned lowest priority in filtering.", ParameterWarning, stacklevel=4)
+
+        # Of the candidates, pick the one soonest in the peptide sequence, de-prioritizing those with no location. Ties go to the mutation type that comes first in the group for truncations, missenses and noncoding mutations, and otherwise to the first mutation.
+        type_codes = pd.factorize(mutations)[0] + 1 # NaN types get a code of 0
+        group_types, first_of_type, type_inverse = np.unique(groups * (type_codes.max() + 1) + type_codes, return_index=True, return_inverse=True)
+        by_type = (best[groups] >= default_start) & (best[groups] < default_start + 3)
+        tiebreaks = np.where(by_type, first_of_type[type_inverse], positions)
+
+        numbers = mutation_priorities["positions"][rows]
+        no_location = np.isnan(numbers)
+        candidates = np.flatnonzero(candidates)
+        order = np.lexsort((positions[candidates], tiebreaks[candidates], np.where(no_location, 0, numbers)[candidates], no_location[candidates], groups[candidates]))
+        candidates = candidates[order]
+        return candidates[np.flatnonzero(np.concatenate([[True], groups[candidates][1:] != groups[candidates][:-1]]))]
+
+    def _get_mutation_classes(self):
+        """Get the mutation types this dataset's mutation data uses for truncations, missenses and noncoding mutations, which are prioritized in that order when filtering multiple mutations.
 
         Returns:
-        str: The chosen mutation
-        str: The chosen location
+        list of str: The truncation mutation types.
+        list of str: The missense mutation types.
+        list of str: The noncoding mutation types. Only GBM has any.
         """
-        # Based on the cancer type, define which mutation types are truncations, for sorting later
         if self._cancer_type == 'colon':
             truncations = ['frameshift deletion', 'frameshift insertion', 'frameshift substitution', 'stopgain', 'stoploss']
             missenses = ['nonframeshift deletion', 'nonframeshift insertion', 'nonframeshift substitution', 'nonsynonymous SNV']
@@ -1092,116 +1566,182 @@ class Dataset:
 
         if self._cancer_type == "gbm":
             noncodings = ["Intron", "RNA", "3'Flank", "Splice_Region", "5'UTR", "5'Flank", "3'UTR"]
+        else:
+            noncodings = []
+
+        return truncations, missenses, noncodings
+
+    def _get_mutation_priorities(self):
+        """Get the default filtering priority of each row of the somatic_mutation dataframe, and the number parsed from its location, for _filter_multiple_mutations. They're computed the first time, and only computed again if the dataframe is replaced.
+
+        Returns:
+        dict: "classes" (numpy.ndarray of int8) is 0 for truncations, 1 for missenses, 2 for noncoding mutations, and 3 for all other mutations. "positions" (numpy.ndarray of float) has the first number in each location, NaN if the location is NaN, or inf if it has no number.
+        """
+        somatic_mutation = self._data["somatic_mutation"]
+
+        cached = self._mutation_priorities
+        if cached is not None and cached[0]() is somatic_mutation:
+            return cached[1]
 
-        # Filter the mutations!!
-        chosen_indices = []
-        for filter_val in mutations_filter: # This will start at the beginning of the filter list, thus filters earlier in the list are prioritized, like we want
-            if filter_val in sample_mutations_list:
-                chosen_indices = [index for index, value in enumerate(sample_mutations_list) if value == filter_val]
-            elif filter_val in sample_locations_list: # The mutations filter can also filter by location
-                chosen_indices = [index for index, value in enumerate(sample_locations_list) if value == filter_val]
-            if len(chosen_indices) > 0: # We found at least one mutation from the filter to prioritize, so we don't need to worry about later values in the filter priority list
-                break
-
-        if len(chosen_indices) == 0: # None of the mutations for the sample were in the filter, so we're going to have to use our default hierarchy
-            for mutation in sample_mutations_list:
-                if mutation in truncations:
-                    chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-        if len(chosen_indices) == 0: # None of them were in the filter, nor were truncations, so we'll grab all the missenses
-            for mutation in sample_mutations_list:
-                if mutation in missenses:
-                    chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-        if self._cancer_type == "gbm" and len(chosen_indices) == 0: # None of them were in the filter, nor were truncations, nor missenses, so we'll grab all the noncodings
-            for mutation in sample_mutations_list:
-                if mutation in noncodings:
-                    chosen_indices += [index for index, value in enumerate(sample_mutations_list) if value == mutation]
-
-        if len(chosen_indices) == 0: # There were no truncations or missenses, so they should all be Silent mutations
-            for mutation in sample_mutations_list:
-                if mutation not in ["Silent", "synonymous SNV"]:
-                    warnings.warn(f"Unknown mutation type {mutation}. Assigned lowest priority in filtering.", ParameterWarning, stacklevel=4)
-            chosen_indices = range(len(sample_mutations_list)) # We'll sort them all by location
-
-        # If there are multiple mutations in chosen_indices, the following code will pick the one soonest in the peptide sequence.
-        soonest_mutation = sample_mutations_list[chosen_indices[0]]
-        soonest_location = sample_locations_list[chosen_indices[0]]
-        for index in chosen_indices:
-            mutation = sample_mutations_list[index]
-            location = sample_locations_list[index]
-
-            if pd.isnull(location): # Some of the mutations have no location. We'll de-prioritize those.
-                continue
-            if pd.isnull(soonest_location): # This would happen if our initial value for soonest_location was NaN. If we got here, then the one we're testing isn't null, and we'll automatically prefer it
-                soonest_location = location
-                soonest_mutation = mutation
-                continue
-
-            num_location = self._parse_mutation_location(location) # Here, we're parsing the numerical position out of the location strings, for comparisons
-            num_soonest_location = self._parse_mutation_location(soonest_location)
-            if num_location < num_soonest_location:
-                soonest_location = location
-                soonest_mutation = mutation
-        return soonest_mutation, soonest_location
-
-    def _parse_mutation_location(self, location):
-        """Parse the number out of the location for a mutation.
+        truncations, missenses, noncodings = self._get_mutation_classes()
+        mutations = somatic_mutation["Mutation"]
+        classes = np.select([mutations.isin(truncations), mutations.isin(missenses), mutations.isin(noncodings)], [0, 1, 2], 3).astype(np.int8)
+
+        location_codes, unique_locations = pd.factorize(somatic_mutation["Location"]) # Many mutations share locations, so we only parse each one once
+        unique_positions = np.array(pd.to_numeric(pd.Series(unique_locations, dtype=object).astype(str).str.extract(r"(\d+)", expand=False)), dtype=float) # The first block of digits in each location
+        unique_positions[np.isnan(unique_positions)] = np.inf
+        positions = np.append(unique_positions, np.nan)[location_codes] # NaN locations have a code of -1, so they get the NaN at the end
+
+        mutation_priorities = {"classes": classes, "positions": positions}
+        self._mutation_priorities = (weakref.ref(somatic_mutation), mutation_priorities)
+        return mutation_priorities
+
+    def _get_sample_ranks(self):
+        """Get the rank of each sample when they're sorted first by sample status, with tumor first, and then by Patient_ID, so joined dataframes can be put in that order without ranking the samples again. They're computed the first time, and only computed again if the clinical dataframe is replaced.
+
+        Returns:
+        pandas.Series: The rank of each sample that has a status, indexed by Patient_ID. See dataframe_tools.get_sample_ranks.
+        """
+        clinical = self._data["clinical"]
+
+        cached = self._sample_ranks
+        if cached is not None and cached[0]() is clinical:
+            return cached[1]
+
+        sample_ranks = dataframe_tools.get_sample_ranks(clinical["Sample_Tumor_Normal"])
+        self._sample_ranks = (weakref.ref(clinical), sample_ranks)
+        return sample_ranks
+
+    def _reset_caches(self):
+        """Set the attributes in _CACHE_ATTRIBUTES to their empty values."""
+        self._tissue_positions = {} # Keys are table names, values are the row positions of the tumor and normal samples in the table. See _get_tissue_positions.
+        self._column_positions = {} # Keys are tuples of a table name and a column level, values are dicts of the positions of the columns for each value in that level. See _get_column_positions.
+        self._site_indices = {} # Keys are names of tables with a Site column level, values are the parsed sites of their columns. See _get_site_index.
+        self._row_positions = {} # Keys are tuples of a table name and a column name, values are dicts of the positions of the rows for each value in that column. See _get_row_positions.
+        self._sample_ranks = None # The ranks of the samples in sample status order. See _get_sample_ranks.
+        self._mutation_priorities = None # The default filtering priorities of the somatic_mutation rows. See _get_mutation_priorities.
+        self._gene_prefix_indices = {} # Keys are names of tables whose column names start with a gene, like somatic_mutation_binary, values are indices of their columns by gene. See _get_gene_prefix_index.
+        self._join_cache = None # The cache of join results, if it's enabled with enable_join_cache
+
+    def _get_tissue_positions(self, name):
+        """Get the row positions of the tumor samples and of the normal samples in a dataframe. They're computed the first time, and only computed again if the dataframe or the clinical dataframe is replaced in self._data.
 
         Parameters:
-        location (str): The location to parse.
+        name (str): The name of the dataframe.
 
         Returns:
-        int: The numerical part of the location.
+        numpy.ndarray of int: The positions of the rows for tumor samples.
+        numpy.ndarray of int: The positions of the rows for normal samples.
         """
-        if pd.isnull(location):
-            return location
-        num = ""
-        found_digits = False
-        for char in location:
-            if char.isdigit():
-                num = num + char
-                found_digits = True
-            else:
-                if found_digits: # We only want the first block of numbers
-                    return int(num)
-        return int(num) # We get here if the location ended with a digit
+        df = self._data[name]
+        clinical = self._data["clinical"]
+
+        cached = self._tissue_positions.get(name)
+        if cached is not None and cached[0]() is df and cached[1]() is clinical: # We keep weak references to the tables, so we don't keep replaced tables in memory
+            return cached[2], cached[3]
+
+        sample_status_col = clinical["Sample_Tumor_Normal"]
+        tumor_positions = np.flatnonzero(df.index.isin(clinical.index[sample_status_col == "Tumor"]))
+        normal_positions = np.flatnonzero(df.index.isin(clinical.index[sample_status_col == "Normal"]))
+        self._tissue_positions[name] = (weakref.ref(df), weakref.ref(clinical), tumor_positions, normal_positions)
+        return tumor_positions, normal_positions
+
+    def _get_column_positions(self, name, level="Name"):
+        """Get an index of the column positions for each value in a level of a dataframe's columns, e.g. the positions of all the columns for each gene. It's built the first time, and only built again if the dataframe's columns are replaced.
+
+        Parameters:
+        name (str): The name of the dataframe.
+        level (str, optional): The name of the column level to index, e.g. "Name", "Site", "Peptide" or "Database_ID". Default "Name".
+
+        Returns:
+        dict: Keys are the values in the level, values are numpy.ndarray of int of the positions of the columns with that value.
+        """
+        columns = self._data[name].columns
 
-    def _tumor_only(self, df):
-        """For a given dataframe, extract only the tumor samples."""
+        cached = self._column_positions.get((name, level))
+        if cached is not None and cached[0]() is columns: # Like in _get_tissue_positions, a weak reference doesn't keep replaced columns in memory
+            return cached[1]
 
-        clinical = self._get_dataframe("clinical")
-        clinical_tumor = clinical[clinical.Sample_Tumor_Normal == "Tumor"]
-        tumor_list = list(clinical_tumor.index.values)
-        tumor_df = df.loc[df.index.isin(tumor_list)]
-        return tumor_df
+        positions = dataframe_tools.get_level_positions(columns, level)
+        self._column_positions[(name, level)] = (weakref.ref(columns), positions)
+        return positions
 
-    def _normal_only(self, df):
-        """For a given dataframe, extract only the tumor samples."""
+    def _get_site_index(self, name):
+        """Get the parsed sites of a dataframe with a Site column level. It's built the first time, and only built again if the dataframe's columns are replaced.
 
-        clinical = self._get_dataframe("clinical")
-        clinical_normal = clinical[clinical.Sample_Tumor_Normal == "Normal"]
-        normal_list = list(clinical_normal.index.values)
-        normal_df = df.loc[df.index.isin(normal_list)]
-        return normal_df
+        Parameters:
+        name (str): The name of the dataframe.
+
+        Returns:
+        dict: The parsed sites for each column. See dataframe_tools.parse_sites.
+        """
+        columns = self._data[name].columns
+
+        cached = self._site_indices.get(name)
+        if cached is not None and cached[0]() is columns:
+            return cached[1]
+
+        site_index = dataframe_tools.parse_sites(columns.get_level_values("Site"))
+        self._site_indices[name] = (weakref.ref(columns), site_index)
+        return site_index
+
+    def _get_row_positions(self, name, column):
+        """Get an index of the row positions for each value in a column of a dataframe, e.g. the positions of the rows for each gene in the somatic_mutation dataframe. It's built the first time, and only built again if the dataframe is replaced.
+
+        Parameters:
+        name (str): The name of the dataframe.
+        column (str): The name of the column to index.
+
+        Returns:
+        dict: Keys are the values in the column, values are numpy.ndarray of int of the positions of the rows with that value, in increasing order.
+        """
+        df = self._data[name]
+
+        cached = self._row_positions.get((name, column))
+        if cached is not None and cached[0]() is df:
+            return cached[1]
+
+        positions = dataframe_tools.get_level_positions(pd.Index(df[column]), None)
+        self._row_positions[(name, column)] = (weakref.ref(df), positions)
+        return positions
+
+    def _get_gene_prefix_index(self, name):
+        """Get an index of the columns of a dataframe whose column names start with a gene, like somatic_mutation_binary, by gene. It's built the first time, and only built again if the dataframe's columns are replaced.
+
+        Parameters:
+        name (str): The name of the dataframe.
+
+        Returns:
+        dict: The index of the columns. See dataframe_tools.get_gene_prefix_index.
+        """
+        columns = self._data[name].columns
+
+        cached = self._gene_prefix_indices.get(name)
+        if cached is not None and cached[0]() is columns:
+            return cached[1]
+
+        gene_index = dataframe_tools.get_gene_prefix_index(columns)
+        self._gene_prefix_indices[name] = (weakref.ref(columns), gene_index)
+        return gene_index
+
+    def _get_binary_positions(self, genes, match="exact"):
+        """Get the positions of the columns for some genes in the somatic_mutation_binary dataframe.
+
+        Parameters:
+        genes (str or list of str): The genes.
+        match (str, optional): "exact" or "prefix". See get_somatic_mutation_binary. Default "exact".
+
+        Returns:
+        numpy.ndarray of int: The positions of the columns, in increasing order.
+        list of str: The genes that didn't match any columns.
+        """
+        if match not in ("exact", "prefix"):
+            raise InvalidParameterError(f"Unrecognized value for match parameter. You passed '{match}'. Valid options are 'exact' or 'prefix'.")
+        genes = self._validate_selection("genes", genes)
+        self._get_dataframe("somatic_mutation_binary", copy=False) # To catch invalid requests
+        return dataframe_tools.get_prefix_positions(self._get_gene_prefix_index("somatic_mutation_binary"), genes, match)
 
     def _check_how_parameter(self, given_how):
         possible_values = ['outer', 'inner', 'left', 'right']
         if given_how not in possible_values:
             raise InvalidParameterError("'{}' is not a valid value for 'how'. Possible values are 'outer', 'inner', 'left', 'right'.".format(given_how))
-            
-    def _join_dataframe(self, df1, df2):
-        """Joins a dataframe to another dataframe.
- 
-        Returns: pandas.DataFrame
-        """
-        if type(df1) == str:
-            return [df2, df1]
-        elif type(df1) == list:
-            how = df1[1]
-            if df1[0].columns.names != df2.columns.names:
-                    df1[0].columns = add_index_levels(to=df1[0].columns, source=df2.columns)
-                    df2.columns = add_index_levels(to=df2.columns, source=df1[0].columns)
-
-            joined = df1[0].join(df2, how= how)
-        return [joined,how]
@@ -19,12 +19,18 @@ from .exceptions import FailedReindexWarning, ReindexMapError
 
 class Endometrial(Dataset):
 
-    def __init__(self, version="latest", no_internet=False):
+    def __init__(self, version="latest", no_internet=False, use_cache=True, n_jobs=1, precision=None, memmap=None, genes=None, tables=None):
         """Load all of the endometrial dataframes as values in the self._data dict variable, with names as keys, and format them properly.
 
         Parameters:
         version (str, optional): The version number to load, or the string "latest" to just load the latest building. Default is "latest".
         no_internet (bool, optional): Whether to skip the index update step because it requires an internet connection. This will be skipped automatically if there is no internet at all, but you may want to manually skip it if you have a spotty internet connection. Default is False.
+        use_cache (bool, optional): Whether to load the formatted dataframes from the cache, if this version of the data has already been parsed, and to cache them if it hasn't. Default True.
+        n_jobs (int, optional): The number of processes to parse the data files with, if they aren't loaded from the cache. Pass -1 to use all available cores. Default 1 parses them all in this process.
+        precision (str, optional): The float dtype to store the omics dataframes in, either "float64" or "float32". float32 halves the memory used by the omics values. Default None uses the package-wide default set with cptac.set_option("precision", ...), which starts as "float64".
+        memmap (bool, optional): Whether to leave the values of the numeric omics dataframes in read-only memory-mapped files in the cache, so all the processes on a machine that load this dataset share one copy of them. Requires use_cache=True. Default None uses the package-wide default set with cptac.set_option("memmap", ...), which starts as False.
+        genes (str or list of str, optional): If given, only keep the data for these genes in the omics dataframes and the somatic_mutation dataframe. The miRNA, circular_RNA, metabolomics and lipidomics dataframes aren't named by gene, so they're kept whole. Lines for other genes are skipped before parsing where the data files allow it. Default None keeps all genes.
+        tables (str or list of str, optional): If given, only keep these dataframes, plus the clinical dataframe. Default None keeps all dataframes.
         """
 
         # Set some needed variables, and pass them to the parent Dataset class __init__ function
@@ -60,80 +66,78 @@ class Endometrial(Dataset):
                 "UCEC_followup_9_12.xlsx"],
         }
 
-        super().__init__(cancer_type="endometrial", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
-
-        # Load the data files into dataframes in the self._data dict
-        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
-        for file_path in self._data_files_paths: 
-
-            # Print a loading message. We add a dot every time, so the user knows it's not frozen.
-            loading_msg = loading_msg + "."
-            print(loading_msg, end='\r')
-
-            path_elements = file_path.split(os.sep) # Get a list of the levels of the path
-            file_name = path_elements[-1] # The last element will be the name of the file
-            df_name = file_name.split(".")[0] # Dataframe name will be the first section of file name; i.e. proteomics.txt.gz becomes proteomics
-
-            # Load the file, based on what it is
-            if file_name == "clinical.txt":
-                # Fix for reading error on clinical.txt:
-                with open(file_path, "r", errors="ignore") as clinical_file:
-                    df = pd.read_csv(clinical_file, sep="\t", index_col=0)
-                df = df.sort_index()
-                self._data[df_name] = df # Maps dataframe name to dataframe
-
-            elif file_name == "definitions.txt":
-                with open(file_path, "r") as definitions_file:
-                    for line in definitions_file.readlines():
-                        line = line.strip()
-                        line = line.split("\t")
-                        term = line[0]
-                        definition = line[1]
-                        self._definitions[term] = definition
-
-            elif file_name == "somatic.maf.gz":
-                df = pd.read_csv(file_path, sep = "\t")
-                split_barcode = df["Tumor_Sample_Barcode"].str.split("_", n=1, expand=True) # The first part of the barcode is the patient id, which we need want to make the index
-                df["Tumor_Sample_Barcode"] = split_barcode[0]
-                df = df[["Tumor_Sample_Barcode","Hugo_Symbol","Variant_Classification","HGVSp_Short"]]
-                df = df.rename({"Tumor_Sample_Barcode":"Patient_ID","Hugo_Symbol":"Gene","Variant_Classification":"Mutation","HGVSp_Short":"Location"}, axis='columns')
-                df = df.sort_values(by=["Patient_ID", "Gene"])
-                df = df.set_index("Patient_ID")
-                self._data["somatic_mutation"] = df # Maps dataframe name to dataframe
-
-            elif file_name == "acetylproteomics.cct.gz" or file_name == "phosphoproteomics_site.cct.gz":
-                df = pd.read_csv(file_path, sep = "\t", index_col=0)
-                df.index = df.index.str.rsplit('-', n=1, expand=True) # Separate the index into a multiindex where the 1st level is the gene, and 2nd is the site
-                df.index = df.index.set_names(["Name", "Site"]) # Properly name the levels
-                df = df.sort_index()
-                df = df.transpose()
-                self._data[df_name] = df # Maps dataframe name to dataframe
-
-            elif file_name == 'UCEC_followup_9_12.xlsx' and self._version == "2.1.1":
-                df = pd.read_excel(file_path)
-
-                # Replace redundant values for 'not reported' with NaN
-                nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable', 'na', 'unknown',
-                    'Not Performed', 'Unknown tumor status', 'Unknown', 'Unknown Tumor Status', 'Not specified']
-                    
-                df = df.replace(nan_equivalents, np.nan)
-
-                # Rename, set, and sort index
-                df = df.rename(columns={'Case ID': 'Patient_ID'})
-                df = df.set_index("Patient_ID")
-                df = df.sort_index()
-
-                self._data["followup"] = df
-
-            else:
-                df = pd.read_csv(file_path, sep="\t", index_col=0)
-                df = df.transpose()
-                df = df.sort_index()
-                self._data[df_name] = df # Maps dataframe name to dataframe
-
-        print(' ' * len(loading_msg), end='\r') # Erase the loading message
-        formatting_msg = "Formatting dataframes..."
-        print(formatting_msg, end='\r')
+        super().__init__(cancer_type="endometrial", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet, use_cache=use_cache, n_jobs=n_jobs, precision=precision, memmap=memmap, genes=genes, tables=tables)
+
+    def _load_data_file(self, file_path):
+        """Load the data file at the given path into one or more dataframes in the self._data dict.
+
+        Parameters:
+        file_path (str): The path to the data file to load.
+        """
+        path_elements = file_path.split(os.sep) # Get a list of the levels of the path
+        file_name = path_elements[-1] # The last element will be the name of the file
+        df_name = file_name.split(".")[0] # Dataframe name will be the first section of file name; i.e. proteomics.txt.gz becomes proteomics
+
+        # Load the file, based on what it is
+        if file_name == "clinical.txt":
+            # Fix for reading error on clinical.txt:
+            with open(file_path, "r", errors="ignore") as clinical_file:
+                df = pd.read_csv(clinical_file, sep="\t", index_col=0)
+            df = df.sort_index()
+            self._data[df_name] = df # Maps dataframe name to dataframe
+
+        elif file_name == "definitions.txt":
+            with open(file_path, "r") as definitions_file:
+                for line in definitions_file.readlines():
+                    line = line.strip()
+                    line = line.split("\t")
+                    term = line[0]
+                    definition = line[1]
+                    self._definitions[term] = definition
+
+        elif file_name == "somatic.maf.gz":
+            df = pd.read_csv(file_path, sep = "\t", usecols=["Tumor_Sample_Barcode", "Hugo_Symbol", "Variant_Classification", "HGVSp_Short"]) # Only parse the columns we keep
+            split_barcode = df["Tumor_Sample_Barcode"].str.split("_", n=1, expand=True) # The first part of the barcode is the patient id, which we need want to make the index
+            df["Tumor_Sample_Barcode"] = split_barcode[0]
+            df = df[["Tumor_Sample_Barcode","Hugo_Symbol","Variant_Classification","HGVSp_Short"]]
+            df = df.rename({"Tumor_Sample_Barcode":"Patient_ID","Hugo_Symbol":"Gene","Variant_Classification":"Mutation","HGVSp_Short":"Location"}, axis='columns')
+            df = df.sort_values(by=["Patient_ID", "Gene"])
+            df = df.set_index("Patient_ID")
+            self._data["somatic_mutation"] = df # Maps dataframe name to dataframe
+
+        elif file_name == "acetylproteomics.cct.gz" or file_name == "phosphoproteomics_site.cct.gz":
+            df = pd.read_csv(select_gene_lines(file_path, self._genes), sep = "\t", index_col=0) # If only some genes were requested, skip the lines for other genes before parsing
+            df.index = df.index.str.rsplit('-', n=1, expand=True) # Separate the index into a multiindex where the 1st level is the gene, and 2nd is the site
+            df.index = df.index.set_names(["Name", "Site"]) # Properly name the levels
+            df = df.sort_index()
+            df = df.transpose()
+            self._data[df_name] = df # Maps dataframe name to dataframe
+
+        elif file_name == 'UCEC_followup_9_12.xlsx' and self._version == "2.1.1":
+            df = pd.read_excel(file_path)
+
+            # Replace redundant values for 'not reported' with NaN
+            nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable', 'na', 'unknown',
+                'Not Performed', 'Unknown tumor status', 'Unknown', 'Unknown Tumor Status', 'Not specified']
+                
+            df = df.replace(nan_equivalents, np.nan)
+
+            # Rename, set, and sort index
+            df = df.rename(columns={'Case ID': 'Patient_ID'})
+            df = df.set_index("Patient_ID")
+            df = df.sort_index()
+
+            self._data["followup"] = df
+
+        else:
+            genes = None if df_name in ("miRNA", "transcriptomics_circular") else self._genes # The miRNAs and circular RNAs aren't named by gene
+            df = pd.read_csv(select_gene_lines(file_path, genes), sep="\t", index_col=0) # All the other files have one feature per line
+            df = df.transpose()
+            df = df.sort_index()
+            self._data[df_name] = df # Maps dataframe name to dataframe
+
+    def _format_data(self):
+        """Format the dataframes in the self._data dict, once all the data files have been loaded."""
 
         # Separate out clinical, derived_molecular, and experimental_design dataframes
         all_clinical = self._data["clinical"]
@@ -229,5 +233,3 @@ class Endometrial(Dataset):
 
         # Call function from dataframe_tools.py to standardize the names of the index and column axes
         self._data = standardize_axes_names(self._data)
-
-        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
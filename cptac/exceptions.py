@@ -50,6 +50,10 @@ class MissingFileError(FileError):
     """A data file was missing."""
     pass
 
+class SharedDatasetError(CptacError):
+    """A dataset couldn't be shared between processes, or its shared memory couldn't be attached to."""
+    pass
+
 class DataError(CptacError):
     """Something was wrong with the data."""
     pass
@@ -119,6 +123,10 @@ class FileNotUpdatedWarning(CptacWarning):
     """A file they wanted to update wasn't updated."""
     pass
 
+class FailedCacheWarning(CptacWarning):
+    """The formatted dataframes couldn't be written to the cache."""
+    pass
+
 # Developer-directed exceptions
 class CptacDevError(Exception):
     """For exceptions that are probably the developer's fault."""
@@ -14,6 +14,7 @@ import requests
 import getpass
 import bs4
 from .file_tools import *
+from .cache_tools import clear_cache
 from .exceptions import NoInternetError
 
 def download(dataset, version="latest", redownload=False):
@@ -119,6 +120,10 @@ def download(dataset, version="latest", redownload=False):
             print("\033[K", end='\r') # Use an ANSI escape sequence to print a blank line, to clear the password prompt
 
             downloaded_path = download_file(file_url, file_path, server_hash, password=password, file_message=f"{dataset} v{version} data files", file_number=file_number, total_files=total_files)
+
+    # We replaced data files, so any dataframes cached from the old files are out of date
+    clear_cache(dataset, version)
+
     return True
 
 def update_index(dataset):
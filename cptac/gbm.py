@@ -20,12 +20,18 @@ from .exceptions import FailedReindexWarning, PublicationEmbargoWarning, Reindex
 
 class Gbm(Dataset):
 
-    def __init__(self, version="latest", no_internet=False):
+    def __init__(self, version="latest", no_internet=False, use_cache=True, n_jobs=1, precision=None, memmap=None, genes=None, tables=None):
         """Load all of the gbm dataframes as values in the self._data dict variable, with names as keys, and format them properly.
 
         Parameters:
         version (str, optional): The version number to load, or the string "latest" to just load the latest building. Default is "latest".
         no_internet (bool, optional): Whether to skip the index update step because it requires an internet connection. This will be skipped automatically if there is no internet at all, but you may want to manually skip it if you have a spotty internet connection. Default is False.
+        use_cache (bool, optional): Whether to load the formatted dataframes from the cache, if this version of the data has already been parsed, and to cache them if it hasn't. Default True.
+        n_jobs (int, optional): The number of processes to parse the data files with, if they aren't loaded from the cache. Pass -1 to use all available cores. Default 1 parses them all in this process.
+        precision (str, optional): The float dtype to store the omics dataframes in, either "float64" or "float32". float32 halves the memory used by the omics values. Default None uses the package-wide default set with cptac.set_option("precision", ...), which starts as "float64".
+        memmap (bool, optional): Whether to leave the values of the numeric omics dataframes in read-only memory-mapped files in the cache, so all the processes on a machine that load this dataset share one copy of them. Requires use_cache=True. Default None uses the package-wide default set with cptac.set_option("memmap", ...), which starts as False.
+        genes (str or list of str, optional): If given, only keep the data for these genes in the omics dataframes and the somatic_mutation dataframe. The miRNA, circular_RNA, metabolomics and lipidomics dataframes aren't named by gene, so they're kept whole. Lines for other genes are skipped before parsing where the data files allow it. Default None keeps all genes.
+        tables (str or list of str, optional): If given, only keep these dataframes, plus the clinical dataframe. Default None keeps all dataframes.
         """
 
         # Set some needed variables, and pass them to the parent Dataset class __init__ function
@@ -94,163 +100,166 @@ class Gbm(Dataset):
                 "wgs_somatic_cnv_per_gene.v3.0.20191121.tsv.gz"],
         }
 
-        super().__init__(cancer_type="gbm", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
+        super().__init__(cancer_type="gbm", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet, use_cache=use_cache, n_jobs=n_jobs, precision=precision, memmap=memmap, genes=genes, tables=tables)
 
-        # Load the data into dataframes in the self._data dict
-        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
-        for file_path in self._data_files_paths: # Loops through files variable
-
-            # Print a loading message. We add a dot every time, so the user knows it's not frozen.
-            loading_msg = loading_msg + "."
-            print(loading_msg, end='\r')
-
-            path_elements = file_path.split(os.sep) # Get a list of the levels of the path
-            file_name = path_elements[-1] # The last element will be the name of the file
-            df_name = file_name.split(".")[0] # Our dataframe name will be the first section of file name, so we don't include the version
+        # Print data embargo warning, if the date hasn't passed yet.
+        today = datetime.date.today()
+        embargo_date = datetime.date(year=2021, month=3, day=1)
+        if today < embargo_date:
+            warnings.warn("The GBM dataset is under publication embargo until March 01, 2021. CPTAC is a community resource project and data are made available rapidly after generation for community research use. The embargo allows exploring and utilizing the data, but analysis may not be published until after the embargo date. Please see https://proteomics.cancer.gov/data-portal/about/data-use-agreement or enter cptac.embargo() to open the webpage for more details.", PublicationEmbargoWarning, stacklevel=2)
 
-            if df_name in ("acetylome_pnnl_d6", "acetylome_mssm_per_gene_clean"):
-                df = pd.read_csv(file_path, sep='\t')
-                split_genes = df["site"].str.rsplit("-", n=1,expand=True)  # Split the genes from the sites, splitting from the right since some genes have hyphens in their names, but the genes and sites are also separated by hyphens
-                df = df.drop(columns="site")
-                df = df.assign(Site=split_genes[1])
-                df["Site"] = df["Site"].str.replace(r"k", r"")  # Get rid of all lowercase k delimeters in the sites
+    def _load_data_file(self, file_path):
+        """Load the data file at the given path into one or more dataframes in the self._data dict.
 
-                # Create the multiindex
+        Parameters:
+        file_path (str): The path to the data file to load.
+        """
+        path_elements = file_path.split(os.sep) # Get a list of the levels of the path
+        file_name = path_elements[-1] # The last element will be the name of the file
+        df_name = file_name.split(".")[0] # Our dataframe name will be the first section of file name, so we don't include the version
+
+        if df_name in ("acetylome_pnnl_d6", "acetylome_mssm_per_gene_clean"):
+            df = pd.read_csv(file_path, sep='\t')
+            split_genes = df["site"].str.rsplit("-", n=1,expand=True)  # Split the genes from the sites, splitting from the right since some genes have hyphens in their names, but the genes and sites are also separated by hyphens
+            df = df.drop(columns="site")
+            df = df.assign(Site=split_genes[1])
+            df["Site"] = df["Site"].str.replace(r"k", r"")  # Get rid of all lowercase k delimeters in the sites
+
+            # Create the multiindex
+            df = df.rename(columns={
+                    "gene": "Name",
+                    "peptide": "Peptide",
+                    "refseq_id": "Database_ID",
+                })
+            df = df.set_index(["Name", "Site", "Peptide", "Database_ID"])  # Turn these columns into a multiindex
+            df = df.sort_index()
+
+            df = df.transpose()
+            self._data["acetylproteomics"] = df
+
+        elif df_name == "clinical_data_core":
+            df = pd.read_csv(file_path, sep='\t', index_col=0).\
+                assign(Stage="IV") # By definition they're all stage IV, since it's glioblastoma
+            self._data["clinical"] = df
+
+        elif file_name == "gbm_all_subtype_collections.2020-01-13.tsv.gz":
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+            df = df.drop(columns="sample_type")
+            self._data["derived_molecular"] = df
+
+        elif df_name == "metabolome_pnnl":
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+            df = df.transpose()
+            self._data["metabolomics"] = df
+
+        elif df_name == "metabolome_sample_info":
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+            df.index.name = "Patient_ID"
+            self._data["sample_info"] = df
+
+        elif df_name == "mirnaseq_mirna_mature_tpm":
+            df = pd.read_csv(file_path, sep='\t')
+            df = df.rename(columns={"name": "Name", "unique_id": "Database_ID"})
+            df = df.set_index(["Name", "Database_ID"]) # We use a multiindex with database IDs, not just names, to avoid duplicate column headers
+            df = df.drop(columns=["chromosome", "start", "end", "strand", "mirna_type", "mirbase_id", "precursor_id"])
+            df = df.sort_index()
+            df = df.transpose()
+            self._data["miRNA"] = df
+
+        elif df_name == "negative_lipidome_pnnl":
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+            df = df.transpose()
+            df = df.add_suffix("_negative")
+            self._data["lipidomics_negative"] = df
+
+        elif df_name in ("phosphoproteome_pnnl_d6", "phosphoproteome_mssm_per_gene_clean"):
+            df = pd.read_csv(file_path, sep='\t')
+
+            # Create our multiindex
+            split_genes = df["site"].str.rsplit("-", n=1, expand=True) # Split the genes from the sites, splitting from the right since some genes have hyphens in their names, but the genes and sites are also separated by hyphens
+            df = df.drop(columns="site")
+            df = df.assign(Site=split_genes[1])
+            df["Site"] = df["Site"].str.replace(r"[sty]", r"") # Get rid of all lowercase s, t, and y delimeters in the sites
+
+            if self._version == "1.0":
+                df = df.rename(columns={"gene": "Name", "peptide": "Peptide"})
+                df = df.set_index(["Name", "Site", "Peptide"]) # Turn these columns into a multiindex
+
+            elif self._version in ("2.0", "2.1", "3.0"):
                 df = df.rename(columns={
                         "gene": "Name",
                         "peptide": "Peptide",
                         "refseq_id": "Database_ID",
                     })
-                df = df.set_index(["Name", "Site", "Peptide", "Database_ID"])  # Turn these columns into a multiindex
-                df = df.sort_index()
-
-                df = df.transpose()
-                self._data["acetylproteomics"] = df
-
-            elif df_name == "clinical_data_core":
-                df = pd.read_csv(file_path, sep='\t', index_col=0).\
-                    assign(Stage="IV") # By definition they're all stage IV, since it's glioblastoma
-                self._data["clinical"] = df
-
-            elif file_name == "gbm_all_subtype_collections.2020-01-13.tsv.gz":
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-                df = df.drop(columns="sample_type")
-                self._data["derived_molecular"] = df
-
-            elif df_name == "metabolome_pnnl":
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-                df = df.transpose()
-                self._data["metabolomics"] = df
-
-            elif df_name == "metabolome_sample_info":
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-                df.index.name = "Patient_ID"
-                self._data["sample_info"] = df
-
-            elif df_name == "mirnaseq_mirna_mature_tpm":
-                df = pd.read_csv(file_path, sep='\t')
-                df = df.rename(columns={"name": "Name", "unique_id": "Database_ID"})
-                df = df.set_index(["Name", "Database_ID"]) # We use a multiindex with database IDs, not just names, to avoid duplicate column headers
-                df = df.drop(columns=["chromosome", "start", "end", "strand", "mirna_type", "mirbase_id", "precursor_id"])
-                df = df.sort_index()
-                df = df.transpose()
-                self._data["miRNA"] = df
-
-            elif df_name == "negative_lipidome_pnnl":
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-                df = df.transpose()
-                df = df.add_suffix("_negative")
-                self._data["lipidomics_negative"] = df
-
-            elif df_name in ("phosphoproteome_pnnl_d6", "phosphoproteome_mssm_per_gene_clean"):
-                df = pd.read_csv(file_path, sep='\t')
-
-                # Create our multiindex
-                split_genes = df["site"].str.rsplit("-", n=1, expand=True) # Split the genes from the sites, splitting from the right since some genes have hyphens in their names, but the genes and sites are also separated by hyphens
-                df = df.drop(columns="site")
-                df = df.assign(Site=split_genes[1])
-                df["Site"] = df["Site"].str.replace(r"[sty]", r"") # Get rid of all lowercase s, t, and y delimeters in the sites
-
-                if self._version == "1.0":
-                    df = df.rename(columns={"gene": "Name", "peptide": "Peptide"})
-                    df = df.set_index(["Name", "Site", "Peptide"]) # Turn these columns into a multiindex
-
-                elif self._version in ("2.0", "2.1", "3.0"):
-                    df = df.rename(columns={
-                            "gene": "Name",
-                            "peptide": "Peptide",
-                            "refseq_id": "Database_ID",
-                        })
-                    df = df.set_index(["Name", "Site", "Peptide", "Database_ID"]) # Turn these columns into a multiindex
-
-                df = df.sort_index()
-                df = df.transpose()
-                self._data["phosphoproteomics"] = df
-
-            elif df_name == "positive_lipidome_pnnl":
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-                df = df.transpose()
-                df = df.add_suffix("_positive")
-                self._data["lipidomics_positive"] = df
-
-            elif df_name in ("proteome_pnnl_per_gene_d4", "proteome_mssm_per_gene_clean"):
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-
-                if self._version in ("2.0", "2.1", "3.0"):
-                    df = df.drop(columns="refseq_id") # We don't need this database ID, because the gene name index is already unique
-
-                df = df.sort_index()
-                df = df.transpose()
-                self._data["proteomics"] = df
-
-            elif df_name == "proteome_tmt_design":
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-                df.index.name = "Patient_ID"
-                self._data["experimental_design"] = df
-
-            elif df_name == "rnaseq_bcm_circular_rna_expression_rsem_uq":
-                df = pd.read_csv(file_path, sep='\t')
-                df["circRNA_id"] = df["circRNA_id"].str.split('_', n=1, expand=True)[1] # Drop the "circ_" prefix on all the keys
-                df = df.set_index("circRNA_id")
-                df = df.drop(columns=["gene_id", "gene_name", "gene_type", "alias"])
-                df = df.transpose()
-                self._data["circular_RNA"] = df
-
-            elif df_name == "rnaseq_gene_fusion":
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-                self._data["gene_fusion"] = df
-
-            elif df_name in ("rnaseq_gdc_fpkm_uq", "rnaseq_washu_fpkm_uq"):
-                df = pd.read_csv(file_path, sep='\t')
-                df = df.rename(columns={"gene_name": "Name", "gene_id": "Database_ID"})
-                df = df.set_index(["Name", "Database_ID"]) # We use a multiindex with Ensembl IDs, not just gene names, to avoid duplicate column headers
-                df = df.drop(columns=["gene_type", "gene_status", "havana_gene", "full_length", "exon_length", "exon_num"])
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                self._data["transcriptomics"] = df
-
-            elif df_name == "tindaisy_all_cases_filtered":
-                df = pd.read_csv(file_path, sep='\t')
-                split_barcode = df["Tumor_Sample_Barcode"].str.split("_", n = 1, expand = True) # The first part of the barcode is the patient id, which we need want to make the index
-                df["Tumor_Sample_Barcode"] = split_barcode[0]
-                df = df[["Tumor_Sample_Barcode","Hugo_Symbol","Variant_Classification","HGVSp_Short"]]
-                df = df.rename({"Tumor_Sample_Barcode":"Patient_ID","Hugo_Symbol":"Gene","Variant_Classification":"Mutation","HGVSp_Short":"Location"}, axis='columns')
-                df = df.sort_values(by=["Patient_ID", "Gene"])
-                df = df.set_index("Patient_ID")
-                self._data["somatic_mutation"] = df
-
-            elif df_name == "wgs_somatic_cnv_per_gene":
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-                df = df.drop(columns=["gene_id", "gene_id_version", "original_symbol"])
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                self._data["CNV"] = df
-
-        print(' ' * len(loading_msg), end='\r') # Erase the loading message
-        formatting_msg = "Formatting dataframes..."
-        print(formatting_msg, end='\r')
+                df = df.set_index(["Name", "Site", "Peptide", "Database_ID"]) # Turn these columns into a multiindex
+
+            df = df.sort_index()
+            df = df.transpose()
+            self._data["phosphoproteomics"] = df
+
+        elif df_name == "positive_lipidome_pnnl":
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+            df = df.transpose()
+            df = df.add_suffix("_positive")
+            self._data["lipidomics_positive"] = df
+
+        elif df_name in ("proteome_pnnl_per_gene_d4", "proteome_mssm_per_gene_clean"):
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+
+            if self._version in ("2.0", "2.1", "3.0"):
+                df = df.drop(columns="refseq_id") # We don't need this database ID, because the gene name index is already unique
+
+            df = df.sort_index()
+            df = df.transpose()
+            self._data["proteomics"] = df
+
+        elif df_name == "proteome_tmt_design":
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+            df.index.name = "Patient_ID"
+            self._data["experimental_design"] = df
+
+        elif df_name == "rnaseq_bcm_circular_rna_expression_rsem_uq":
+            df = pd.read_csv(file_path, sep='\t')
+            df["circRNA_id"] = df["circRNA_id"].str.split('_', n=1, expand=True)[1] # Drop the "circ_" prefix on all the keys
+            df = df.set_index("circRNA_id")
+            df = df.drop(columns=["gene_id", "gene_name", "gene_type", "alias"])
+            df = df.transpose()
+            self._data["circular_RNA"] = df
+
+        elif df_name == "rnaseq_gene_fusion":
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+            self._data["gene_fusion"] = df
+
+        elif df_name in ("rnaseq_gdc_fpkm_uq", "rnaseq_washu_fpkm_uq"):
+            df = pd.read_csv(file_path, sep='\t')
+            df = df.rename(columns={"gene_name": "Name", "gene_id": "Database_ID"})
+            df = df.set_index(["Name", "Database_ID"]) # We use a multiindex with Ensembl IDs, not just gene names, to avoid duplicate column headers
+            df = df.drop(columns=["gene_type", "gene_status", "havana_gene", "full_length", "exon_length", "exon_num"])
+            df = df.sort_index()
+            df = df.transpose()
+            df = df.sort_index()
+            self._data["transcriptomics"] = df
+
+        elif df_name == "tindaisy_all_cases_filtered":
+            df = pd.read_csv(file_path, sep='\t', usecols=["Tumor_Sample_Barcode", "Hugo_Symbol", "Variant_Classification", "HGVSp_Short"]) # Only parse the columns we keep
+            split_barcode = df["Tumor_Sample_Barcode"].str.split("_", n = 1, expand = True) # The first part of the barcode is the patient id, which we need want to make the index
+            df["Tumor_Sample_Barcode"] = split_barcode[0]
+            df = df[["Tumor_Sample_Barcode","Hugo_Symbol","Variant_Classification","HGVSp_Short"]]
+            df = df.rename({"Tumor_Sample_Barcode":"Patient_ID","Hugo_Symbol":"Gene","Variant_Classification":"Mutation","HGVSp_Short":"Location"}, axis='columns')
+            df = df.sort_values(by=["Patient_ID", "Gene"])
+            df = df.set_index("Patient_ID")
+            self._data["somatic_mutation"] = df
+
+        elif df_name == "wgs_somatic_cnv_per_gene":
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+            df = df.drop(columns=["gene_id", "gene_id_version", "original_symbol"])
+            df = df.sort_index()
+            df = df.transpose()
+            df = df.sort_index()
+            self._data["CNV"] = df
+
+    def _format_data(self):
+        """Format the dataframes in the self._data dict, once all the data files have been loaded."""
 
         if self._version in ("2.0", "2.1", "3.0"):
             # Combine positive and negative lipidomics tables
@@ -300,11 +309,3 @@ class Gbm(Dataset):
 
         # Call function from dataframe_tools.py to standardize the names of the index and column axes
         self._data = standardize_axes_names(self._data)
-
-        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
-
-        # Print data embargo warning, if the date hasn't passed yet.
-        today = datetime.date.today()
-        embargo_date = datetime.date(year=2021, month=3, day=1)
-        if today < embargo_date:
-            warnings.warn("The GBM dataset is under publication embargo until March 01, 2021. CPTAC is a community resource project and data are made available rapidly after generation for community research use. The embargo allows exploring and utilizing the data, but analysis may not be published until after the embargo date. Please see https://proteomics.cancer.gov/data-portal/about/data-use-agreement or enter cptac.embargo() to open the webpage for more details.", PublicationEmbargoWarning, stacklevel=2)
@@ -0,0 +1,87 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+from .exceptions import InvalidParameterError
+
+# Package-wide defaults for dataset loading options. A value passed to a dataset constructor overrides the default for that dataset.
+_options = {
+    "precision": "float64",
+    "memmap": False,
+    "views": False,
+}
+
+# The allowed values for each option
+_valid_values = {
+    "precision": ["float64", "float32"],
+    "memmap": [False, True],
+    "views": [False, True],
+}
+
+def get_option(name):
+    """Get the current package-wide default for a dataset loading option.
+
+    Parameters:
+    name (str): The name of the option, either "precision", "memmap" or "views".
+
+    Returns:
+    The current default value of the option.
+    """
+    if name not in _options:
+        raise InvalidParameterError(f"'{name}' is not a valid option. Valid options are: {', '.join(_options.keys())}")
+    return _options[name]
+
+def set_option(name, value):
+    """Set the package-wide default for a dataset loading option. Changes to "precision" and "memmap" only affect datasets loaded afterwards, since they're applied when the data is loaded. "views" is read every time a get_* method is called, so it takes effect immediately for datasets that are already loaded too.
+
+    Parameters:
+    name (str): The name of the option, either "precision", "memmap" or "views".
+    value: The new default value. For "precision", either "float64" or "float32". For "memmap" and "views", either False or True.
+
+    Returns:
+    None
+    """
+    get_option(name) # Validates the name
+    if not _is_valid_value(name, value):
+        raise InvalidParameterError(f"'{value}' is not a valid value for the {name} option. Valid values are: {', '.join(str(valid) for valid in _valid_values[name])}")
+    _options[name] = value
+
+def resolve_option(name, value):
+    """Get the value a dataset should use for an option, given the value passed to its constructor.
+
+    Parameters:
+    name (str): The name of the option.
+    value: The value passed to the constructor. None means to use the package-wide default.
+
+    Returns:
+    The validated value to use.
+    """
+    if value is None:
+        return get_option(name)
+
+    get_option(name) # Validates the name
+    if not _is_valid_value(name, value):
+        raise InvalidParameterError(f"'{value}' is not a valid value for {name}. Valid values are: {', '.join(str(valid) for valid in _valid_values[name])}")
+    return value
+
+def _is_valid_value(name, value):
+    """Check whether a value is one of the allowed values for an option. The options that are either False or True only take bools, since 0, 1, 1.0 and numpy bools also compare equal to False and True.
+
+    Parameters:
+    name (str): The name of the option.
+    value: The value to check.
+
+    Returns:
+    bool: Whether the value is allowed.
+    """
+    valid_values = _valid_values[name]
+    if all(isinstance(valid, bool) for valid in valid_values):
+        return isinstance(value, bool)
+    return value in valid_values
@@ -20,12 +20,18 @@ from .exceptions import FailedReindexWarning, ReindexMapError
 
 class Ovarian(Dataset):
 
-    def __init__(self, version="latest", no_internet=False):
+    def __init__(self, version="latest", no_internet=False, use_cache=True, n_jobs=1, precision=None, memmap=None, genes=None, tables=None):
         """Load all of the ovarian dataframes as values in the self._data dict variable, with names as keys, and format them properly.
 
         Parameters:
         version (str, optional): The version number to load, or the string "latest" to just load the latest building. Default is "latest".
         no_internet (bool, optional): Whether to skip the index update step because it requires an internet connection. This will be skipped automatically if there is no internet at all, but you may want to manually skip it if you have a spotty internet connection. Default is False.
+        use_cache (bool, optional): Whether to load the formatted dataframes from the cache, if this version of the data has already been parsed, and to cache them if it hasn't. Default True.
+        n_jobs (int, optional): The number of processes to parse the data files with, if they aren't loaded from the cache. Pass -1 to use all available cores. Default 1 parses them all in this process.
+        precision (str, optional): The float dtype to store the omics dataframes in, either "float64" or "float32". float32 halves the memory used by the omics values. Default None uses the package-wide default set with cptac.set_option("precision", ...), which starts as "float64".
+        memmap (bool, optional): Whether to leave the values of the numeric omics dataframes in read-only memory-mapped files in the cache, so all the processes on a machine that load this dataset share one copy of them. Requires use_cache=True. Default None uses the package-wide default set with cptac.set_option("memmap", ...), which starts as False.
+        genes (str or list of str, optional): If given, only keep the data for these genes in the omics dataframes and the somatic_mutation dataframe. The miRNA, circular_RNA, metabolomics and lipidomics dataframes aren't named by gene, so they're kept whole. Lines for other genes are skipped before parsing where the data files allow it. Default None keeps all genes.
+        tables (str or list of str, optional): If given, only keep these dataframes, plus the clinical dataframe. Default None keeps all dataframes.
         """
 
         # Set some needed variables, and pass them to the parent Dataset class __init__ function
@@ -54,109 +60,105 @@ class Ovarian(Dataset):
                 "treatment.csv.gz"],
         }
 
-        super().__init__(cancer_type="ovarian", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
-
-        # Load the data files into dataframes in the self._data dict
-        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
-        for file_path in self._data_files_paths:
-
-            # Print a loading message. We add a dot every time, so the user knows it's not frozen.
-            loading_msg = loading_msg + "."
-            print(loading_msg, end='\r')
-
-            path_elements = file_path.split(os.sep) # Get a list of all the levels of the path
-            file_name = path_elements[-1] # The last element will be the name of the file
-            df_name = file_name.split(".")[0] # Our dataframe name will be the first section of file name (i.e. proteomics.txt.gz becomes proteomics)
-
-            if file_name == "clinical.csv.gz" or file_name == "treatment.csv.gz":
-                df = pd.read_csv(file_path, sep=",", index_col=0)
-                df = df.rename(columns={"Participant_ID":"Patient_ID"})
-                df = df.set_index("Patient_ID")
-                self._data[df_name] = df #maps dataframe name to dataframe
-
-            elif file_name == "cnv.tsv.gz":
-                df = pd.read_csv(file_path, sep="\t", index_col=0)
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                self._data["CNV"] = df #maps dataframe name to dataframe
-
-            elif file_name == "definitions.txt":
-                with open(file_path, "r", errors="ignore") as definitions_file:
-                    for line in definitions_file.readlines():
-                        line = line.strip()
-                        line = line.split("\t")
-                        term = line[0]
-                        definition = line[1]
-                        self._definitions[term] = definition
-
-            elif file_name == "phosphoproteomics.txt.gz" or file_name == "proteomics.txt.gz":
-                df = pd.read_csv(file_path, sep='\t')
-                   
-                if file_name == "proteomics.txt.gz":
-                    df = df[df["hgnc_symbol"].notnull()] # Drops all nan values in hgnc_symbol column
-
-                    # Create our column multiindex
-                    df = df.rename(columns={"hgnc_symbol": "Name", "refseq_peptide": "Database_ID"})
-                    df = df.set_index(["Name", "Database_ID"])
-
-                elif file_name == "phosphoproteomics.txt.gz":
-                    df = df[df["site"].notnull()] # Drops all rows with nan values in site column
-
-                    # Create our column multiindex
-                    split_genes = df["site"].str.rsplit("-", n=1, expand=True) # Split the genes from the sites, splitting from the right since some genes have hyphens in their names, but the genes and sites are also separated by hyphens
-                    df = df.drop(columns=["hgnc_symbol", "site"]) # hgnc_symbol is a duplicate of split_genes[0], and site is now in split_genes and will be re-inserted differently
-                    df = df.assign(Name=split_genes[0], Site=split_genes[1])
-                    df["Site"] = df["Site"].str.replace(r"[sty]", r"") # Get rid of all lowercase s, t, and y delimeters in the sites
-                    df = df.rename(columns={"refseq_peptide": "Database_ID"})
-                    df = df.set_index(["Name", "Site", "Peptide", "Database_ID"]) # Turn these columns into a multiindex
-
-                df = df.sort_index()
-                df = df.transpose()
-                df.index = df.index.where(~df.index.str.startswith('C'), df.index.str[1:]) # Take C prefix off of indices for those samples that have them (tumor samples have C, normal have N)
-                df = df.drop(index=df.index[df.index.str.startswith("OV_QC")]) # Drop all OV_QC samples--they're quality control samples not relevant for data analysis
-                self._data[df_name] = df
-
-            elif file_name == "somatic_38.maf.gz":
-                df = pd.read_csv(file_path, sep = "\t", index_col=0)
-                df = df.reset_index()
-                split_barcode = df["Tumor_Sample_Barcode"].str.split("_", n = 1, expand = True) # The first part of the barcode is the patient id, which we need to make a Patient_ID column
-                df["Tumor_Sample_Barcode"] = split_barcode[0]
-                df = df[["Tumor_Sample_Barcode","Hugo_Symbol","Variant_Classification","HGVSp_Short"]] # We only want these columns
-                df = df.rename(columns={"Tumor_Sample_Barcode":"Patient_ID","Hugo_Symbol":"Gene","Variant_Classification":"Mutation","HGVSp_Short":"Location"})
-                df = df.sort_values(by=["Patient_ID", "Gene"])
-                df = df.set_index("Patient_ID")
-                self._data['somatic_mutation'] = df
-
-            elif file_name == "transcriptomics.tsv.gz":
-                df = pd.read_csv(file_path, sep="\t", index_col=0)
-                df = df.sort_index()
-                df = df.transpose()
-                df = df.sort_index()
-                date_cols = ['1-Dec', '1-Sep', '10-Mar', '10-Sep', '11-Sep', '12-Sep', '14-Sep', '15-Sep', '2-Mar', '2-Sep', '3-Mar', '3-Sep', '4-Mar', '4-Sep', '5-Mar', '6-Mar', '6-Sep', '7-Mar', '7-Sep', '8-Mar', '8-Sep', '9-Mar', '9-Sep']
-                df = df.drop(columns=date_cols) # Drop all date values until new data is uploaded
-                self._data[df_name] = df #maps dataframe name to dataframe
-
-            elif file_name == 'Ovary_One_Year_Clinical_Data_20160927.xls' and self._version == "0.0.1":
-                df = pd.read_excel(file_path)
-
-                # Replace redundant values for "not reported" with NaN
-                nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable',
-                    'na', 'unknown', 'Not Performed', 'Unknown tumor status', 'Unknown', 
-                    'Unknown Tumor Status', 'Not specified']
-
-                df = df.replace(nan_equivalents, np.nan)
-
-                # Rename PPID to Patient_ID and set as index
-                df = df.rename(columns={'PPID': 'Patient_ID'})
-                df = df.set_index("Patient_ID")
-                df = df.sort_index()
-
-                self._data["followup"] = df
-
-        print(' ' * len(loading_msg), end='\r') # Erase the loading message
-        formatting_msg = "Formatting dataframes..."
-        print(formatting_msg, end='\r')
+        super().__init__(cancer_type="ovarian", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet, use_cache=use_cache, n_jobs=n_jobs, precision=precision, memmap=memmap, genes=genes, tables=tables)
+
+    def _load_data_file(self, file_path):
+        """Load the data file at the given path into one or more dataframes in the self._data dict.
+
+        Parameters:
+        file_path (str): The path to the data file to load.
+        """
+        path_elements = file_path.split(os.sep) # Get a list of all the levels of the path
+        file_name = path_elements[-1] # The last element will be the name of the file
+        df_name = file_name.split(".")[0] # Our dataframe name will be the first section of file name (i.e. proteomics.txt.gz becomes proteomics)
+
+        if file_name == "clinical.csv.gz" or file_name == "treatment.csv.gz":
+            df = pd.read_csv(file_path, sep=",", index_col=0)
+            df = df.rename(columns={"Participant_ID":"Patient_ID"})
+            df = df.set_index("Patient_ID")
+            self._data[df_name] = df #maps dataframe name to dataframe
+
+        elif file_name == "cnv.tsv.gz":
+            df = pd.read_csv(file_path, sep="\t", index_col=0)
+            df = df.sort_index()
+            df = df.transpose()
+            df = df.sort_index()
+            self._data["CNV"] = df #maps dataframe name to dataframe
+
+        elif file_name == "definitions.txt":
+            with open(file_path, "r", errors="ignore") as definitions_file:
+                for line in definitions_file.readlines():
+                    line = line.strip()
+                    line = line.split("\t")
+                    term = line[0]
+                    definition = line[1]
+                    self._definitions[term] = definition
+
+        elif file_name == "phosphoproteomics.txt.gz" or file_name == "proteomics.txt.gz":
+            df = pd.read_csv(file_path, sep='\t')
+               
+            if file_name == "proteomics.txt.gz":
+                df = df[df["hgnc_symbol"].notnull()] # Drops all nan values in hgnc_symbol column
+
+                # Create our column multiindex
+                df = df.rename(columns={"hgnc_symbol": "Name", "refseq_peptide": "Database_ID"})
+                df = df.set_index(["Name", "Database_ID"])
+
+            elif file_name == "phosphoproteomics.txt.gz":
+                df = df[df["site"].notnull()] # Drops all rows with nan values in site column
+
+                # Create our column multiindex
+                split_genes = df["site"].str.rsplit("-", n=1, expand=True) # Split the genes from the sites, splitting from the right since some genes have hyphens in their names, but the genes and sites are also separated by hyphens
+                df = df.drop(columns=["hgnc_symbol", "site"]) # hgnc_symbol is a duplicate of split_genes[0], and site is now in split_genes and will be re-inserted differently
+                df = df.assign(Name=split_genes[0], Site=split_genes[1])
+                df["Site"] = df["Site"].str.replace(r"[sty]", r"") # Get rid of all lowercase s, t, and y delimeters in the sites
+                df = df.rename(columns={"refseq_peptide": "Database_ID"})
+                df = df.set_index(["Name", "Site", "Peptide", "Database_ID"]) # Turn these columns into a multiindex
+
+            df = df.sort_index()
+            df = df.transpose()
+            df.index = df.index.where(~df.index.str.startswith('C'), df.index.str[1:]) # Take C prefix off of indices for those samples that have them (tumor samples have C, normal have N)
+            df = df.drop(index=df.index[df.index.str.startswith("OV_QC")]) # Drop all OV_QC samples--they're quality control samples not relevant for data analysis
+            self._data[df_name] = df
+
+        elif file_name == "somatic_38.maf.gz":
+            df = pd.read_csv(file_path, sep = "\t", usecols=["Tumor_Sample_Barcode", "Hugo_Symbol", "Variant_Classification", "HGVSp_Short"]) # Only parse the columns we keep
+            split_barcode = df["Tumor_Sample_Barcode"].str.split("_", n = 1, expand = True) # The first part of the barcode is the patient id, which we need to make a Patient_ID column
+            df["Tumor_Sample_Barcode"] = split_barcode[0]
+            df = df[["Tumor_Sample_Barcode","Hugo_Symbol","Variant_Classification","HGVSp_Short"]] # We only want these columns
+            df = df.rename(columns={"Tumor_Sample_Barcode":"Patient_ID","Hugo_Symbol":"Gene","Variant_Classification":"Mutation","HGVSp_Short":"Location"})
+            df = df.sort_values(by=["Patient_ID", "Gene"])
+            df = df.set_index("Patient_ID")
+            self._data['somatic_mutation'] = df
+
+        elif file_name == "transcriptomics.tsv.gz":
+            df = pd.read_csv(file_path, sep="\t", index_col=0)
+            df = df.sort_index()
+            df = df.transpose()
+            df = df.sort_index()
+            date_cols = ['1-Dec', '1-Sep', '10-Mar', '10-Sep', '11-Sep', '12-Sep', '14-Sep', '15-Sep', '2-Mar', '2-Sep', '3-Mar', '3-Sep', '4-Mar', '4-Sep', '5-Mar', '6-Mar', '6-Sep', '7-Mar', '7-Sep', '8-Mar', '8-Sep', '9-Mar', '9-Sep']
+            df = df.drop(columns=date_cols) # Drop all date values until new data is uploaded
+            self._data[df_name] = df #maps dataframe name to dataframe
+
+        elif file_name == 'Ovary_One_Year_Clinical_Data_20160927.xls' and self._version == "0.0.1":
+            df = pd.read_excel(file_path)
+
+            # Replace redundant values for "not reported" with NaN
+            nan_equivalents = ['Not Reported/ Unknown', 'Reported/ Unknown', 'Not Applicable',
+                'na', 'unknown', 'Not Performed', 'Unknown tumor status', 'Unknown', 
+                'Unknown Tumor Status', 'Not specified']
+
+            df = df.replace(nan_equivalents, np.nan)
+
+            # Rename PPID to Patient_ID and set as index
+            df = df.rename(columns={'PPID': 'Patient_ID'})
+            df = df.set_index("Patient_ID")
+            df = df.sort_index()
+
+            self._data["followup"] = df
+
+    def _format_data(self):
+        """Format the dataframes in the self._data dict, once all the data files have been loaded."""
 
         # Get a union of all dataframes' indices, with duplicates removed
         master_index = unionize_indices(self._data, exclude="followup")
@@ -179,5 +181,3 @@ class Ovarian(Dataset):
 
         # Call function from dataframe_tools.py to standardize the names of the index and column axes
         self._data = standardize_axes_names(self._data)
-
-        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
@@ -0,0 +1,194 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import concurrent.futures
+import threading
+import warnings
+import pandas as pd
+import cptac
+from .dataframe_tools import add_index_levels, sort_df_by_sample_ranks
+from .exceptions import InvalidParameterError, ParameterWarning
+
+DATASET_NAMES = ["Brca", "Ccrcc", "Colon", "Endometrial", "Gbm", "Hnscc", "Lscc", "Luad", "Ovarian"]
+
+# The datasets loaded by pancan_query, so later queries can reuse them. Keys are tuples of the dataset name and the arguments it was loaded with, values are futures for the loaded datasets, so a query that needs a dataset another query is still loading waits for it instead of loading it again.
+_loaded_datasets = {}
+_loaded_datasets_lock = threading.Lock()
+
+def pancan_query(tables, genes=None, cancers=None, tissue_type="both", form="wide", n_jobs=None, **dataset_kwargs):
+    """Select the same columns from the omics dataframes of several datasets at once, and combine them into one dataframe. The datasets are loaded in parallel, and kept loaded so later queries with the same dataset arguments reuse them.
+
+    Parameters:
+    tables (str, list of str, or dict): The omics dataframes to select from, e.g. "proteomics" or ["proteomics", "transcriptomics"]. Or a dict where the keys are the dataframe names, and the values are the genes to select from that dataframe (str, list of str, or None for all columns), like the join_dict parameter of multi_join.
+    genes (str or list of str, optional): The genes to select from each dataframe, if tables isn't a dict. Genes that a dataset doesn't have are filled with NaN, like in the join functions. Default None selects all columns.
+    cancers (str or list of str, optional): The datasets to query, e.g. "Brca" or ["Luad", "Lscc"]. Default None queries all nine datasets.
+    tissue_type (str, optional): Acceptable values in ["tumor","normal","both"]. Specifies the desired tissue type desired in the dataframe. Default "both".
+    form (str, optional): "wide" to get one row per sample and one column per selected column, or "long" to get one row per value, with NaN values left out. Default "wide".
+    n_jobs (int, optional): The number of datasets to load at the same time. Default None loads them all at the same time.
+    **dataset_kwargs: Arguments to pass to the constructor of each dataset, e.g. version="latest", no_internet=True or precision="float32". Datasets are only reused by queries with the same arguments.
+
+    Returns:
+    pandas.DataFrame: The selected data. Its index is a multiindex of the cancer type and the Patient_ID. In the wide form, the columns are named like in the join functions, e.g. "TP53_proteomics", and have all the column levels any of the datasets have, with "" for levels a dataset doesn't have. In the long form, there's a column for the dataframe name, a column for each column level, and a "Value" column. Its rows are grouped by cancer type, dataframe and column, and the rows for each column are in the same order as in the wide form, with tumor samples first, then normal samples.
+    """
+    # Process the parameters
+    if isinstance(tables, str):
+        tables = [tables]
+    if isinstance(tables, (list, tuple, pd.Series, pd.Index)):
+        tables = {table: genes for table in tables}
+    elif isinstance(tables, dict):
+        if genes is not None:
+            raise InvalidParameterError("Pass the genes for each dataframe as the values of the tables dict, instead of passing the genes parameter.")
+    else:
+        raise InvalidParameterError(f"Parameter tables is of invalid type {type(tables)}. Valid types: str, list of str, or dict.")
+
+    if cancers is None:
+        cancers = DATASET_NAMES
+    elif isinstance(cancers, str):
+        cancers = [cancers]
+    dataset_names = []
+    for cancer in cancers:
+        matches = [name for name in DATASET_NAMES if name.lower() == str(cancer).lower()]
+        if len(matches) == 0:
+            raise InvalidParameterError(f"{cancer} is not a valid dataset. Valid datasets are: {', '.join(DATASET_NAMES)}")
+        if matches[0] not in dataset_names:
+            dataset_names.append(matches[0])
+
+    if form not in ("wide", "long"):
+        raise InvalidParameterError(f"Unrecognized value for form parameter. You passed '{form}'. Valid options are 'wide' or 'long'.")
+
+    # Load the datasets, or get the ones that are already loaded
+    datasets = _get_datasets(dataset_names, n_jobs, dataset_kwargs)
+
+    # Select the columns from each dataset
+    selections = {} # Keys are cancer types, values are dicts of the selected columns from each table
+    missing_tables = []
+    for dataset in datasets:
+        cancer_selections = {}
+        for table, table_genes in tables.items():
+            if table not in dataset._data.keys():
+                missing_tables.append(f"{dataset.get_cancer_type()} {table}")
+                continue
+            dataset._check_df_valid(table, "omics")
+            cancer_selections[table] = dataset._get_omics_cols(table, table_genes, tissue_type=tissue_type)
+        selections[dataset.get_cancer_type()] = (dataset, cancer_selections)
+
+    if len(missing_tables) > 0:
+        warnings.warn(f"These datasets don't have these dataframes, so they were left out: {', '.join(missing_tables)}", ParameterWarning, stacklevel=2)
+
+    if form == "wide":
+        return _combine_wide(selections)
+    else:
+        return _combine_long(selections)
+
+def clear_pancan_datasets():
+    """Forget the datasets that pancan_query has loaded, so their memory can be freed. Later queries load them again."""
+    with _loaded_datasets_lock:
+        _loaded_datasets.clear()
+
+def _get_datasets(dataset_names, n_jobs, dataset_kwargs):
+    """Get loaded datasets, loading the ones that haven't been loaded with these arguments yet in parallel threads.
+
+    Parameters:
+    dataset_names (list of str): The class names of the datasets.
+    n_jobs (int or None): The number of datasets to load at the same time, or None to load them all at the same time.
+    dataset_kwargs (dict): The arguments to pass to each dataset's constructor.
+
+    Returns:
+    list of cptac.Dataset: The datasets, in the same order as their names.
+    """
+    dataset_classes = {name: getattr(cptac, name) for name in dataset_names} # Import them in this thread
+
+    futures = []
+    to_load = []
+    with _loaded_datasets_lock:
+        for name in dataset_names:
+            key = (name, repr(sorted(dataset_kwargs.items())))
+            if key not in _loaded_datasets:
+                _loaded_datasets[key] = concurrent.futures.Future()
+                to_load.append((key, name))
+            futures.append(_loaded_datasets[key])
+
+    if len(to_load) > 0:
+        max_workers = len(to_load) if n_jobs is None or n_jobs < 1 else n_jobs
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for key, name in to_load:
+                executor.submit(_load_dataset, key, dataset_classes[name], dataset_kwargs)
+
+    return [future.result() for future in futures]
+
+def _load_dataset(key, dataset_class, dataset_kwargs):
+    """Load a dataset, and set the result of its future in _loaded_datasets. If loading fails, the dataset is forgotten, so a later query can try again."""
+    future = _loaded_datasets[key]
+    try:
+        future.set_result(dataset_class(**dataset_kwargs))
+    except BaseException as error:
+        with _loaded_datasets_lock:
+            _loaded_datasets.pop(key, None)
+        future.set_exception(error)
+
+def _get_level_names(selections):
+    """Get the names of all the column levels in any of the selected dataframes, in the standard order."""
+    names = set()
+    for dataset, cancer_selections in selections.values():
+        for selected in cancer_selections.values():
+            names.update(selected.columns.names)
+    return [name for name in ["Name", "Site", "Peptide", "Database_ID"] if name in names]
+
+def _combine_wide(selections):
+    """Join the selected columns from each dataset, and then stack the datasets, giving all the columns the same levels."""
+    level_names = _get_level_names(selections)
+    if len(level_names) > 1:
+        source = pd.MultiIndex.from_arrays([[] for name in level_names], names=level_names)
+    else:
+        source = pd.Index([], name="Name")
+
+    cancer_frames = {}
+    for cancer, (dataset, cancer_selections) in selections.items():
+        if len(cancer_selections) == 0:
+            continue
+        frames = []
+        for selected in cancer_selections.values():
+            selected = selected.copy(deep=False)
+            selected.columns = add_index_levels(to=selected.columns, source=source)
+            frames.append(selected)
+
+        joined = pd.concat(frames, axis=1, join="outer")
+        joined = sort_df_by_sample_ranks(joined, dataset._get_sample_ranks()) # Tumor samples first, then normal samples, like in the join functions
+        cancer_frames[cancer] = joined
+
+    if len(cancer_frames) == 0:
+        return pd.DataFrame(index=pd.MultiIndex.from_arrays([[], []], names=["Cancer", "Patient_ID"]))
+
+    combined = pd.concat(cancer_frames, axis=0, names=["Cancer", "Patient_ID"])
+    combined.columns.names = level_names
+    return combined
+
+def _combine_long(selections):
+    """Melt the selected columns from each dataset into one row per value, and stack them."""
+    level_names = _get_level_names(selections)
+
+    frames = []
+    for cancer, (dataset, cancer_selections) in selections.items():
+        for table, selected in cancer_selections.items():
+            selected = sort_df_by_sample_ranks(selected, dataset._get_sample_ranks()) # So the values for each column are in the same order as the rows of the wide form
+            long = selected.melt(ignore_index=False, value_name="Value")
+            long = long[long["Value"].notna()]
+            long["Name"] = long["Name"].str[:-len("_" + table)] # Take the table name off the gene names, since it gets its own column
+            long.insert(0, "Table", table)
+            long.index = pd.MultiIndex.from_arrays([[cancer] * len(long), long.index], names=["Cancer", "Patient_ID"])
+            frames.append(long)
+
+    columns = ["Table"] + level_names + ["Value"]
+    if len(frames) == 0:
+        return pd.DataFrame(columns=columns, index=pd.MultiIndex.from_arrays([[], []], names=["Cancer", "Patient_ID"]))
+
+    combined = pd.concat(frames, axis=0)
+    return combined[columns]
@@ -0,0 +1,254 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import functools
+import os
+import pickle
+import uuid
+import numpy as np
+import pandas as pd
+from .cache_tools import LazyDataDict, _is_float_matrix
+from .exceptions import InvalidParameterError, SharedDatasetError
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError: # multiprocessing.shared_memory was added in Python 3.8
+    shared_memory = None
+
+# The datasets this process has attached to. Keys are handle tokens, values are the datasets. This way, a worker that gets the same handle for many tasks only attaches once. A dataset stays here, with the shared memory blocks it uses, until it's detached with detach_dataset or its server is closed in this process.
+_attached = {}
+
+# Whether this process uses the resource tracker of another process, or of a server it created, before Python 3.13. It's checked the first time this process attaches to a block. See _attach_block.
+_shares_resource_tracker = None
+
+class SharedDatasetServer:
+    """Publishes the dataframes of a loaded dataset in shared memory, so other processes on the same machine can use the dataset without loading it again or getting their own copy. Pass its handle attribute to the other processes, and call attach_dataset on it there. Close the server once the other processes are done with it, or use it as a context manager."""
+
+    def __init__(self, dataset):
+        """Copy the dataframes of a dataset into shared memory blocks.
+
+        Parameters:
+        dataset (cptac.Dataset): The dataset to share.
+        """
+        # Avoid a circular import
+        from .dataset import Dataset
+
+        if shared_memory is None:
+            raise SharedDatasetError("Sharing datasets between processes requires Python 3.8 or later.")
+        if not isinstance(dataset, Dataset):
+            raise InvalidParameterError(f"Only cptac datasets can be shared, not {type(dataset)}.")
+
+        self._blocks = []
+        tables = {}
+        try:
+            for name in dataset._data.keys():
+                df = dataset._data[name]
+
+                if _is_float_matrix(df):
+                    # The values go in their own block, in the column-major order pandas stores them in, so the attached dataframes can use the block directly. The axes are pickled into a second block.
+                    values = np.asfortranarray(df.to_numpy())
+                    block = self._create_block(values.nbytes)
+                    shared_values = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf, order="F")
+                    shared_values[...] = values
+                    del shared_values # Release our view of the block, so it can be closed later
+
+                    axes_block, axes_size = self._create_pickle_block((df.index, df.columns, df.index.name, df.columns.name))
+                    tables[name] = {
+                        "format": "matrix",
+                        "block": block.name,
+                        "dtype": values.dtype.str,
+                        "shape": values.shape,
+                        "axes_block": axes_block.name,
+                        "axes_size": axes_size,
+                    }
+
+                else:
+                    # Tables with other dtypes can't be used straight from shared memory, so each process unpickles its own copy the first time it uses the table
+                    block, size = self._create_pickle_block(df)
+                    tables[name] = {
+                        "format": "pickle",
+                        "block": block.name,
+                        "size": size,
+                        "shape": df.shape,
+                    }
+        except BaseException:
+            self.close()
+            raise
+
+        # Everything else about the dataset, like its cancer type and version, is small, so it's sent along with the handle
+        attributes = {key: value for key, value in vars(dataset).items() if key not in ("_data", "_definitions") + Dataset._CACHE_ATTRIBUTES}
+        self.handle = SharedDatasetHandle(uuid.uuid4().hex, type(dataset), attributes, dict(dataset._definitions), tables)
+
+    def close(self):
+        """Free the shared memory. Processes that already attached to the dataset can keep using it, but no more processes can attach to it. If this process attached to the dataset itself, it's detached."""
+        handle = getattr(self, "handle", None) # Not set yet if the server failed while it was being created
+        if handle is not None:
+            handle.detach()
+
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _create_block(self, size):
+        """Create a shared memory block that will be freed when the server is closed. Blocks can't be empty, so empty tables get a block of one byte."""
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self._blocks.append(block)
+        return block
+
+    def _create_pickle_block(self, obj):
+        """Pickle an object into a new shared memory block.
+
+        Returns:
+        tuple of multiprocessing.shared_memory.SharedMemory, int: The block, and the size of the pickled object, since the block may be bigger than it.
+        """
+        pickled = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        block = self._create_block(len(pickled))
+        block.buf[:len(pickled)] = pickled
+        return block, len(pickled)
+
+class SharedDatasetHandle:
+    """The information another process needs to attach to a dataset shared by a SharedDatasetServer. It's small, so it can be passed to worker processes with each task."""
+
+    def __init__(self, token, dataset_class, attributes, definitions, tables):
+        self._token = token
+        self._dataset_class = dataset_class
+        self._attributes = attributes
+        self._definitions = definitions
+        self._tables = tables
+
+    def attach(self):
+        """Get a dataset backed by the shared memory. See attach_dataset."""
+        if self._token in _attached:
+            return _attached[self._token]
+
+        dataset = object.__new__(self._dataset_class)
+        dataset.__dict__.update(self._attributes)
+        dataset._definitions = dict(self._definitions)
+        dataset._data = LazyDataDict()
+        dataset._reset_caches()
+        dataset._shared_blocks = [] # Keeps the blocks open for as long as the dataset exists
+
+        for name, table_info in self._tables.items():
+            # The numeric tables are read-only views of the shared memory, so the get_* methods don't need to copy their values
+            loader = functools.partial(_read_shared_table, dataset._shared_blocks, table_info)
+            dataset._data.add_lazy(name, loader, table_info["shape"], memory_mapped=table_info["format"] == "matrix")
+
+        _attached[self._token] = dataset
+        return dataset
+
+    def detach(self):
+        """Stop keeping the dataset attached in this process. See detach_dataset."""
+        _attached.pop(self._token, None)
+
+def share_dataset(dataset):
+    """Publish a loaded dataset in shared memory, so worker processes on the same machine can use it without loading it again or getting their own copy of it. Here is an example:
+
+    with cptac.share_dataset(cptac.Brca()) as server:
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            results = list(executor.map(analyze, [server.handle] * 10, genes))
+
+    where each call to analyze starts with brca = cptac.attach_dataset(handle).
+
+    Parameters:
+    dataset (cptac.Dataset): The dataset to share.
+
+    Returns:
+    SharedDatasetServer: The server holding the shared memory. Pass its handle attribute to the worker processes, and close it once they're done.
+    """
+    return SharedDatasetServer(dataset)
+
+def attach_dataset(handle):
+    """Get a dataset that was shared by another process with share_dataset. The dataset has the same get_* and join_* methods as the original. Its numeric omics dataframes are read-only views of the shared memory, so they aren't copied, and the other dataframes are copied into this process the first time they're used. Attaching more than once in the same process returns the same dataset, until it's detached with detach_dataset.
+
+    Parameters:
+    handle (SharedDatasetHandle): The handle attribute of the SharedDatasetServer returned by share_dataset.
+
+    Returns:
+    cptac.Dataset: The shared dataset, as an instance of the same class as the original.
+    """
+    if not isinstance(handle, SharedDatasetHandle):
+        raise InvalidParameterError(f"Expected the handle of a shared dataset, not {type(handle)}.")
+    return handle.attach()
+
+def detach_dataset(handle):
+    """Stop keeping a dataset attached with attach_dataset in this process. The dataset and the shared memory it uses are freed once nothing else refers to it, and attaching again makes a new dataset. Call this in a worker that's done with a dataset but keeps running.
+
+    Parameters:
+    handle (SharedDatasetHandle): The handle the dataset was attached with.
+
+    Returns: None
+    """
+    if not isinstance(handle, SharedDatasetHandle):
+        raise InvalidParameterError(f"Expected the handle of a shared dataset, not {type(handle)}.")
+    handle.detach()
+
+def _attach_block(name):
+    """Attach to an existing shared memory block.
+
+    Parameters:
+    name (str): The name of the block.
+
+    Returns:
+    multiprocessing.shared_memory.SharedMemory: The block.
+    """
+    try:
+        try:
+            return shared_memory.SharedMemory(name=name, track=False) # Starting with Python 3.13, this keeps the process that attached from freeing the block when it exits
+        except TypeError:
+            # Before Python 3.13, attaching registers the block with the resource tracker. If this process has its own tracker, the tracker would free the block when this process exits, so we take the block back off. Processes started by multiprocessing share the tracker of the process that started them, which also registered the block when it shared it, and unregisters it when the server is closed.
+            global _shares_resource_tracker
+            if _shares_resource_tracker is None:
+                _shares_resource_tracker = resource_tracker._resource_tracker._fd is not None # Set before we attach for the first time only if the tracker came from another process, or this process shared a dataset itself
+
+            block = shared_memory.SharedMemory(name=name)
+            if os.name == "posix" and not _shares_resource_tracker: # The resource tracker is only used on POSIX systems
+                resource_tracker.unregister(block._name, "shared_memory")
+            return block
+    except FileNotFoundError:
+        raise SharedDatasetError("The shared dataset has been closed by the process that shared it.") from None
+
+def _read_shared_table(blocks, table_info):
+    """Build a table from the shared memory blocks it was published in.
+
+    Parameters:
+    blocks (list of multiprocessing.shared_memory.SharedMemory): A list to add the attached blocks to, so they stay open as long as the dataset that uses them.
+    table_info (dict): The information the server recorded about the table.
+
+    Returns:
+    pandas.DataFrame: The table.
+    """
+    if table_info["format"] == "matrix":
+        block = _attach_block(table_info["block"])
+        axes_block = _attach_block(table_info["axes_block"])
+        blocks.append(block)
+
+        values = np.ndarray(tuple(table_info["shape"]), dtype=np.dtype(table_info["dtype"]), buffer=block.buf, order="F")
+        values.flags.writeable = False
+        index, columns, index_name, columns_name = pickle.loads(axes_block.buf[:table_info["axes_size"]])
+        axes_block.close()
+
+        df = pd.DataFrame(values, index=index, columns=columns, copy=False)
+        df.index.name = index_name
+        df.columns.name = columns_name
+        return df
+
+    else:
+        block = _attach_block(table_info["block"])
+        df = pickle.loads(block.buf[:table_info["size"]])
+        block.close()
+        return df
@@ -9,41 +9,61 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-# Function imports
-from .stats_utils import (
-        permutation_test_corr,
-        permutation_test_means,
-        wrap_pearson_corr,
-        wrap_ttest
-    )
-
-from .pathway_utils import (
+import importlib
+
+# The functions in each submodule. They're only imported the first time they're used, because the submodules import some slow packages, like scipy, statsmodels and requests. Keys are the submodules, values are their functions.
+_submodule_functions = {
+    "stats_utils": [
+        "permutation_test_corr",
+        "permutation_test_means",
+        "wrap_pearson_corr",
+        "wrap_ttest",
+    ],
+
+    "pathway_utils": [
         # Pathway member query functions
-        get_pathways_with_proteins,
-        get_proteins_in_pathways,
+        "get_pathways_with_proteins",
+        "get_proteins_in_pathways",
 
         # WikiPathways functions
-        get_interacting_proteins_wikipathways,
-        list_pathways_wikipathways,
+        "get_interacting_proteins_wikipathways",
+        "list_pathways_wikipathways",
 
         # Reactome functions
-        reactome_pathway_overlay,
-        reactome_enrichment_analysis,
+        "reactome_pathway_overlay",
+        "reactome_enrichment_analysis",
 
         # Other pathway databases functions
-        get_interacting_proteins_biogrid,
-        get_interacting_proteins_bioplex,
-        get_interacting_proteins_string
-    )
+        "get_interacting_proteins_biogrid",
+        "get_interacting_proteins_bioplex",
+        "get_interacting_proteins_string",
+    ],
 
-from .other_utils import (
+    "other_utils": [
         # Protein list getters
-        get_corum_protein_lists,
-        get_hgnc_protein_lists,
+        "get_corum_protein_lists",
+        "get_hgnc_protein_lists",
 
         # Other functions
-        get_frequently_mutated,
-        reduce_multiindex,
-        parse_hotspot,
-        search
-    )
+        "get_frequently_mutated",
+        "reduce_multiindex",
+        "parse_hotspot",
+        "search",
+    ],
+}
+
+_function_submodules = {function: submodule for submodule, functions in _submodule_functions.items() for function in functions}
+
+__all__ = list(_function_submodules.keys())
+
+def __getattr__(name):
+    """Import each function from its submodule the first time it's used."""
+    if name not in _function_submodules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module("." + _function_submodules[name], __name__), name)
+    globals()[name] = value # So we only do this once for each function
+    return value
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__all__))
@@ -37,6 +37,13 @@ from .exceptions import FailedReindexWarning, PublicationEmbargoWarning, Reindex
 # cptac/dataframe_tools.py. For more information on how to use those functions,
 # you can read their docstrings in that file.
 #
+# The parent Dataset class's __init__ function calls the _load_data_file
+# method below once for each data file, then calls the _format_data method,
+# and then caches the formatted dataframes so later loads don't need to parse
+# the data files again. So the parsing code for each file goes in
+# _load_data_file, and anything that needs all the dataframes at once goes in
+# _format_data.
+#
 # If there's something confusing about this file, look at the files for existing
 # datasets to provide examples of how this file would actually be implemented.
 # If the new dataset you're adding has something weird that isn't addressed in
@@ -48,12 +55,18 @@ from .exceptions import FailedReindexWarning, PublicationEmbargoWarning, Reindex
 ### For example, the endometrial dataset's class is called Endometrial; the BRCA dataset's class is called Brca; and the ccRCC dataset's class is called Ccrcc.
 class NameOrAcronym(DataSet):
 
-    def __init__(self, version="latest", no_internet=False):
+    def __init__(self, version="latest", no_internet=False, use_cache=True, n_jobs=1, precision=None, memmap=None, genes=None, tables=None):
         """Load all of the gbm dataframes as values in the self._data dict variable, with names as keys, and format them properly.
 
         Parameters:
         version (str, optional): The version number to load, or the string "latest" to just load the latest building. Default is "latest".
         no_internet (bool, optional): Whether to skip the index update step because it requires an internet connection. This will be skipped automatically if there is no internet at all, but you may want to manually skip it if you have a spotty internet connection. Default is False.
+        use_cache (bool, optional): Whether to load the formatted dataframes from the cache, if this version of the data has already been parsed, and to cache them if it hasn't. Default True.
+        n_jobs (int, optional): The number of processes to parse the data files with, if they aren't loaded from the cache. Pass -1 to use all available cores. Default 1 parses them all in this process.
+        precision (str, optional): The float dtype to store the omics dataframes in, either "float64" or "float32". float32 halves the memory used by the omics values. Default None uses the package-wide default set with cptac.set_option("precision", ...), which starts as "float64".
+        memmap (bool, optional): Whether to leave the values of the numeric omics dataframes in read-only memory-mapped files in the cache, so all the processes on a machine that load this dataset share one copy of them. Requires use_cache=True. Default None uses the package-wide default set with cptac.set_option("memmap", ...), which starts as False.
+        genes (str or list of str, optional): If given, only keep the data for these genes in the omics dataframes and the somatic_mutation dataframe. Lines for other genes are skipped before parsing where the data files allow it. Default None keeps all genes.
+        tables (str or list of str, optional): If given, only keep these dataframes, plus the clinical dataframe. Default None keeps all dataframes.
         """
 
         # Set some needed variables, and pass them to the parent DataSet class __init__ function
@@ -71,45 +84,58 @@ class NameOrAcronym(DataSet):
         }
 
         # Call the parent class __init__ function
-        super().__init__(cancer_type="""FILL: Insert cancer name or acronym here, in all lowercase""", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet)
+        super().__init__(cancer_type="""FILL: Insert cancer name or acronym here, in all lowercase""", version=version, valid_versions=valid_versions, data_files=data_files, no_internet=no_internet, use_cache=use_cache, n_jobs=n_jobs, precision=precision, memmap=memmap, genes=genes, tables=tables)
 
-        # Load the data into dataframes in the self._data dict
-        loading_msg = f"Loading {self.get_cancer_type()} v{self.version()}"
-        for file_path in self._data_files_paths: # Loops through files variable
+        ###FILL: If the dataset is not under publication embargo, you can remove
+        ### the code block below. If it is password protected, still remove
+        ### this warning, and instead keep the password protection warning
+        ### below.
+        # Print data embargo warning, if the date hasn't passed yet.
+        today = datetime.date.today()
+        embargo_date = datetime.date(year="""FILL: Insert embargo year""", month="""FILL: Insert embargo month""", day="""FILL: Insert embargo day""")
+        if today < embargo_date:
+            warnings.warn("The ###FILL: Insert dataset name### dataset is under publication embargo until ###FILL: Insert embargo date###. CPTAC is a community resource project and data are made available rapidly after generation for community research use. The embargo allows exploring and utilizing the data, but analysis may not be published until after the embargo date. Please see https://proteomics.cancer.gov/data-portal/about/data-use-agreement or enter cptac.embargo() to open the webpage for more details.", PublicationEmbargoWarning, stacklevel=2)
 
-            # Print a loading message. We add a dot every time, so the user knows it's not frozen.
-            loading_msg = loading_msg + "."
-            print(loading_msg, end='\r')
+        ###FILL: If the dataset is not password access only, remove the message
+        ### below. If it's under publication embargo, still remove this
+        ### warning, and keep the above warning about publication embargo.
+        # Print password access only warning
+        warnings.warn("The ###FILL: Insert dataset name### data is currently strictly reserved for CPTAC investigators. Otherwise, you are not authorized to access these data. Additionally, even after these data become publicly available, they will be subject to a publication embargo (see https://proteomics.cancer.gov/data-portal/about/data-use-agreement or enter cptac.embargo() to open the webpage for more details).", PublicationEmbargoWarning, stacklevel=2)
 
-            path_elements = file_path.split(os.sep) # Get a list of the levels of the path
-            file_name = path_elements[-1] # The last element will be the name of the file. We'll use this to identify files for parsing in the if/elif statements below
+    def _load_data_file(self, file_path):
+        """Load the data file at the given path into one or more dataframes in the self._data dict.
 
-            ###FILL: Insert if/elif statements to parse all data files. Example:
-            ###START EXAMPLE CODE###############################################
-            if file_name == "awesome_omics_data.tsv": # Note that we use the "file_name" variable to identify files. That way we don't have to use the whole path.
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-                df = df.drop(columns=["columns", "we", "don't", "want"])
-                df = df.do_some_formatting_thing()
+        Parameters:
+        file_path (str): The path to the data file to load.
+        """
+        path_elements = file_path.split(os.sep) # Get a list of the levels of the path
+        file_name = path_elements[-1] # The last element will be the name of the file. We'll use this to identify files for parsing in the if/elif statements below
 
-                df = df.sort_index()
-                df = df.transpose()
-                self._data["awesomeomics"] = df
+        ###FILL: Insert if/elif statements to parse all data files. Example:
+        ###START EXAMPLE CODE###############################################
+        if file_name == "awesome_omics_data.tsv": # Note that we use the "file_name" variable to identify files. That way we don't have to use the whole path.
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+            df = df.drop(columns=["columns", "we", "don't", "want"])
+            df = df.do_some_formatting_thing()
 
-            elif file_name == "other_data_file.tsv":
-                df = pd.read_csv(file_path, sep='\t', index_col=0)
-                df = df.drop(columns=["columns", "we", "don't", "want"])
-                df = df.super_crazy_dataframe_formatting_function()
-                df = df.even_crazier()
+            df = df.sort_index()
+            df = df.transpose()
+            self._data["awesomeomics"] = df
 
-                df = df.sort_index()
-                df = df.transpose()
-                self._data["lessawesomeomics"] = df
+        elif file_name == "other_data_file.tsv":
+            df = pd.read_csv(file_path, sep='\t', index_col=0)
+            df = df.drop(columns=["columns", "we", "don't", "want"])
+            df = df.super_crazy_dataframe_formatting_function()
+            df = df.even_crazier()
 
-            ###END EXAMPLE CODE#################################################
+            df = df.sort_index()
+            df = df.transpose()
+            self._data["lessawesomeomics"] = df
 
-        print(' ' * len(loading_msg), end='\r') # Erase the loading message
-        formatting_msg = "Formatting dataframes..."
-        print(formatting_msg, end='\r')
+        ###END EXAMPLE CODE#################################################
+
+    def _format_data(self):
+        """Format the dataframes in the self._data dict, once all the data files have been loaded."""
 
         # Get a union of all dataframes' indices, with duplicates removed
         ###FILL: If there are any tables whose index values you don't want
@@ -166,21 +192,3 @@ class NameOrAcronym(DataSet):
 
         # Call function from dataframe_tools.py to standardize the names of the index and column axes
         self._data = standardize_axes_names(self._data)
-
-        print(" " * len(formatting_msg), end='\r') # Erase the formatting message
-
-        ###FILL: If the dataset is not under publication embargo, you can remove
-        ### the code block below. If it is password protected, still remove
-        ### this warning, and instead keep the password protection warning
-        ### below.
-        # Print data embargo warning, if the date hasn't passed yet.
-        today = datetime.date.today()
-        embargo_date = datetime.date(year="""FILL: Insert embargo year""", month="""FILL: Insert embargo month""", day="""FILL: Insert embargo day""")
-        if today < embargo_date:
-            warnings.warn("The ###FILL: Insert dataset name### dataset is under publication embargo until ###FILL: Insert embargo date###. CPTAC is a community resource project and data are made available rapidly after generation for community research use. The embargo allows exploring and utilizing the data, but analysis may not be published until after the embargo date. Please see https://proteomics.cancer.gov/data-portal/about/data-use-agreement or enter cptac.embargo() to open the webpage for more details.", PublicationEmbargoWarning, stacklevel=2)
-
-        ###FILL: If the dataset is not password access only, remove the message
-        ### below. If it's under publication embargo, still remove this
-        ### warning, and keep the above warning about publication embargo.
-        # Print password access only warning
-        warnings.warn("The ###FILL: Insert dataset name### data is currently strictly reserved for CPTAC investigators. Otherwise, you are not authorized to access these data. Additionally, even after these data become publicly available, they will be subject to a publication embargo (see https://proteomics.cancer.gov/data-portal/about/data-use-agreement or enter cptac.embargo() to open the webpage for more details).", PublicationEmbargoWarning, stacklevel=2)
@@ -0,0 +1,95 @@
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Purpose of this script: Compare the speed of cptac.dataframe_tools.read_gct against the way the loaders
+# used to read GCT files, which was to read the whole file as strings with pd.read_csv(skiprows=2, dtype=object),
+# filter out the metadata rows, drop the annotation columns, convert each column with pd.to_numeric, and then
+# transpose. The script writes a synthetic gzipped GCT 1.3 file shaped like a phosphoproteomics file to a
+# temporary directory, reads it both ways, checks that the two tables are identical, and prints the best time
+# out of several runs for each. Here is an example:
+#
+# python benchmark_gct_reader.py --features 50000 --samples 200 --repeats 3
+
+import argparse
+import gzip
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from cptac.dataframe_tools import read_gct
+
+ANNOTATION_COLS = ["id", "geneSymbol", "variableSites", "sequence", "accession_numbers", "protein_mw", "species"]
+NUM_COL_META = 10
+
+def write_gct(path, num_features, num_samples):
+    rng = np.random.default_rng(0)
+    samples = [f"C3L-{i:05d}" for i in rng.permutation(num_samples)]
+    values = rng.normal(size=(num_features, num_samples))
+    values[rng.random(values.shape) < 0.1] = np.nan
+
+    with gzip.open(path, "wt") as gct_file:
+        gct_file.write("#1.3\n")
+        gct_file.write(f"{num_features}\t{num_samples}\t{len(ANNOTATION_COLS) - 1}\t{NUM_COL_META}\n")
+        gct_file.write("\t".join(ANNOTATION_COLS + samples) + "\n")
+
+        for i in range(NUM_COL_META):
+            gct_file.write("\t".join([f"meta_{i}"] + ["na"] * (len(ANNOTATION_COLS) - 1) + ["Tumor"] * num_samples) + "\n")
+
+        for i in range(num_features):
+            annotations = [f"NP_{i}_S{i % 500}s_1_1_{i % 500}_{i % 500}", f"GENE{i // 10}", f"S{i % 500}s", f"PEPTIDE{i}", f"NP_{i}", "1000", "human"]
+            row_values = ["NA" if np.isnan(value) else f"{value:.6f}" for value in values[i]]
+            gct_file.write("\t".join(annotations + row_values) + "\n")
+
+def read_gct_old(path):
+    df = pd.read_csv(path, sep="\t", skiprows=2, dtype=object)
+    df = df[df["geneSymbol"] != "na"]
+    df = df.rename(columns={"geneSymbol": "Name", "variableSites": "Site", "sequence": "Peptide", "accession_numbers": "Database_ID"})
+    df = df.set_index(["Name", "Site", "Peptide", "Database_ID"])
+    df = df.drop(columns=["id", "protein_mw", "species"])
+    df = df.apply(pd.to_numeric)
+    df = df.sort_index()
+    df = df.transpose()
+    df = df.sort_index()
+    df.index.name = "Patient_ID"
+    return df
+
+def read_gct_new(path):
+    return read_gct(path, index_cols=["Name", "Site", "Peptide", "Database_ID"], filter_col="geneSymbol",
+        prepare_annotations=lambda annotations: annotations.rename(columns={"geneSymbol": "Name", "variableSites": "Site", "sequence": "Peptide", "accession_numbers": "Database_ID"}))
+
+def best_time(func, path, repeats):
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        df = func(path)
+        times.append(time.perf_counter() - start)
+    return min(times), df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cptac's GCT reader against the old read_csv/to_numeric/transpose path.")
+    parser.add_argument("--features", type=int, default=20000, help="Number of feature rows in the synthetic file.")
+    parser.add_argument("--samples", type=int, default=200, help="Number of sample columns in the synthetic file.")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of times to read the file each way. The best time is reported.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "synthetic-phosphoproteome.gct.gz")
+        write_gct(path, args.features, args.samples)
+
+        old_time, old_df = best_time(read_gct_old, path, args.repeats)
+        new_time, new_df = best_time(read_gct_new, path, args.repeats)
+
+    pd.testing.assert_frame_equal(old_df, new_df)
+
+    print(f"Synthetic GCT file: {args.features} features x {args.samples} samples")
+    print(f"read_csv + to_numeric + transpose: {old_time:.3f} s")
+    print(f"read_gct:                          {new_time:.3f} s")
+    print(f"Speedup: {old_time / new_time:.1f}x")
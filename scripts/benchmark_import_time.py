@@ -0,0 +1,62 @@
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Purpose of this script: Measure how long "import cptac" takes now that the datasets and the cptac.utils functions
+# are imported lazily, compared to importing everything that "import cptac" used to import eagerly, i.e. all the
+# dataset modules, cptac.utils with scipy, statsmodels and requests, and the package version check. Each case is
+# run in a fresh Python process, so nothing is already imported, and the median time out of several runs is
+# reported. The script also lists which of the slow dependencies each case ends up importing. Here is an example:
+#
+# python benchmark_import_time.py --repeats 10
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+CASES = {
+    "import cptac": "import cptac",
+    "import cptac, then use a dataset class": "import cptac; cptac.Brca",
+    "everything the old import loaded": "import cptac; cptac.Brca; cptac.Ovarian; import cptac.utils.stats_utils, cptac.utils.pathway_utils, cptac.utils.other_utils",
+}
+
+HEAVY_MODULES = ["pandas", "numpy", "scipy", "statsmodels", "requests", "bs4"]
+
+def time_case(code, repeats):
+    timed_code = (
+        "import sys, time, warnings\n"
+        "warnings.simplefilter('ignore')\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(elapsed, ','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+    )
+
+    times = []
+    for i in range(repeats):
+        output = subprocess.run([sys.executable, "-c", timed_code], check=True, capture_output=True, text=True).stdout.strip().splitlines()[-1]
+        elapsed, loaded = output.split(" ", 1) if " " in output else (output, "")
+        times.append(float(elapsed))
+
+    return statistics.median(times), loaded
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the time it takes to import cptac.")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of fresh processes to time each case in. The median is reported.")
+    args = parser.parse_args()
+
+    results = {name: time_case(code, args.repeats) for name, code in CASES.items()}
+
+    for name, (median, loaded) in results.items():
+        print(f"{name:<40} {median * 1000:8.1f} ms   slow dependencies imported: {loaded if loaded else 'none'}")
+
+    fast = results["import cptac"][0]
+    full = results["everything the old import loaded"][0]
+    print(f"Speedup of import cptac: {full / fast:.0f}x")
@@ -0,0 +1,76 @@
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Purpose of this script: Compare cptac.dataframe_tools.join_dataframes, which multi_join uses to join all the
+# selected tables at once, with the old way multi_join joined them, which was one at a time from left to right,
+# adding column levels to the growing joined table at each step. It builds synthetic omics tables with overlapping
+# sets of samples, some with a single column level and some with Name and Database_ID or Name, Site, Peptide and
+# Database_ID levels like the real tables, times joining them both ways, and checks that the results are the same.
+# No data needs to be downloaded. Here is an example:
+#
+# python benchmark_multi_join.py --tables 6 --columns 20000 --repeats 5
+
+import argparse
+import statistics
+import time
+import numpy as np
+import pandas as pd
+from cptac.dataframe_tools import add_index_levels, join_dataframes
+
+LEVELS = [["Name"], ["Name", "Database_ID"], ["Name", "Site", "Peptide", "Database_ID"]]
+
+def join_pairwise(dfs, how):
+    """The old way multi_join joined the tables, kept here to compare against."""
+    joined = dfs[0].copy(deep=False)
+    for df in dfs[1:]:
+        df = df.copy(deep=False)
+        if joined.columns.names != df.columns.names:
+            joined.columns = add_index_levels(to=joined.columns, source=df.columns)
+            df.columns = add_index_levels(to=df.columns, source=joined.columns)
+        joined = joined.join(df, how=how)
+    return joined
+
+def make_tables(num_tables, num_samples, num_columns, seed):
+    rng = np.random.default_rng(seed)
+    samples = np.array([f"C3L-{i:05d}" for i in range(num_samples)], dtype=object)
+    tables = []
+    for i in range(num_tables):
+        index = pd.Index(rng.choice(samples, size=int(num_samples * 0.8), replace=False), name="Patient_ID")
+        names = LEVELS[i % len(LEVELS)]
+        arrays = [[f"G{j}_table{i}" for j in range(num_columns)]] + [[f"{name}{j}" for j in range(num_columns)] for name in names[1:]]
+        columns = pd.MultiIndex.from_arrays(arrays, names=names) if len(names) > 1 else pd.Index(arrays[0], name="Name")
+        tables.append(pd.DataFrame(rng.standard_normal((len(index), num_columns)), index=index, columns=columns))
+    return tables
+
+def time_function(function, tables, how, repeats):
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        result = function(tables, how)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark joining many tables at once against joining them one at a time.")
+    parser.add_argument("--tables", type=int, nargs="+", default=[2, 4, 6], help="Numbers of tables to join. Default 2 4 6.")
+    parser.add_argument("--samples", type=int, default=200, help="Number of samples in the dataset. Each table has a random 80 percent of them. Default 200.")
+    parser.add_argument("--columns", type=int, default=10000, help="Number of columns in each table. Default 10000.")
+    parser.add_argument("--how", default="outer", help="Type of join. Default outer.")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of times to time each case. The median is reported. Default 5.")
+    args = parser.parse_args()
+
+    print("| Tables | Columns per table | Pairwise (ms) | All at once (ms) | Speedup |")
+    print("|---|---|---|---|---|")
+    for num_tables in args.tables:
+        tables = make_tables(num_tables, args.samples, args.columns, seed=num_tables)
+        pairwise_time, pairwise_result = time_function(join_pairwise, tables, args.how, args.repeats)
+        single_time, single_result = time_function(join_dataframes, tables, args.how, args.repeats)
+        pd.testing.assert_frame_equal(pairwise_result, single_result)
+        print(f"| {num_tables} | {args.columns} | {pairwise_time * 1e3:.1f} | {single_time * 1e3:.1f} | {pairwise_time / single_time:.1f}x |")
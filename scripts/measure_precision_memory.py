@@ -0,0 +1,57 @@
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Purpose of this script: Measure how much memory the precision="float32" loading option saves for each
+# dataset. For every dataset given (all of them by default), the script loads the dataset once with float64
+# and once with float32 precision, and prints the memory used by each omics table both ways, along with the
+# totals for the dataset. The numbers only count the values and the axes of each table, as reported by
+# DataFrame.memory_usage. The data for each dataset must already be downloaded. Here is an example:
+#
+# python measure_precision_memory.py Brca Luad
+#
+# This prints a markdown table, so the output can be pasted into docs/memory_and_performance.md.
+
+import sys
+import warnings
+import cptac
+
+def table_memory(df):
+    return df.memory_usage(index=True, deep=False).sum() + df.columns.memory_usage(deep=False)
+
+def measure(dataset_name):
+    rows = []
+    dataset_class = getattr(cptac, dataset_name)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore") # The embargo warnings would clutter the output
+        full = dataset_class(no_internet=True, precision="float64")
+        compact = dataset_class(no_internet=True, precision="float32")
+
+    for name in full._valid_omics_dfs:
+        if name not in full._data.keys():
+            continue
+        full_bytes = table_memory(full._data[name])
+        compact_bytes = table_memory(compact._data[name])
+        rows.append((dataset_name, name, full._data[name].shape, full_bytes, compact_bytes))
+
+    return rows
+
+if __name__ == "__main__":
+    dataset_names = sys.argv[1:] if len(sys.argv) > 1 else ["Brca", "Ccrcc", "Colon", "Endometrial", "Gbm", "Hnscc", "Lscc", "Luad", "Ovarian"]
+
+    print("| Dataset | Table | Shape | float64 (MB) | float32 (MB) | Saved (MB) |")
+    print("|---|---|---|---|---|---|")
+    for dataset_name in dataset_names:
+        rows = measure(dataset_name)
+        for dataset, table, shape, full_bytes, compact_bytes in rows:
+            print(f"| {dataset} | {table} | {shape[0]} x {shape[1]} | {full_bytes / 1e6:.1f} | {compact_bytes / 1e6:.1f} | {(full_bytes - compact_bytes) / 1e6:.1f} |")
+
+        total_full = sum(row[3] for row in rows)
+        total_compact = sum(row[4] for row in rows)
+        print(f"| **{dataset_name}** | **all omics** | | **{total_full / 1e6:.1f}** | **{total_compact / 1e6:.1f}** | **{(total_full - total_compact) / 1e6:.1f}** |")
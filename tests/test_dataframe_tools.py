@@ -0,0 +1,167 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Tests for the dataframe_tools functions, on small dataframes built here, so they don't need any data downloaded
+
+import numpy as np
+import pandas as pd
+import pandas.testing
+
+from cptac import dataframe_tools
+
+SAMPLES = pd.Index(["S1", "S2"], name="Patient_ID")
+
+def test_select_genes_only_filters_gene_tables():
+    data = {
+        "proteomics": pd.DataFrame([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], index=SAMPLES, columns=["TP53", "PTEN", "KRAS"]),
+        "phosphoproteomics": pd.DataFrame([[1.0, 2.0], [3.0, 4.0]], index=SAMPLES, columns=pd.MultiIndex.from_tuples([("TP53", "S15"), ("KRAS", "T58")], names=["Name", "Site"])),
+        "somatic_mutation_binary": pd.DataFrame([[1, 0], [0, 1]], index=SAMPLES, columns=["TP53_p.R273H", "KRAS_p.G12D"]),
+        "somatic_mutation": pd.DataFrame({"Gene": ["TP53", "KRAS"], "Mutation": ["Missense_Mutation", "Missense_Mutation"]}, index=SAMPLES),
+        "miRNA": pd.DataFrame([[1.0], [2.0]], index=SAMPLES, columns=["hsa-miR-21-5p"]),
+        "circular_RNA": pd.DataFrame([[1.0], [2.0]], index=SAMPLES, columns=["chr1_100_200_TP53"]),
+        "metabolomics": pd.DataFrame([[1.0], [2.0]], index=SAMPLES, columns=["glucose"]),
+        "lipidomics": pd.DataFrame([[1.0], [2.0]], index=SAMPLES, columns=["PC 34:1"]),
+    }
+    originals = {name: df.copy() for name, df in data.items()}
+
+    selected = dataframe_tools.select_genes(data, list(data.keys()), ["TP53"])
+
+    assert list(selected["proteomics"].columns) == ["TP53"]
+    assert list(selected["phosphoproteomics"].columns) == [("TP53", "S15")]
+    assert list(selected["somatic_mutation_binary"].columns) == ["TP53_p.R273H"]
+    assert list(selected["somatic_mutation"]["Gene"]) == ["TP53"]
+
+    # The tables that aren't named by gene are kept whole
+    for name in dataframe_tools.NON_GENE_DFS:
+        pandas.testing.assert_frame_equal(selected[name], originals[name])
+
+def test_set_columns_at_replaces_duplicate_columns(monkeypatch):
+    for has_isetitem in (True, False):
+        if not has_isetitem: # Versions before pandas 1.5 don't have isetitem
+            monkeypatch.delattr(pd.DataFrame, "isetitem", raising=False)
+
+        df = pd.DataFrame([[1.0, "a", "b"], [2.0, None, "c"]], index=SAMPLES, columns=["TP53_Mutation", "TP53_Mutation", "Sample_Status"], dtype=object)
+        dataframe_tools.set_columns_at(df, [0, 1], pd.DataFrame([["x", ["y"]], ["z", ["w"]]]).to_numpy(dtype=object))
+
+        assert df.iloc[:, 0].tolist() == ["x", "z"]
+        assert df.iloc[:, 1].tolist() == [["y"], ["w"]]
+        assert df.iloc[:, 2].tolist() == ["b", "c"]
+
+def make_normal_id_data():
+    """Make a data dictionary where the normal samples' IDs start with "N-". The experimental_design table has its own sample statuses, which disagree with the clinical table for N-C4."""
+    clinical = pd.DataFrame({"Sample_Tumor_Normal": ["Tumor", "Normal", "Tumor", "Normal"], "Age": [1, 2, 3, 4]}, index=pd.Index(["C1", "N-C1", "C2", "N-C3"], name="Patient_ID"))
+    proteomics = pd.DataFrame({"TP53": [1.0, 2.0, 3.0, 4.0]}, index=pd.Index(["N-C1", "C1", "X9", "N-C3"], name="Patient_ID"))
+    experimental_design = pd.DataFrame({"Sample_Tumor_Normal": ["Normal", "Tumor"], "Batch": [1, 2]}, index=pd.Index(["N-C2", "N-C4"], name="Patient_ID"))
+    phosphoproteomics = pd.DataFrame([[1.0], [2.0]], index=pd.Index(["N-C1", "C2"], name="Patient_ID"), columns=pd.MultiIndex.from_tuples([("TP53", "S15")], names=["Name", "Site"]))
+    return {"clinical": clinical, "proteomics": proteomics, "experimental_design": experimental_design, "phosphoproteomics": phosphoproteomics}
+
+def test_reformat_normal_patient_ids():
+    data = dataframe_tools.reformat_normal_patient_ids(make_normal_id_data(), existing_identifier="N-", existing_identifier_location="start")
+
+    # Samples that aren't in the clinical table, like X9, keep their IDs, and tables with their own sample statuses use those
+    assert list(data["clinical"].index) == ["C1", "C1.N", "C2", "C3.N"]
+    assert list(data["proteomics"].index) == ["C1.N", "C1", "X9", "C3.N"]
+    assert list(data["experimental_design"].index) == ["C2.N", "N-C4"]
+    assert list(data["phosphoproteomics"].index) == ["C1.N", "C2"]
+    for df in data.values():
+        assert df.index.name == "Patient_ID"
+
+    # Only the index changes
+    assert list(data["proteomics"]["TP53"]) == [1.0, 2.0, 3.0, 4.0]
+    assert data["proteomics"].columns.name == "Name"
+    assert data["phosphoproteomics"].columns.names == ["Name", "Site"]
+
+    # An identifier at the end is removed the same way
+    data = make_normal_id_data()
+    for name, df in data.items():
+        data[name] = df.rename(index=lambda sample: sample[2:] + ".NAT" if sample.startswith("N-") else sample)
+    data = dataframe_tools.reformat_normal_patient_ids(data, existing_identifier=".NAT", existing_identifier_location="end")
+    assert list(data["clinical"].index) == ["C1", "C1.N", "C2", "C3.N"]
+    assert list(data["experimental_design"].index) == ["C2.N", "C4.NAT"]
+
+    # Without an existing identifier, ".N" is just appended
+    data = dataframe_tools.reformat_normal_patient_ids(make_normal_id_data())
+    assert list(data["proteomics"].index) == ["N-C1.N", "C1", "X9", "N-C3.N"]
+
+def make_join_dfs():
+    """Make dataframes to join with join_dataframes. The proteomics dataframe has a duplicate index value, so they can't all be aligned to one joined index."""
+    proteomics = pd.DataFrame({"TP53": [1.0, 2.0, 3.0]}, index=pd.Index(["C2", "C1", "C1"], name="Patient_ID"))
+    proteomics.columns.name = "Name"
+    phosphoproteomics = pd.DataFrame([[10.0], [20.0], [30.0]], index=pd.Index(["C1", "C3", "C2"], name="Patient_ID"), columns=pd.MultiIndex.from_tuples([("KRAS", "S1")], names=["Name", "Site"]))
+    clinical = pd.DataFrame({"Age": [50.0, 60.0]}, index=pd.Index(["C3", "C1"], name="Patient_ID"))
+    clinical.columns.name = "Name"
+    return [proteomics, phosphoproteomics, clinical]
+
+def test_join_dataframes_with_duplicate_index():
+    columns = pd.MultiIndex.from_tuples([("TP53", ""), ("KRAS", "S1"), ("Age", "")], names=["Name", "Site"])
+
+    dfs = make_join_dfs()
+    joined = dataframe_tools.join_dataframes(dfs, how="outer")
+    expected = pd.DataFrame([[2.0, 10.0, 60.0], [3.0, 10.0, 60.0], [1.0, 30.0, np.nan], [np.nan, 20.0, 50.0]], index=pd.Index(["C1", "C1", "C2", "C3"], name="Patient_ID"), columns=columns)
+    pandas.testing.assert_frame_equal(joined, expected)
+
+    # The dataframes we joined weren't changed
+    assert dfs[0].columns.equals(pd.Index(["TP53"], name="Name"))
+    assert dfs[2].columns.equals(pd.Index(["Age"], name="Name"))
+
+    joined = dataframe_tools.join_dataframes(make_join_dfs(), how="left")
+    expected = pd.DataFrame([[1.0, 30.0, np.nan], [2.0, 10.0, 60.0], [3.0, 10.0, 60.0]], index=pd.Index(["C2", "C1", "C1"], name="Patient_ID"), columns=columns)
+    pandas.testing.assert_frame_equal(joined, expected)
+
+    # When an index has duplicates, the sample ranks are applied by sorting the joined dataframe, and rows for the same sample keep the order of the join
+    sample_ranks = dataframe_tools.get_sample_ranks(pd.Series(["Normal", "Tumor", "Tumor"], index=["C1", "C2", "C3"]))
+    joined = dataframe_tools.join_dataframes(make_join_dfs(), how="outer", sample_ranks=sample_ranks)
+    expected = pd.DataFrame([[1.0, 30.0, np.nan], [np.nan, 20.0, 50.0], [2.0, 10.0, 60.0], [3.0, 10.0, 60.0]], index=pd.Index(["C2", "C3", "C1", "C1"], name="Patient_ID"), columns=columns)
+    pandas.testing.assert_frame_equal(joined, expected)
+
+def test_join_dataframes_matches_sequential_joins():
+    dfs = make_join_dfs()
+    dfs[0] = dfs[0].iloc[:2] # Without the duplicate, they're all aligned to one joined index
+
+    # The middle dataframe here doesn't have C2, so a right join drops the first dataframe's C2 value, even though the last dataframe has C2 again
+    first = pd.DataFrame({"TP53": [1.0, 2.0]}, index=pd.Index(["C1", "C2"], name="Patient_ID"))
+    middle = pd.DataFrame({"PTEN": [3.0]}, index=pd.Index(["C1"], name="Patient_ID"))
+    last = pd.DataFrame({"KRAS": [5.0, 6.0]}, index=pd.Index(["C1", "C2"], name="Patient_ID"))
+    for df in (first, middle, last):
+        df.columns.name = "Name"
+
+    for dfs in (dfs, [first, middle, last]):
+        for how in ["outer", "inner", "left", "right"]:
+            joined = dataframe_tools.join_dataframes(dfs, how=how)
+
+            expected = dfs[0].copy()
+            expected.columns = dataframe_tools.add_index_levels(to=expected.columns, source=dfs[1].columns)
+            for df in dfs[1:]:
+                df = df.copy()
+                df.columns = dataframe_tools.add_index_levels(to=df.columns, source=expected.columns)
+                expected = expected.join(df, how=how)
+            pandas.testing.assert_frame_equal(joined, expected)
+
+    assert np.isnan(dataframe_tools.join_dataframes([first, middle, last], how="right").loc["C2", "TP53"])
+
+def test_sort_df_by_sample_ranks():
+    sample_statuses = pd.Series(["Tumor", "Normal", "Tumor", "Normal", "Tumor", np.nan], index=pd.Index(["C3", "C2.N", "C1", "C1.N", "C2", "C4"], name="Patient_ID"), name="Sample_Tumor_Normal")
+    df = pd.DataFrame({"TP53": np.arange(9.0)}, index=pd.Index(["C9", "C2.N", "C1", "C4", "C3", "C1.N", "C2", "C1", "X1"], name="Patient_ID"))
+
+    # Tumor samples come first, then normal samples, then samples without a status, each sorted by Patient_ID. Rows for the same sample keep their order.
+    sorted_df = dataframe_tools.sort_df_by_sample_ranks(df, dataframe_tools.get_sample_ranks(sample_statuses))
+    expected = pd.DataFrame({"TP53": [2.0, 7.0, 6.0, 4.0, 5.0, 1.0, 3.0, 0.0, 8.0]}, index=pd.Index(["C1", "C1", "C2", "C3", "C1.N", "C2.N", "C4", "C9", "X1"], name="Patient_ID"))
+    expected.columns.name = "Name"
+    pandas.testing.assert_frame_equal(sorted_df, expected)
+    pandas.testing.assert_frame_equal(dataframe_tools.sort_df_by_sample_status(df, sample_statuses), expected)
+
+    # A sorted dataframe keeps its order
+    pandas.testing.assert_frame_equal(dataframe_tools.sort_df_by_sample_ranks(sorted_df, dataframe_tools.get_sample_ranks(sample_statuses)), expected)
+
+    # A table with its own sample statuses is sorted by those
+    df = pd.DataFrame({"Sample_Tumor_Normal": ["Normal", "Tumor", "Tumor"]}, index=pd.Index(["C1", "C3", "C2"], name="Patient_ID"))
+    sorted_df = dataframe_tools.sort_df_by_sample_ranks(df, dataframe_tools.get_sample_ranks(sample_statuses))
+    assert list(sorted_df.index) == ["C2", "C3", "C1"]
@@ -0,0 +1,326 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Tests for the join and genotype methods of Dataset, on a small dataset built here, so they don't need any data downloaded. The expected dataframes are what the join methods gave before they were vectorized.
+
+import numpy as np
+import pandas as pd
+import pandas.testing
+import pytest
+import warnings
+
+import cptac.dataset
+from cptac.dataset import Dataset
+from cptac.exceptions import FilledMutationDataWarning, InsertedNanWarning
+
+class FakeDataset(Dataset):
+    """A dataset whose dataframes are passed in, instead of parsed from data files."""
+
+    def __init__(self, cancer_type, data):
+        self._fake_data = data
+        super().__init__(cancer_type=cancer_type, version="1.0", valid_versions=["1.0"], data_files={"1.0": []}, no_internet=True, use_cache=False)
+
+    def _load_data(self, use_cache, n_jobs):
+        self._data.update(self._fake_data)
+
+def make_data(cancer_type="endometrial"):
+    """Make the dataframes for a FakeDataset. The clinical rows are out of order, so the joins have to sort them. C5 has mutations but no clinical data, so it has no sample status."""
+    clinical = pd.DataFrame({
+        "Sample_Tumor_Normal": ["Tumor", "Normal", "Tumor", "Tumor", "Normal", "Tumor"],
+        "Age": [60, 60, 55, 70, 55, 40],
+    }, index=pd.Index(["C2", "C1.N", "C3", "C1", "C2.N", "C4"], name="Patient_ID"))
+
+    mutations = [
+        ("C1", "TP53", "Missense_Mutation", "p.R273H"),
+        ("C1", "TP53", "Nonsense_Mutation", "p.R342*"),
+        ("C1", "PTEN", "Missense_Mutation", "p.R130Q"),
+        ("C2", "TP53", "Missense_Mutation", "p.R248Q"),
+        ("C2", "TP53", "Missense_Mutation", "p.R175H"),
+        ("C2", "KRAS", "In_Frame_Del", "p.G12del"),
+        ("C2", "KRAS", "Missense_Mutation", "p.G12D"),
+        ("C3", "PTEN", "Frame_Shift_Del", "p.K267fs"),
+        ("C3", "PTEN", "Nonsense_Mutation", "p.R233*"),
+        ("C3", "TP53", "Silent", "p.P72P"),
+        ("C5", "KRAS", "Missense_Mutation", "p.G12D"),
+    ]
+    if cancer_type == "gbm":
+        mutations += [
+            ("C1", "EGFR", "Silent", "p.A1A"),
+            ("C1", "EGFR", "Intron", np.nan),
+            ("C1", "EGFR", "RNA", np.nan),
+            ("C3", "EGFR", "3'UTR", np.nan),
+            ("C3", "EGFR", "Missense_Mutation", "p.A289V"),
+        ]
+    somatic_mutation = pd.DataFrame(mutations, columns=["Patient_ID", "Gene", "Mutation", "Location"]).set_index("Patient_ID")
+    somatic_mutation.columns.name = "Name"
+
+    proteomics = pd.DataFrame(np.arange(18, dtype=float).reshape(6, 3),
+        index=pd.Index(["C1", "C2", "C3", "C4", "C1.N", "C2.N"], name="Patient_ID"),
+        columns=pd.Index(["TP53", "PTEN", "KRAS"], name="Name"))
+
+    cnv = pd.DataFrame([[-0.5, 0.1, 0.0], [0.3, -0.1, 0.25], [0.0, -0.3, np.nan], [0.1, 0.1, 0.5]],
+        index=pd.Index(["C1", "C2", "C3", "C4"], name="Patient_ID"),
+        columns=pd.Index(["TP53", "PTEN", "KRAS"], name="Name"))
+
+    phosphoproteomics = pd.DataFrame(np.arange(10, dtype=float).reshape(5, 2),
+        index=pd.Index(["C1", "C2", "C3", "C1.N", "C6"], name="Patient_ID"),
+        columns=pd.MultiIndex.from_tuples([("TP53", "S15"), ("KRAS", "T58")], names=["Name", "Site"]))
+
+    return {
+        "clinical": clinical,
+        "somatic_mutation": somatic_mutation,
+        "proteomics": proteomics,
+        "CNV": cnv,
+        "phosphoproteomics": phosphoproteomics,
+    }
+
+@pytest.fixture
+def make_dataset(monkeypatch):
+    """Get a function that makes a FakeDataset of the given cancer type, without looking for installed data files."""
+    monkeypatch.setattr(cptac.dataset, "validate_version", lambda version, dataset, use_context, valid_versions=None: version)
+    monkeypatch.setattr(cptac.dataset, "get_version_files_paths", lambda dataset, version, data_files: [])
+
+    def make(cancer_type="endometrial"):
+        return FakeDataset(cancer_type, make_data(cancer_type))
+
+    return make
+
+def make_expected(rows, columns, index):
+    """Make an expected dataframe with object columns, except for the columns of numbers."""
+    df = pd.DataFrame(rows, columns=pd.Index(columns, name="Name"), index=pd.Index(index, name="Patient_ID"), dtype=object)
+    for col in df.columns:
+        if all(isinstance(value, float) for value in df[col]):
+            df[col] = df[col].astype(float)
+    return df
+
+def assert_frames_equal(actual, expected):
+    """Check that two dataframes have the same values and axes. The dtypes aren't checked, since the inferred dtype of columns of strings depends on the pandas version."""
+    pandas.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+def test_join_fills_wildtype_mutations(make_dataset):
+    ds = make_dataset()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        filtered = ds.join_metadata_to_mutations("clinical", "TP53", metadata_cols="Age", mutations_filter=[])
+        unfiltered = ds.join_metadata_to_mutations("clinical", "TP53", metadata_cols="Age")
+
+    columns = ["Age", "TP53_Mutation", "TP53_Location", "TP53_Mutation_Status", "Sample_Status"]
+    index = ["C1", "C2", "C3", "C4", "C1.N", "C2.N", "C5"]
+
+    expected_filtered = make_expected([
+        [70.0, "Nonsense_Mutation", "p.R342*", "Multiple_mutation", "Tumor"],
+        [60.0, "Missense_Mutation", "p.R175H", "Multiple_mutation", "Tumor"],
+        [55.0, "Silent", "p.P72P", "Single_mutation", "Tumor"],
+        [40.0, "Wildtype_Tumor", "No_mutation", "Wildtype_Tumor", "Tumor"],
+        [60.0, "Wildtype_Normal", "No_mutation", "Wildtype_Normal", "Normal"],
+        [55.0, "Wildtype_Normal", "No_mutation", "Wildtype_Normal", "Normal"],
+        [np.nan, np.nan, np.nan, np.nan, np.nan],
+    ], columns, index)
+    assert_frames_equal(filtered, expected_filtered)
+
+    # Without a filter, every value is a list, including the filled ones
+    expected_unfiltered = make_expected([
+        [70.0, ["Missense_Mutation", "Nonsense_Mutation"], ["p.R273H", "p.R342*"], "Multiple_mutation", "Tumor"],
+        [60.0, ["Missense_Mutation", "Missense_Mutation"], ["p.R248Q", "p.R175H"], "Multiple_mutation", "Tumor"],
+        [55.0, ["Silent"], ["p.P72P"], "Single_mutation", "Tumor"],
+        [40.0, ["Wildtype_Tumor"], ["No_mutation"], "Wildtype_Tumor", "Tumor"],
+        [60.0, ["Wildtype_Normal"], ["No_mutation"], "Wildtype_Normal", "Normal"],
+        [55.0, ["Wildtype_Normal"], ["No_mutation"], "Wildtype_Normal", "Normal"],
+        [np.nan, [np.nan], [np.nan], np.nan, np.nan],
+    ], columns, index)
+    assert_frames_equal(unfiltered, expected_unfiltered)
+
+def test_genotype_marks_hotspots(make_dataset):
+    ds = make_dataset()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        kras = ds.get_genotype_all_vars("KRAS", mutation_hotspot=["p.G12D"])
+        tp53 = ds.get_genotype_all_vars("TP53", mutation_hotspot=["p.R248Q"])
+
+    columns = ["Mutation", "Location", "Mutation_Status"]
+    index = ["C1", "C2", "C3", "C4", "C5"]
+
+    # C2's hotspot missense is chosen over its other missense, and C4 has no mutations, so its Amplification is chosen
+    expected_kras = make_expected([
+        ["Wildtype_Tumor", "No_mutation", "Wildtype_Tumor"],
+        ["Missense_Mutation_hotspot", "p.G12D", "Multiple_mutation"],
+        ["Wildtype_Tumor", "No_mutation", "Wildtype_Tumor"],
+        ["Amplification", "Amplification", "Single_mutation"],
+        ["Missense_Mutation_hotspot", "p.G12D", "Single_mutation"],
+    ], columns, index)
+    assert_frames_equal(kras, expected_kras)
+
+    # The Deletion comes before hotspots in the default filter, and C5 has no sample status, so it isn't wildtype
+    expected_tp53 = make_expected([
+        ["Deletion", "Deletion", "Multiple_mutation"],
+        ["Missense_Mutation_hotspot", "p.R248Q", "Multiple_mutation"],
+        ["Silent", "p.P72P", "Single_mutation"],
+        ["Wildtype_Tumor", "No_mutation", "Wildtype_Tumor"],
+        ["nan", "nan", "Single_mutation"],
+    ], columns, index)
+    assert_frames_equal(tp53, expected_tp53)
+
+def test_genotype_filter_without_cnv_mutations(make_dataset):
+    ds = make_dataset()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        kras = ds.get_genotype_all_vars("KRAS", mutation_hotspot=["p.G12D"], mutations_filter=["Missense_Mutation_hotspot", "Nonsense_Mutation"])
+
+    # Amplification isn't in the filter, so it isn't prioritized over C4's wildtype
+    expected = make_expected([
+        ["Wildtype_Tumor", "No_mutation", "Wildtype_Tumor"],
+        ["Missense_Mutation_hotspot", "p.G12D", "Multiple_mutation"],
+        ["Wildtype_Tumor", "No_mutation", "Wildtype_Tumor"],
+        ["Wildtype_Tumor", "No_mutation", "Single_mutation"],
+        ["Missense_Mutation_hotspot", "p.G12D", "Single_mutation"],
+    ], ["Mutation", "Location", "Mutation_Status"], ["C1", "C2", "C3", "C4", "C5"])
+    assert_frames_equal(kras, expected)
+
+@pytest.mark.parametrize("genes", ["KRAS", ["TP53", "KRAS"]])
+def test_genotype_warns_about_filled_samples(make_dataset, genes):
+    ds = make_dataset()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        ds.get_genotype_all_vars(genes)
+
+    # C5 has mutations but no CNV. For KRAS, C1, C3 and C4 have a sample status but no mutations, and for TP53 it's C4.
+    messages = {warning.category: str(warning.message) for warning in caught}
+    assert messages[InsertedNanWarning].endswith("CNV data was not found for the following samples, so CNV data columns were filled with NaN for these samples: C5")
+    expected_fills = "3 samples for the KRAS gene" if genes == "KRAS" else "1 samples for the TP53 gene, 3 samples for the KRAS gene"
+    assert messages[FilledMutationDataWarning].endswith(f"so they were filled with Wildtype_Tumor or Wildtype_Normal: {expected_fills}")
+
+@pytest.mark.parametrize("cancer_type", ["endometrial", "gbm"])
+@pytest.mark.parametrize("mutation_hotspot", [None, ["p.R175H", "p.G12D"]])
+@pytest.mark.parametrize("mutations_filter", [None, ["Missense_Mutation_hotspot", "Nonsense_Mutation"]])
+def test_genotype_single_gene_matches_list(make_dataset, cancer_type, mutation_hotspot, mutations_filter):
+    ds = make_dataset(cancer_type)
+    genes = ["TP53", "PTEN", "KRAS", "EGFR"] # EGFR only has mutations in gbm, and isn't in the CNV dataframe
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        all_genes = ds.get_genotype_all_vars(genes, mutation_hotspot=mutation_hotspot, mutations_filter=mutations_filter)
+
+        for gene in genes:
+            single = ds.get_genotype_all_vars(gene, mutation_hotspot=mutation_hotspot, mutations_filter=mutations_filter)
+            one_gene_list = ds.get_genotype_all_vars([gene], mutation_hotspot=mutation_hotspot, mutations_filter=mutations_filter)
+
+            pandas.testing.assert_frame_equal(single, one_gene_list.xs(gene, level="Gene"))
+            pandas.testing.assert_frame_equal(single, all_genes.xs(gene, level="Gene"))
+
+def test_join_several_genes_mutations(make_dataset):
+    ds = make_dataset()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        joined = ds.join_omics_to_mutations("proteomics", ["KRAS", "PTEN"], omics_genes="TP53")
+
+    # Each gene gets its own columns, with each sample's mutations for that gene in the order they're in the somatic_mutation dataframe
+    expected = make_expected([
+        [0.0, ["Wildtype_Tumor"], ["No_mutation"], "Wildtype_Tumor", ["Missense_Mutation"], ["p.R130Q"], "Single_mutation", "Tumor"],
+        [3.0, ["In_Frame_Del", "Missense_Mutation"], ["p.G12del", "p.G12D"], "Multiple_mutation", ["Wildtype_Tumor"], ["No_mutation"], "Wildtype_Tumor", "Tumor"],
+        [6.0, ["Wildtype_Tumor"], ["No_mutation"], "Wildtype_Tumor", ["Frame_Shift_Del", "Nonsense_Mutation"], ["p.K267fs", "p.R233*"], "Multiple_mutation", "Tumor"],
+        [9.0, ["Wildtype_Tumor"], ["No_mutation"], "Wildtype_Tumor", ["Wildtype_Tumor"], ["No_mutation"], "Wildtype_Tumor", "Tumor"],
+        [12.0, ["Wildtype_Normal"], ["No_mutation"], "Wildtype_Normal", ["Wildtype_Normal"], ["No_mutation"], "Wildtype_Normal", "Normal"],
+        [15.0, ["Wildtype_Normal"], ["No_mutation"], "Wildtype_Normal", ["Wildtype_Normal"], ["No_mutation"], "Wildtype_Normal", "Normal"],
+        [np.nan, ["Missense_Mutation"], ["p.G12D"], "Single_mutation", [np.nan], [np.nan], np.nan, np.nan],
+    ], ["TP53_proteomics", "KRAS_Mutation", "KRAS_Location", "KRAS_Mutation_Status", "PTEN_Mutation", "PTEN_Location", "PTEN_Mutation_Status", "Sample_Status"],
+    ["C1", "C2", "C3", "C4", "C1.N", "C2.N", "C5"])
+    assert_frames_equal(joined, expected)
+
+    # Asking for the genes in another order, or more than once, only changes the order of their columns
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        reversed_genes = ds.join_omics_to_mutations("proteomics", ["PTEN", "KRAS", "PTEN"], omics_genes="TP53")
+    assert len(reversed_genes.columns) == len(joined.columns)
+    assert_frames_equal(reversed_genes[joined.columns], joined)
+
+def get_filtered_mutations(ds, genes, mutations_filter):
+    """Join the filtered mutations of some genes to the clinical Age column, and get just the mutation and location columns of the tumor samples with mutations."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        joined = ds.join_metadata_to_mutations("clinical", genes, metadata_cols="Age", mutations_filter=mutations_filter)
+    columns = [f"{gene}_{col}" for gene in genes for col in ("Mutation", "Location")]
+    return joined.loc[["C1", "C2", "C3"], columns]
+
+@pytest.mark.parametrize("mutations_filter, expected_rows", [
+    # Truncations come before missenses, then the earliest location. C2's KRAS mutations are both at position 12, so the tie goes to the type listed first.
+    ([], [
+        ["Nonsense_Mutation", "p.R342*", "Missense_Mutation", "p.R130Q", "Wildtype_Tumor", "No_mutation"],
+        ["Missense_Mutation", "p.R175H", "Wildtype_Tumor", "No_mutation", "In_Frame_Del", "p.G12del"],
+        ["Silent", "p.P72P", "Nonsense_Mutation", "p.R233*", "Wildtype_Tumor", "No_mutation"],
+    ]),
+    # A mutation type in the filter is chosen even over a truncation
+    (["Missense_Mutation"], [
+        ["Missense_Mutation", "p.R273H", "Missense_Mutation", "p.R130Q", "Wildtype_Tumor", "No_mutation"],
+        ["Missense_Mutation", "p.R175H", "Wildtype_Tumor", "No_mutation", "Missense_Mutation", "p.G12D"],
+        ["Silent", "p.P72P", "Nonsense_Mutation", "p.R233*", "Wildtype_Tumor", "No_mutation"],
+    ]),
+    # A location in the filter breaks the tie at position 12
+    (["p.G12D"], [
+        ["Nonsense_Mutation", "p.R342*", "Missense_Mutation", "p.R130Q", "Wildtype_Tumor", "No_mutation"],
+        ["Missense_Mutation", "p.R175H", "Wildtype_Tumor", "No_mutation", "Missense_Mutation", "p.G12D"],
+        ["Silent", "p.P72P", "Nonsense_Mutation", "p.R233*", "Wildtype_Tumor", "No_mutation"],
+    ]),
+    # The filter is checked for types and locations. TP53 has none of the values in it, so its mutations get the default priorities.
+    (["Frame_Shift_Del", "p.G12del"], [
+        ["Nonsense_Mutation", "p.R342*", "Missense_Mutation", "p.R130Q", "Wildtype_Tumor", "No_mutation"],
+        ["Missense_Mutation", "p.R175H", "Wildtype_Tumor", "No_mutation", "In_Frame_Del", "p.G12del"],
+        ["Silent", "p.P72P", "Frame_Shift_Del", "p.K267fs", "Wildtype_Tumor", "No_mutation"],
+    ]),
+])
+def test_filter_multiple_mutations(make_dataset, mutations_filter, expected_rows):
+    ds = make_dataset()
+    genes = ["TP53", "PTEN", "KRAS"]
+    filtered = get_filtered_mutations(ds, genes, mutations_filter)
+
+    expected = make_expected(expected_rows, [f"{gene}_{col}" for gene in genes for col in ("Mutation", "Location")], ["C1", "C2", "C3"])
+    assert_frames_equal(filtered, expected)
+
+@pytest.mark.parametrize("mutations_filter, c1_mutation", [
+    ([], "Intron"), # Noncoding mutations come after missenses, but before other types like Silent. Ties go to the type listed first.
+    (["RNA"], "RNA"),
+])
+def test_filter_gbm_noncoding_mutations(make_dataset, mutations_filter, c1_mutation):
+    ds = make_dataset("gbm")
+    filtered = get_filtered_mutations(ds, ["EGFR"], mutations_filter)
+
+    # The noncoding mutations have no location, so their location is filled like for a sample without mutations
+    expected = make_expected([
+        [c1_mutation, "No_mutation"],
+        ["Wildtype_Tumor", "No_mutation"],
+        ["Missense_Mutation", "p.A289V"],
+    ], ["EGFR_Mutation", "EGFR_Location"], ["C1", "C2", "C3"])
+    assert_frames_equal(filtered, expected)
+
+    # Other cancer types don't have noncoding mutations, so the same mutations are tied with Silent, and the first one is chosen
+    ds = make_dataset("endometrial")
+    ds._data["somatic_mutation"] = make_data("gbm")["somatic_mutation"]
+    filtered = get_filtered_mutations(ds, ["EGFR"], [])
+    assert filtered.loc["C1", "EGFR_Mutation"] == "Silent"
+
+def test_join_sorts_tumor_then_normal(make_dataset):
+    ds = make_dataset()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        joined = ds.join_omics_to_omics("proteomics", "phosphoproteomics", genes1="TP53")
+        normal = ds.join_omics_to_omics("proteomics", "phosphoproteomics", genes1="TP53", tissue_type="normal")
+
+    # C6 is only in the phosphoproteomics dataframe, and isn't in the clinical dataframe, so it has no status and goes last
+    columns = pd.MultiIndex.from_tuples([("TP53_proteomics", ""), ("TP53_phosphoproteomics", "S15"), ("KRAS_phosphoproteomics", "T58")], names=["Name", "Site"])
+    expected = pd.DataFrame([
+        [0.0, 0.0, 1.0],
+        [3.0, 2.0, 3.0],
+        [6.0, 4.0, 5.0],
+        [9.0, np.nan, np.nan],
+        [12.0, 6.0, 7.0],
+        [15.0, np.nan, np.nan],
+        [np.nan, 8.0, 9.0],
+    ], index=pd.Index(["C1", "C2", "C3", "C4", "C1.N", "C2.N", "C6"], name="Patient_ID"), columns=columns)
+    assert_frames_equal(joined, expected)
+    assert_frames_equal(normal, expected.loc[["C1.N", "C2.N"]])
@@ -0,0 +1,56 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Tests for the package-wide dataset loading options.
+
+import numpy as np
+import pytest
+
+from cptac import options
+from cptac.exceptions import InvalidParameterError
+
+@pytest.fixture(autouse=True)
+def restore_options(monkeypatch):
+    """Put the options back to what they were after each test."""
+    monkeypatch.setattr(options, "_options", dict(options._options))
+
+def test_set_and_resolve_options():
+    options.set_option("precision", "float32")
+    options.set_option("views", True)
+    assert options.get_option("precision") == "float32"
+    assert options.get_option("views") is True
+
+    # None uses the package-wide default, and anything else overrides it
+    assert options.resolve_option("views", None) is True
+    assert options.resolve_option("views", False) is False
+    assert options.resolve_option("precision", "float64") == "float64"
+
+@pytest.mark.parametrize("value", [1, 0, 1.0, np.True_, np.False_, "True", None])
+@pytest.mark.parametrize("name", ["memmap", "views"])
+def test_bool_options_only_take_bools(name, value):
+    with pytest.raises(InvalidParameterError):
+        options.set_option(name, value)
+    assert options.get_option(name) is False
+
+    if value is not None: # None means to use the default
+        with pytest.raises(InvalidParameterError):
+            options.resolve_option(name, value)
+
+@pytest.mark.parametrize("value", ["float16", 32, None])
+def test_invalid_precision(value):
+    with pytest.raises(InvalidParameterError):
+        options.set_option("precision", value)
+
+def test_invalid_option_name():
+    with pytest.raises(InvalidParameterError):
+        options.get_option("threads")
+    with pytest.raises(InvalidParameterError):
+        options.set_option("threads", 4)
@@ -0,0 +1,118 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Tests for pancan_query, with the small datasets from test_dataset_joins standing in for the real ones.
+
+import pandas as pd
+import pandas.testing
+import pytest
+import types
+import warnings
+
+import cptac.pancan
+from cptac.exceptions import InvalidParameterError, ParameterWarning
+from cptac.pancan import clear_pancan_datasets, pancan_query
+from test_dataset_joins import FakeDataset, make_data, make_dataset # make_dataset is a fixture
+
+@pytest.fixture
+def loads(monkeypatch, make_dataset):
+    """Replace the Endometrial and Gbm datasets with small fake ones for pancan_query. Their proteomics rows are in reverse order, and the Gbm dataset has no phosphoproteomics dataframe. Returns the list of (cancer type, constructor arguments) each fake dataset is loaded with."""
+    loads = []
+
+    def make_class(cancer_type):
+        class PancanFakeDataset(FakeDataset):
+            def __init__(self, **kwargs):
+                loads.append((cancer_type, kwargs))
+                data = make_data(cancer_type)
+                data["proteomics"] = data["proteomics"].iloc[::-1] # Out of order, so the queries have to sort the rows
+                if cancer_type == "gbm":
+                    del data["phosphoproteomics"]
+                super().__init__(cancer_type, data)
+        return PancanFakeDataset
+
+    monkeypatch.setattr(cptac.pancan, "cptac", types.SimpleNamespace(Endometrial=make_class("endometrial"), Gbm=make_class("gbm")))
+    clear_pancan_datasets()
+    yield loads
+    clear_pancan_datasets()
+
+def query(*args, **kwargs):
+    """Call pancan_query on the fake datasets, ignoring the warnings about genes they don't have."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return pancan_query(*args, cancers=["Endometrial", "Gbm"], **kwargs)
+
+def test_wide_form_matches_join(loads):
+    with pytest.warns(ParameterWarning, match="gbm phosphoproteomics"):
+        wide = pancan_query({"proteomics": "TP53", "phosphoproteomics": ["KRAS"]}, cancers=["Endometrial", "Gbm"])
+
+    # Each dataset's rows are what the join functions give, and the Gbm dataset, which has no phosphoproteomics, gets NaN for the phosphoproteomics column
+    endometrial = FakeDataset("endometrial", make_data("endometrial"))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected_endometrial = endometrial.join_omics_to_omics("proteomics", "phosphoproteomics", genes1="TP53", genes2="KRAS")
+    pandas.testing.assert_frame_equal(wide.loc["endometrial"], expected_endometrial)
+
+    gbm = wide.loc["gbm"]
+    assert list(gbm.index) == ["C1", "C2", "C3", "C4", "C1.N", "C2.N"]
+    assert list(gbm[("TP53_proteomics", "")]) == [0.0, 3.0, 6.0, 9.0, 12.0, 15.0]
+    assert gbm[("KRAS_phosphoproteomics", "T58")].isna().all()
+    assert wide.index.names == ["Cancer", "Patient_ID"]
+    assert wide.columns.names == ["Name", "Site"]
+
+def test_long_form_matches_wide_form(loads):
+    tables = {"proteomics": ["TP53", "PTEN"], "phosphoproteomics": None}
+    wide = query(tables)
+    long = query(tables, form="long")
+
+    assert list(long.columns) == ["Table", "Name", "Site", "Value"]
+    assert len(long) == wide.notna().sum().sum()
+    for (cancer, table, name), rows in long.groupby(["Cancer", "Table", "Name"], sort=False):
+        column = wide.loc[cancer, (f"{name}_{table}", rows["Site"].fillna("").iloc[0])].dropna()
+
+        # The values for each column are in the same order as in the wide form, with tumor samples first
+        assert list(rows.index.get_level_values("Patient_ID")) == list(column.index)
+        assert list(rows["Value"]) == list(column)
+
+def test_dict_tables(loads):
+    wide = query({"proteomics": ["TP53", "PTEN"], "CNV": None})
+    assert list(wide.columns) == ["TP53_proteomics", "PTEN_proteomics", "TP53_CNV", "PTEN_CNV", "KRAS_CNV"]
+
+    # A list of tables gets the same genes from each one
+    wide = query(["proteomics", "CNV"], genes="KRAS")
+    assert list(wide.columns) == ["KRAS_proteomics", "KRAS_CNV"]
+
+    with pytest.raises(InvalidParameterError):
+        query({"proteomics": "TP53"}, genes="TP53")
+
+def test_missing_tables(loads):
+    with pytest.warns(ParameterWarning, match="gbm phosphoproteomics"):
+        long = pancan_query("phosphoproteomics", cancers=["Endometrial", "Gbm"], form="long")
+    assert list(long.index.get_level_values("Cancer").unique()) == ["endometrial"]
+
+    # When no dataset has the tables, both forms are empty
+    with pytest.warns(ParameterWarning):
+        wide = pancan_query("phosphoproteomics", cancers="Gbm")
+    assert wide.empty
+    assert wide.index.names == ["Cancer", "Patient_ID"]
+
+def test_datasets_are_reused(loads):
+    query("proteomics", genes="TP53")
+    query("CNV", form="long")
+    assert sorted(cancer for cancer, kwargs in loads) == ["endometrial", "gbm"]
+
+    # Different constructor arguments load the datasets again, and so does clearing them
+    query("proteomics", version="1.0")
+    assert len(loads) == 4
+    assert loads[-1][1] == {"version": "1.0"}
+
+    clear_pancan_datasets()
+    query("proteomics", genes="TP53")
+    assert len(loads) == 6
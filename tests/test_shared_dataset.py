@@ -0,0 +1,70 @@
+#   Copyright 2018 Samuel Payne sam_payne@byu.edu
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#       http://www.apache.org/licenses/LICENSE-2.0
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+# Tests for sharing a dataset with other processes, using the small dataset from test_dataset_joins.
+
+import concurrent.futures
+import multiprocessing
+import pandas.testing
+import pytest
+import sys
+import warnings
+
+from cptac.exceptions import SharedDatasetError
+from cptac.shared_dataset import attach_dataset, detach_dataset, share_dataset
+from test_dataset_joins import make_dataset # The fixture
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 8), reason="Sharing datasets requires multiprocessing.shared_memory")
+
+def get_outputs(dataset):
+    """Get the results of some get_* and join_* methods of a dataset, for comparing a shared dataset to the original."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return [
+            dataset.get_clinical(),
+            dataset.get_proteomics(tissue_type="tumor"),
+            dataset.get_phosphoproteomics(),
+            dataset.get_somatic_mutation(),
+            dataset.join_omics_to_omics("proteomics", "phosphoproteomics", genes1="TP53", genes2="KRAS"),
+            dataset.join_omics_to_mutations("proteomics", ["TP53", "KRAS"], mutations_filter=["Nonsense_Mutation"]),
+            dataset.join_metadata_to_omics("clinical", "CNV", metadata_cols="Age", how="inner"),
+            dataset.get_genotype_all_vars(["TP53", "PTEN"]),
+        ]
+
+def attach_and_get_outputs(handle):
+    """Attach to a shared dataset in a worker process and get the same results as get_outputs."""
+    return get_outputs(attach_dataset(handle))
+
+def test_attached_dataset_matches_original(make_dataset):
+    ds = make_dataset()
+    expected = get_outputs(ds)
+
+    with share_dataset(ds) as server:
+        # A spawned process doesn't inherit anything from this one, so the dataset can only come from the shared memory
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            actual = executor.submit(attach_and_get_outputs, server.handle).result()
+
+    assert len(actual) == len(expected)
+    for actual_df, expected_df in zip(actual, expected):
+        pandas.testing.assert_frame_equal(actual_df, expected_df)
+
+def test_attach_reuses_dataset_until_detached(make_dataset):
+    with share_dataset(make_dataset()) as server:
+        attached = attach_dataset(server.handle)
+        assert attach_dataset(server.handle) is attached
+        assert attached.get_cancer_type() == "endometrial"
+
+        detach_dataset(server.handle)
+        assert attach_dataset(server.handle) is not attached
+
+    # The server detached the second dataset when it was closed, and its shared memory is gone
+    with pytest.raises(SharedDatasetError):
+        attach_dataset(server.handle).get_proteomics()